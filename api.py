@@ -0,0 +1,466 @@
+"""
+Local HTTP scanning API: scan_file() and scan_cloud_url() for other services,
+without the Streamlit UI. Small requests are answered synchronously; batches
+go through a bounded job queue served by a process pool.
+
+    python api.py --port 8088 --workers 4
+
+    POST /scan/file?name=a.pdf    body: the file          -> scan_file() result
+    POST /scan/url                {"url": "..."}          -> scan_cloud_url() result
+    POST /jobs?name=batch.zip     body: a file or archive -> 202 {"id", ...}
+    POST /jobs                    {"urls": ["...", ...]}  -> 202 {"id", ...}
+    GET  /jobs/<id>               status and progress
+    GET  /jobs/<id>/results       results so far as JSON Lines (?offset=N skips N)
+    GET  /health                  queue and pool state
+
+A full queue answers 429 with Retry-After, or, with ?wait=SECONDS on
+POST /jobs, holds the request until there is room; either way before the
+upload is read. Request bodies are read in chunks (Content-Length or
+chunked) and job uploads go straight to disk; one whose name has no scannable
+extension is answered 415 instead of ending as an empty job.
+"""
+import argparse
+import io
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import queue
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, TimeoutError, wait, FIRST_COMPLETED
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from cli import DEFAULT_MAX_FILE_SIZE, SCANNABLE, available_cores, iter_tasks, scan_task
+from core.cloud_scanner import CloudScanCache, make_session, scan_cloud_url, scan_cloud_urls
+from core.host_scheduler import HostScheduler
+
+# Bodies above this go to POST /jobs instead of being scanned while the client waits.
+SYNC_MAX_BYTES = 8 << 20
+# Largest request body accepted at all.
+MAX_UPLOAD_BYTES = DEFAULT_MAX_FILE_SIZE
+# Jobs waiting for the pool before new ones are turned away.
+DEFAULT_QUEUE_SIZE = 32
+# Finished jobs kept for status and results; older ones are forgotten.
+DEFAULT_KEEP_JOBS = 1000
+DEFAULT_SYNC_TIMEOUT = 60
+READ_SIZE = 64 << 10
+
+class RequestError(Exception):
+    def __init__(self, status: int, message: str, headers: dict = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+class Job:
+    """
+    One batch: the files of an upload (archive members one by one) or a list
+    of URLs. Results are appended as they finish, in completion order.
+    """
+
+    def __init__(self, job_id: str, kind: str, tasks, workdir: str = None):
+        self.id = job_id
+        self.kind = kind
+        self.tasks = tasks
+        self.workdir = workdir
+        self.status = "queued"
+        self.total = len(tasks) if isinstance(tasks, list) else None
+        self.errors = 0
+        self.error = None
+        self.results = []
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def add(self, record: dict):
+        if "error" in record:
+            self.errors += 1
+        self.results.append(record)
+
+    def status_dict(self) -> dict:
+        status = {"id": self.id, "kind": self.kind, "status": self.status, "total": self.total,
+                  "done": len(self.results), "errors": self.errors, "submitted_at": self.submitted_at,
+                  "started_at": self.started_at, "finished_at": self.finished_at}
+        if self.error:
+            status["error"] = self.error
+        return status
+
+class ScanService:
+    """
+    Worker side of the API. File scans run on a process pool (at most two
+    per worker in flight); URL probes on threads sharing one keep-alive session,
+    cloud cache and per-host scheduler. Jobs wait in a queue of `queue_size`
+    and are run one after another by a dispatcher thread. Synchronous requests
+    skip the queue but take one of `max_sync` slots, so they cannot pile up either.
+    A place in the queue can be reserved before a job's upload is read.
+    """
+
+    def __init__(self, workers: int = None, queue_size: int = DEFAULT_QUEUE_SIZE, max_sync: int = None,
+                 keep_jobs: int = DEFAULT_KEEP_JOBS, max_file_size: int = DEFAULT_MAX_FILE_SIZE,
+                 sync_timeout: float = DEFAULT_SYNC_TIMEOUT):
+        self.workers = workers or available_cores()
+        self.max_sync = self.workers if max_sync is None else max_sync
+        self.keep_jobs = keep_jobs
+        self.max_file_size = max_file_size
+        self.sync_timeout = sync_timeout
+        # spawn: workers must not inherit the server's threads and locks
+        self.pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        self.session = make_session(pool_size=max(16, self.max_sync))
+        self.cloud_cache = CloudScanCache()
+        self.scheduler = HostScheduler()
+        self.queue_size = queue_size
+        self.queue = queue.Queue()
+        self._room = threading.BoundedSemaphore(queue_size)  # places not yet reserved
+        self.jobs = OrderedDict()
+        self.stats = {"sync": 0, "jobs": 0, "rejected": 0}
+        self._sync_slots = threading.BoundedSemaphore(self.max_sync) if self.max_sync else None
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._dispatcher = threading.Thread(target=self._dispatch, name="scan-dispatcher", daemon=True)
+        self._dispatcher.start()
+
+    def _sync_slot(self):
+        if self._sync_slots is None or not self._sync_slots.acquire(blocking=False):
+            with self._lock:
+                self.stats["rejected"] += 1
+            raise RequestError(429, "too many requests in progress", {"Retry-After": "1"})
+        with self._lock:
+            self.stats["sync"] += 1
+
+    def scan_file(self, name: str, data: bytes) -> dict:
+        self._sync_slot()
+        try:
+            future = self.pool.submit(scan_task, name, data)
+        except BaseException:
+            self._sync_slots.release()
+            raise
+        # The slot is held until the scan itself ends, not until the client
+        # gives up, so timed-out scans cannot pile up in the pool.
+        future.add_done_callback(lambda f: self._sync_slots.release())
+        try:
+            return future.result(self.sync_timeout)
+        except TimeoutError:
+            raise RequestError(504, f"scan took longer than {self.sync_timeout}s; use POST /jobs")
+
+    def scan_url(self, url: str) -> dict:
+        self._sync_slot()
+        try:
+            return scan_cloud_url(url, self.session, cache=self.cloud_cache, scheduler=self.scheduler)
+        finally:
+            self._sync_slots.release()
+
+    def reserve(self, wait_seconds: float = 0):
+        """
+        Take a place in the job queue, waiting up to `wait_seconds` for one;
+        RequestError 429 if the queue stays full. Hand it to submit(reserved=True)
+        or give it back with unreserve().
+        """
+        if wait_seconds:
+            reserved = self._room.acquire(timeout=wait_seconds)
+        else:
+            reserved = self._room.acquire(blocking=False)
+        if not reserved:
+            with self._lock:
+                self.stats["rejected"] += 1
+            raise RequestError(429, "job queue is full", {"Retry-After": "5"})
+
+    def unreserve(self):
+        self._room.release()
+
+    def submit(self, kind: str, tasks, workdir: str = None, wait_seconds: float = 0, reserved: bool = False) -> Job:
+        """
+        Queue a job of file tasks (an upload under `workdir`) or URLs. Unless
+        a place was `reserved` already, one is taken as by reserve().
+        """
+        if not reserved:
+            try:
+                self.reserve(wait_seconds)
+            except RequestError:
+                if workdir:
+                    shutil.rmtree(workdir, ignore_errors=True)
+                raise
+        with self._lock:
+            job = Job(f"{next(self._ids):x}{os.urandom(4).hex()}", kind, tasks, workdir)
+            self.jobs[job.id] = job
+        self.queue.put(job)
+        with self._lock:
+            self.stats["jobs"] += 1
+            self._forget_old()
+        return job
+
+    def job(self, job_id: str) -> Job:
+        with self._lock:
+            job = self.jobs.get(job_id)
+        if job is None:
+            raise RequestError(404, f"no job {job_id}")
+        return job
+
+    def _forget_old(self):
+        finished = [j for j in self.jobs.values() if j.finished_at is not None]
+        for job in finished[:max(0, len(finished) - self.keep_jobs)]:
+            del self.jobs[job.id]
+
+    def _cleanup(self, job: Job):
+        if job.workdir:
+            shutil.rmtree(job.workdir, ignore_errors=True)
+
+    def _dispatch(self):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                return
+            self._room.release()
+            job.status = "running"
+            job.started_at = time.time()
+            try:
+                if job.kind == "cloud":
+                    self._run_urls(job)
+                else:
+                    self._run_files(job)
+                job.status = "done"
+            except Exception as e:
+                job.status = "failed"
+                job.error = str(e)
+            finally:
+                job.finished_at = time.time()
+                self._cleanup(job)
+
+    def _run_urls(self, job: Job):
+        for result in scan_cloud_urls(job.tasks, max_workers=16, session=self.session,
+                                      cache=self.cloud_cache, scheduler=self.scheduler):
+            job.add(result)
+
+    def _run_files(self, job: Job):
+        prefix = job.workdir + os.sep
+        in_flight = {}
+        total = 0
+
+        def finish(done):
+            for future in done:
+                name = in_flight.pop(future)
+                try:
+                    record = future.result()
+                except Exception as e:
+                    record = {"file_name": name, "error": str(e)}
+                job.add(record)
+
+        for path, size, source in iter_tasks([job.tasks], self.max_file_size):
+            name = path[len(prefix):] if path.startswith(prefix) else path
+            total += 1
+            if source is None:
+                job.add({"file_name": name, "skipped": f"larger than {self.max_file_size} bytes"})
+            elif isinstance(source, Exception):
+                job.add({"file_name": name, "error": str(source)})
+            else:
+                in_flight[self.pool.submit(scan_task, name, source)] = name
+                if len(in_flight) >= 2 * self.workers:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    finish(done)
+        job.total = total
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            finish(done)
+
+    def health(self) -> dict:
+        with self._lock:
+            running = sum(1 for j in self.jobs.values() if j.status == "running")
+            return {"status": "ok", "workers": self.workers, "max_sync": self.max_sync, "queued": self.queue.qsize(),
+                    "queue_size": self.queue_size, "running": running, **self.stats}
+
+    def close(self):
+        self.queue.put(None)
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+
+def _read_body(handler, sink, limit: int) -> int:
+    """
+    Copy the request body into `sink` chunk by chunk (Content-Length or
+    chunked transfer encoding); RequestError 413 once it grows past `limit`.
+    """
+    received = 0
+
+    def take(n: int):
+        nonlocal received
+        while n:
+            data = handler.rfile.read(min(n, READ_SIZE))
+            if not data:
+                raise RequestError(400, "request body ended early")
+            received += len(data)
+            if received > limit:
+                handler.close_connection = True
+                raise RequestError(413, f"request body larger than {limit} bytes")
+            sink.write(data)
+            n -= len(data)
+
+    if "chunked" in handler.headers.get("Transfer-Encoding", "").lower():
+        while True:
+            try:
+                size = int(handler.rfile.readline().split(b";")[0].strip(), 16)
+            except ValueError:
+                handler.close_connection = True
+                raise RequestError(400, "malformed chunked body")
+            if not size:
+                while handler.rfile.readline().strip():
+                    pass  # trailers
+                return received
+            take(size)
+            handler.rfile.readline()
+    take(int(handler.headers.get("Content-Length") or 0))
+    return received
+
+def _query_number(query: dict, key: str, kind=int):
+    """
+    Non-negative number from the query string (0 when absent); RequestError 400 otherwise.
+    """
+    try:
+        value = kind(query.get(key, 0))
+    except ValueError:
+        raise RequestError(400, f"{key} must be a number")
+    if not (0 <= value and math.isfinite(value)):
+        raise RequestError(400, f"{key} must be a non-negative number")
+    return value
+
+def make_server(service: ScanService, host: str = "127.0.0.1", port: int = 8088,
+                sync_max_bytes: int = SYNC_MAX_BYTES, max_upload: int = MAX_UPLOAD_BYTES) -> ThreadingHTTPServer:
+    """
+    HTTP front end for `service` (call serve_forever() on it).
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status: int, body, headers: dict = None, content_type: str = "application/json"):
+            data = body if isinstance(body, bytes) else json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _read(self, sink, limit: int):
+            _read_body(self, sink, limit)
+            self.body_pending = False
+
+        def _json_body(self) -> dict:
+            buf = io.BytesIO()
+            self._read(buf, sync_max_bytes)
+            try:
+                body = json.loads(buf.getvalue() or b"{}")
+            except ValueError:
+                raise RequestError(400, "body is not valid JSON")
+            if not isinstance(body, dict):
+                raise RequestError(400, "body must be a JSON object")
+            return body
+
+        def _route(self, method: str):
+            parts = urlsplit(self.path)
+            path = parts.path.rstrip("/")
+            query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+            if method == "GET" and path == "/health":
+                return 200, service.health()
+            if method == "POST" and path == "/scan/file":
+                buf = io.BytesIO()
+                self._read(buf, sync_max_bytes)
+                return 200, service.scan_file(query.get("name", "upload.txt"), buf.getvalue())
+            if method == "POST" and path == "/scan/url":
+                url = self._json_body().get("url")
+                if not isinstance(url, str) or not url:
+                    raise RequestError(400, 'expected {"url": "..."}')
+                return 200, service.scan_url(url)
+            if method == "POST" and path == "/jobs":
+                job = self._submit(query)
+                return 202, job.status_dict(), {"Location": f"/jobs/{job.id}"}
+            if method == "GET" and path.startswith("/jobs/"):
+                job_id, _, tail = path[len("/jobs/"):].partition("/")
+                job = service.job(job_id)
+                if not tail:
+                    return 200, job.status_dict()
+                if tail == "results":
+                    records = job.results[_query_number(query, "offset"):]
+                    lines = "".join(json.dumps(r) + "\n" for r in records).encode()
+                    return 200, lines, {"X-Job-Status": job.status}, "application/x-ndjson"
+            raise RequestError(404, f"no route for {method} {parts.path}")
+
+        def _submit(self, query: dict) -> Job:
+            wait_seconds = _query_number(query, "wait", float)
+            if self.headers.get("Content-Type", "").startswith("application/json"):
+                urls = self._json_body().get("urls")
+                if not isinstance(urls, list) or not all(isinstance(u, str) for u in urls):
+                    raise RequestError(400, 'expected {"urls": ["...", ...]}')
+                return service.submit("cloud", urls, wait_seconds=wait_seconds)
+            name = os.path.basename(query.get("name", "")) or "upload.txt"
+            if not name.lower().endswith(SCANNABLE):
+                raise RequestError(415, f"cannot scan {name}; supported: {' '.join(SCANNABLE)}")
+            # Room in the queue first: a full queue must not cost reading the upload.
+            service.reserve(wait_seconds)
+            workdir = tempfile.mkdtemp(prefix="scan-job-")
+            path = os.path.join(workdir, name)
+            try:
+                with open(path, "wb") as fh:
+                    self._read(fh, max_upload)
+            except BaseException:
+                shutil.rmtree(workdir, ignore_errors=True)
+                service.unreserve()
+                raise
+            return service.submit("file", path, workdir, reserved=True)
+
+        def _handle(self, method: str):
+            self.body_pending = method == "POST"
+            try:
+                status, body, *rest = self._route(method)
+            except RequestError as e:
+                if self.body_pending:
+                    self.close_connection = True  # the unread body would be taken for the next request
+                self._send(e.status, {"error": str(e)}, e.headers)
+            except Exception as e:
+                self.close_connection = True
+                self._send(500, {"error": str(e)})
+            else:
+                self._send(status, body, *rest)
+
+        def do_GET(self):
+            self._handle("GET")
+
+        def do_POST(self):
+            self._handle("POST")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="HTTP API for file and cloud URL scans.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8088)
+    parser.add_argument("-w", "--workers", type=int, help="scan processes (default: available cores)")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE, help="jobs waiting before new ones get 429")
+    parser.add_argument("--max-sync", type=int, help="synchronous scans at once (default: workers)")
+    parser.add_argument("--sync-max-bytes", type=int, default=SYNC_MAX_BYTES,
+                        help="largest body scanned synchronously; bigger uploads go to /jobs")
+    parser.add_argument("--max-upload", type=int, default=MAX_UPLOAD_BYTES, help="largest request body accepted")
+    args = parser.parse_args(argv)
+
+    service = ScanService(args.workers, args.queue_size, args.max_sync)
+    server = make_server(service, args.host, args.port, args.sync_max_bytes, args.max_upload)
+    print(f"Serving on http://{args.host}:{server.server_port} with {service.workers} workers", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
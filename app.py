@@ -3,8 +3,8 @@ import json
 import pandas as pd
 import altair as alt
 
-from core.cloud_scanner import scan_cloud_url
-from core.data_scanner import scan_file
+from core.findings_store import default_store
+from core.scan_jobs import ScanJobs, wait_any
 
 # ---------------------------
 # Page Config
@@ -172,6 +172,38 @@ def risk_badge(risk):
     style_class = risk_styles.get(risk, "risk-low")
     return f"<span class='{style_class}'>{risk}</span>"
 
+# ---------------------------
+# Helper - Findings Store
+# ---------------------------
+@st.cache_resource
+def get_store():
+    # One SQLite connection for every session and rerun (see FINDINGS_DB)
+    return default_store()
+
+# ---------------------------
+# Helper - Background Scans
+# ---------------------------
+@st.cache_resource
+def get_jobs():
+    # One worker pool and result cache for every session and rerun
+    return ScanJobs()
+
+def show_jobs(jobs, show, label):
+    """
+    Show the results of the jobs that are done, in the order they finished,
+    under a progress bar. Returns the jobs still running; the page polls for
+    them with a rerun once every tab is drawn, so nothing here blocks.
+    """
+    done = sorted((job for job in jobs if job.done()), key=lambda job: job.finished or float("inf"))
+    st.progress(len(done) / len(jobs), text=f"{label}: {len(done)} of {len(jobs)} done")
+    for job in done:
+        result = job.result()
+        if not job.recorded and "error" not in result:
+            get_store().add(result, source="app")
+            job.recorded = True
+        show(result)
+    return [job for job in jobs if not job.done()]
+
 # ---------------------------
 # Header
 # ---------------------------
@@ -186,10 +218,57 @@ st.markdown("""
 # Tabs
 # ---------------------------
 tab1, tab2, tab3 = st.tabs(["☁️ Scan Cloud URL", "📂 Analyze File", "📊 Dashboard"])
+running = []  # background jobs not finished yet, from any tab
 
 # ---------------------------
 # Tab 1 - Cloud URL Scanner
 # ---------------------------
+def show_cloud_result(result):
+    if "error" in result:
+        st.error(f"⚠️ {result['url']}: {result['error']}")
+        return
+
+    st.markdown("### 🔍 Cloud Scan Result")
+
+    # Create result cards
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.markdown(f"""
+        <div class="metric-card">
+            <h4>📍 Target URL</h4>
+            <p><code>{result['url']}</code></p>
+            <p><strong>Host:</strong> {result['host']}</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col2:
+        st.markdown(f"""
+        <div class="metric-card">
+            <h4>📊 Scan Status</h4>
+            <p><strong>Status:</strong> {result['status']}</p>
+            <p><strong>HTTP Code:</strong> {result['http_code']}</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col3:
+        st.markdown(f"""
+        <div class="metric-card">
+            <h4>⚠️ Risk Assessment</h4>
+            <p><strong>Risk Level:</strong> {risk_badge(result['risk'])}</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+    if result.get("notes"):
+        st.markdown(f"""
+        <div style="background: #e8f4fd; border-left: 4px solid #0066cc; padding: 1rem; margin: 1rem 0; border-radius: 4px; color: #004085;">
+            <strong>🔍 Analysis Notes:</strong> {" • ".join(result["notes"])}
+        </div>
+        """, unsafe_allow_html=True)
+
+    with st.expander("📄 Detailed JSON Result"):
+        st.json(result)
+
 with tab1:
     st.subheader("☁️ Scan Cloud URL")
     st.markdown("Analyze cloud storage URLs for security misconfigurations and public exposure risks.")
@@ -197,8 +276,8 @@ with tab1:
     col1, col2 = st.columns([3, 1])
     
     with col1:
-        url = st.text_input(
-            "Enter a cloud/object URL (e.g., S3/Blob/GCS object URL)", 
+        urls_text = st.text_area(
+            "Enter cloud/object URLs, one per line (e.g., S3/Blob/GCS object URLs)", 
             "",
             placeholder="https://my-bucket.s3.amazonaws.com/data.csv"
         )
@@ -206,141 +285,155 @@ with tab1:
     with col2:
         st.write("")  # Spacing
         st.write("")  # Spacing
-        scan_button = st.button("🔎 Scan URL", type="primary", use_container_width=True)
+        scan_button = st.button("🔎 Scan URLs", type="primary", use_container_width=True)
     
     if scan_button:
-        if url:
-            with st.spinner("🔍 Scanning cloud URL for security issues..."):
-                result = scan_cloud_url(url)
-
-                st.markdown("### 🔍 Cloud Scan Result")
-                
-                # Create result cards
-                col1, col2, col3 = st.columns(3)
-                
-                with col1:
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <h4>📍 Target URL</h4>
-                        <p><code>{result['url']}</code></p>
-                        <p><strong>Host:</strong> {result['host']}</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                with col2:
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <h4>📊 Scan Status</h4>
-                        <p><strong>Status:</strong> {result['status']}</p>
-                        <p><strong>HTTP Code:</strong> {result['http_code']}</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                with col3:
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <h4>⚠️ Risk Assessment</h4>
-                        <p><strong>Risk Level:</strong> {risk_badge(result['risk'])}</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-
-                if result.get("notes"):
-                    st.markdown(f"""
-                    <div style="background: #e8f4fd; border-left: 4px solid #0066cc; padding: 1rem; margin: 1rem 0; border-radius: 4px; color: #004085;">
-                        <strong>🔍 Analysis Notes:</strong> {" • ".join(result["notes"])}
-                    </div>
-                    """, unsafe_allow_html=True)
-
-                with st.expander("📄 Detailed JSON Result"):
-                    st.json(result)
+        urls = list(dict.fromkeys(line.strip() for line in urls_text.splitlines() if line.strip()))
+        if urls:
+            st.session_state["url_jobs"] = [get_jobs().submit_url(url) for url in urls]
         else:
             st.error("⚠️ Please enter a valid URL to scan.")
 
+    if st.session_state.get("url_jobs"):
+        running += show_jobs(st.session_state["url_jobs"], show_cloud_result, "🔍 Scanning cloud URLs")
+
 # ---------------------------
 # Tab 2 - File Scanner
 # ---------------------------
+def show_file_result(result):
+    st.markdown(f"### 📄 {result['file_name']}")
+
+    if "error" in result:
+        st.error(f"⚠️ Could not scan this file: {result['error']}")
+        return
+    if result.get("incomplete"):
+        st.warning("⚠️ Not fully scanned (nested too deep, too large once decompressed or unreadable): "
+                   + ", ".join(result["incomplete"]))
+    if result["findings"]:
+        st.markdown(f"""
+        <div class="finding-card">
+            <strong>🚨 {result['total_issue_types']} types of sensitive data found!</strong>
+            Severity: {risk_badge(result['severity'])}
+        </div>
+        """, unsafe_allow_html=True)
+        
+        for f in result["findings"]:
+            st.markdown(f"""
+            <div class="finding-card">
+                <strong>🔍 {f['type']}</strong> ({f['count']} found)
+            </div>
+            """, unsafe_allow_html=True)
+    elif not result.get("incomplete"):
+        st.markdown("""
+        <div class="success-card">
+            <h4>✅ No Sensitive Data Found</h4>
+            <p>The uploaded file appears to be clean of detectable sensitive information.</p>
+        </div>
+        """, unsafe_allow_html=True)
+
 with tab2:
     st.subheader("📂 Analyze File")
     st.markdown("Upload files to scan for sensitive data like Aadhaar, PAN, emails, and other personal information.")
 
-    uploaded_file = st.file_uploader(
-        "Upload a file (TXT, PDF, DOCX)", 
-        type=["txt", "pdf", "docx"],
-        help="Supported formats: Text files (.txt), PDF documents (.pdf), Word documents (.docx)"
+    uploaded_files = st.file_uploader(
+        "Upload files (TXT, PDF, DOCX, XLSX, CSV, JSON, logs or archives of them)", 
+        type=["txt", "log", "pdf", "docx", "xlsx", "csv", "tsv", "json", "jsonl", "zip", "tar", "gz", "tgz"],
+        accept_multiple_files=True,
+        help="Documents, spreadsheets, CSV/JSON exports and logs; zip/tar/gzip archives are scanned member by member"
     )
     
-    if uploaded_file:
+    if uploaded_files:
         st.markdown(f"""
         <div class="info-card">
-            <strong>📁 File Selected:</strong> {uploaded_file.name} ({uploaded_file.size} bytes)
+            <strong>📁 Files Selected:</strong> {len(uploaded_files)} ({sum(f.size for f in uploaded_files)} bytes)
         </div>
         """, unsafe_allow_html=True)
         
-        if st.button("📑 Analyze File", type="primary", use_container_width=True):
-            with st.spinner("🔍 Analyzing file for sensitive data..."):
-                findings = scan_file(uploaded_file)
-
-                st.markdown("### 📄 File Scan Result")
-                
-                if findings:
-                    st.markdown(f"""
-                    <div class="finding-card">
-                        <strong>🚨 {len(findings)} types of sensitive data found!</strong>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    for f in findings:
-                        st.markdown(f"""
-                        <div class="finding-card">
-                            <strong>🔍 {f}</strong>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    
-                    st.markdown("### 💡 Recommendations")
-                    st.markdown("""
-                    <div class="recommendation-card">
-                        <strong>🛡️ Security Actions:</strong><br>
-                        • Remove or encrypt sensitive personal data<br>
-                        • Implement proper access controls<br>
-                        • Consider data anonymization techniques<br>
-                        • Regular security audits and monitoring
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                else:
-                    st.markdown("""
-                    <div class="success-card">
-                        <h4>✅ No Sensitive Data Found</h4>
-                        <p>The uploaded file appears to be clean of detectable sensitive information.</p>
-                    </div>
-                    """, unsafe_allow_html=True)
+        if st.button("📑 Analyze Files", type="primary", use_container_width=True):
+            st.session_state["file_jobs"] = [get_jobs().submit_file(f.name, f.getvalue()) for f in uploaded_files]
     else:
         st.markdown("""
         <div class="info-card">
-            <strong>👆 Please upload a file to begin analysis</strong><br>
-            Supported formats: TXT, PDF, DOCX
+            <strong>👆 Please upload files to begin analysis</strong><br>
+            Supported formats: TXT, PDF, DOCX, XLSX, CSV, JSON, logs and zip/tar archives
         </div>
         """, unsafe_allow_html=True)
 
+    file_jobs = st.session_state.get("file_jobs")
+    if file_jobs:
+        running += show_jobs(file_jobs, show_file_result, "🔍 Analyzing files for sensitive data")
+        if any(job.done() and job.result().get("findings") for job in file_jobs):
+            st.markdown("### 💡 Recommendations")
+            st.markdown("""
+            <div class="recommendation-card">
+                <strong>🛡️ Security Actions:</strong><br>
+                • Remove or encrypt sensitive personal data<br>
+                • Implement proper access controls<br>
+                • Consider data anonymization techniques<br>
+                • Regular security audits and monitoring
+            </div>
+            """, unsafe_allow_html=True)
+
 # ---------------------------
-# Tab 3 - Dashboard (sample demo)
+# Tab 3 - Dashboard
 # ---------------------------
 with tab3:
     st.subheader("📊 Security Dashboard")
 
-    # Demo risk data - replace with real database later
-    data = pd.DataFrame({
-        "Risk": ["High", "Medium", "Low"],
-        "Count": [12, 8, 5]
-    })
-
-    st.write("### Risk Distribution")
-    chart = alt.Chart(data).mark_arc().encode(
-        theta="Count",
-        color="Risk",
-        tooltip=["Risk", "Count"]
-    )
-    st.altair_chart(chart, use_container_width=True)
+    store = get_store()
+    risks = store.risk_distribution()
+    kinds = store.counters("targets")
 
-    st.write("### Risk Counts (Table)")
-    st.dataframe(data)
+    if not risks:
+        st.markdown("""
+        <div class="info-card">
+            <strong>No scans recorded yet.</strong><br>
+            Results from the Cloud URL and File tabs show up here.
+        </div>
+        """, unsafe_allow_html=True)
+    else:
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Targets scanned", sum(kinds.values()))
+        col2.metric("Files", kinds.get("file", 0))
+        col3.metric("Cloud URLs", kinds.get("cloud", 0))
+        col4.metric("Finding types", store.counters("findings").get("total", 0))
+
+        order = ["High", "Medium", "Low", "Unknown"]
+        data = pd.DataFrame({
+            "Risk": [r for r in order if r in risks],
+            "Count": [risks[r] for r in order if r in risks]
+        })
+
+        st.write("### Risk Distribution")
+        chart = alt.Chart(data).mark_arc().encode(
+            theta="Count",
+            color=alt.Color("Risk", sort=order),
+            tooltip=["Risk", "Count"]
+        )
+        st.altair_chart(chart, use_container_width=True)
+
+        st.write("### Risk Counts (Table)")
+        st.dataframe(data)
+
+        types = store.counters("type")
+        if types:
+            st.write("### Matches by Type")
+            type_data = pd.DataFrame({"Type": list(types), "Matches": list(types.values())})
+            st.altair_chart(alt.Chart(type_data).mark_bar().encode(
+                x=alt.X("Type", sort="-y"), y="Matches", tooltip=["Type", "Matches"]
+            ), use_container_width=True)
+
+        st.write("### Recent Targets")
+        severity = st.selectbox("Severity", ["All"] + [r for r in order if r in risks])
+        recent = pd.DataFrame(store.recent_targets(100, severity=None if severity == "All" else severity))
+        if not recent.empty:
+            recent["scanned_at"] = pd.to_datetime(recent["scanned_at"], unit="s")
+            st.dataframe(recent.drop(columns=["id"]), use_container_width=True)
+
+# ---------------------------
+# Poll background scans
+# ---------------------------
+# Every tab has been drawn; wait a moment for the next result and rerun to show it.
+if running:
+    wait_any(running, timeout=0.5)
+    st.rerun()
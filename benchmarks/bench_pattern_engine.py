@@ -0,0 +1,79 @@
+"""
+Benchmark the single-pass pattern engine against one re.findall pass per pattern.
+
+    python -m benchmarks.bench_pattern_engine
+
+The first table grows the document with the registry fixed, the second grows
+the registry (padding it with extra ID-style detectors) with the document fixed.
+"""
+import random
+import re
+import time
+
+from core.pattern_engine import PatternEngine
+from utils.regex_patterns import PATTERNS
+
+WORDS = ["invoice", "customer", "total", "shipping", "address", "the", "and", "report", "2024", "status"]
+
+
+def make_document(size: int, seed: int = 7) -> str:
+    rnd = random.Random(seed)
+    parts = []
+    length = 0
+    while length < size:
+        roll = rnd.random()
+        if roll < 0.005:
+            token = f"user{rnd.randint(1, 9999)}@example.com"
+        elif roll < 0.010:
+            token = f"9{rnd.randint(0, 10**9 - 1):09d}"
+        elif roll < 0.012:
+            token = f"{rnd.randint(1000, 9999)} {rnd.randint(1000, 9999)} {rnd.randint(1000, 9999)}"
+        else:
+            token = rnd.choice(WORDS)
+        parts.append(token)
+        parts.append("\n" if rnd.random() < 0.08 else " ")
+        length += len(token) + 1
+    return "".join(parts)
+
+
+def padded_registry(extra: int) -> dict:
+    patterns = dict(PATTERNS)
+    for i in range(extra):
+        patterns[f"Custom{i}"] = rf"\bCUST{i}-\d{{6}}\b"
+    return patterns
+
+
+def _best_of(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def time_findall(patterns: dict, text: str) -> float:
+    compiled = [re.compile(p, re.MULTILINE) for p in patterns.values()]
+    return _best_of(lambda: [rx.findall(text) for rx in compiled])
+
+
+def time_engine(patterns: dict, text: str) -> float:
+    engine = PatternEngine(patterns)
+    return _best_of(lambda: sum(1 for _ in engine.finditer(text)))
+
+
+def main():
+    print(f"{'doc size':>10} {'patterns':>9} {'findall s':>10} {'engine s':>9}")
+    for size in (250_000, 500_000, 1_000_000, 2_000_000):
+        text = make_document(size)
+        print(f"{size:>10} {len(PATTERNS):>9} {time_findall(PATTERNS, text):>10.3f} {time_engine(PATTERNS, text):>9.3f}")
+
+    print()
+    text = make_document(1_000_000)
+    for extra in (0, 10, 25, 50, 100):
+        patterns = padded_registry(extra)
+        print(f"{len(text):>10} {len(patterns):>9} {time_findall(patterns, text):>10.3f} {time_engine(patterns, text):>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Synthetic scan corpora: filler prose with PII sprinkled in at a chosen
+density, rendered as TXT, PDF or DOCX, plus adversarial inputs.
+
+    python -m benchmarks.corpus OUT_DIR [--size BYTES] [--density RATE] [--files N]
+"""
+import argparse
+import io
+import os
+import random
+import zipfile
+from xml.sax.saxutils import escape
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+WORDS = ["invoice", "customer", "total", "shipping", "address", "the", "and", "report", "2024", "status",
+         "account", "review", "balance", "quarterly", "owner", "pending", "approved", "region"]
+
+
+def _pii(rnd: random.Random) -> str:
+    kind = rnd.randrange(5)
+    if kind == 0:
+        return f"user{rnd.randint(1, 99999)}@example.com"
+    if kind == 1:
+        return f"9{rnd.randint(0, 10**9 - 1):09d}"
+    if kind == 2:
+        return f"{rnd.randint(1000, 9999)} {rnd.randint(1000, 9999)} {rnd.randint(1000, 9999)}"
+    if kind == 3:
+        letters = "".join(rnd.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(5))
+        return f"{letters}{rnd.randint(1000, 9999)}{rnd.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ')}"
+    return f"Secret{rnd.randint(10, 99)}@{rnd.randint(1000, 9999)}"
+
+
+def make_text(size: int, density: float = 0.01, seed: int = 7, line_words: int = 12) -> str:
+    """
+    About `size` characters of text where a fraction `density` of the tokens
+    is PII (emails, phones, Aadhaar, PAN, passwords), `line_words` per line.
+    """
+    rnd = random.Random(seed)
+    parts = []
+    length = 0
+    words = 0
+    while length < size:
+        token = _pii(rnd) if rnd.random() < density else rnd.choice(WORDS)
+        words += 1
+        sep = "\n" if words % line_words == 0 else " "
+        parts.append(token + sep)
+        length += len(token) + 1
+    return "".join(parts)
+
+
+def make_adversarial_text(size: int) -> str:
+    """
+    Worst cases for the matchers: one huge line of password-ish characters
+    with no whitespace, and long digit runs that almost look like IDs.
+    """
+    half = size // 2
+    noisy = ("Ab1!" * (half // 4 + 1))[:half]
+    digits = ("1234 5678 901" * (half // 13 + 1))[:size - half]
+    return noisy + digits
+
+
+def make_pdf(text: str, lines_per_page: int = 48) -> bytes:
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf, pagesize=A4)
+    height = A4[1]
+    lines = text.splitlines()
+    for start in range(0, len(lines), lines_per_page):
+        y = height - 40
+        for line in lines[start:start + lines_per_page]:
+            c.drawString(30, y, line[:150])
+            y -= 16
+        c.showPage()
+    c.save()
+    return buf.getvalue()
+
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+_RELS = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="word/document.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+    '</Relationships>'
+)
+
+
+def make_docx(text: str) -> bytes:
+    """
+    A minimal valid DOCX with one paragraph per line of `text`.
+    """
+    body = "".join(f"<w:p><w:r><w:t xml:space=\"preserve\">{escape(line)}</w:t></w:r></w:p>"
+                   for line in text.splitlines())
+    document = ('<?xml version="1.0" encoding="UTF-8"?>'
+                '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                f"<w:body>{body}</w:body></w:document>")
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        zf.writestr("_rels/.rels", _RELS)
+        zf.writestr("word/document.xml", document)
+    return buf.getvalue()
+
+
+def make_corpus(size: int = 1_000_000, density: float = 0.01, seed: int = 7) -> dict:
+    """
+    {file name: bytes} with one document of each kind, all about `size` characters of text.
+    """
+    text = make_text(size, density, seed)
+    return {
+        "corpus.txt": text.encode(),
+        "corpus.pdf": make_pdf(text),
+        "corpus.docx": make_docx(text),
+        "adversarial.txt": make_adversarial_text(size).encode(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("out_dir")
+    parser.add_argument("--size", type=int, default=1_000_000, help="characters of text per document")
+    parser.add_argument("--density", type=float, default=0.01, help="fraction of tokens that are PII")
+    parser.add_argument("--files", type=int, default=1, help="documents of each kind")
+    args = parser.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    for n in range(args.files):
+        for name, data in make_corpus(args.size, args.density, seed=n).items():
+            stem, ext = os.path.splitext(name)
+            with open(os.path.join(args.out_dir, f"{stem}-{n}{ext}"), "wb") as fh:
+                fh.write(data)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Load test for the HTTP scanning API (api.py): concurrent clients send
+synchronous file scans, URL scans or batch jobs and the script reports
+throughput and latency percentiles. Without --url a local instance is started
+in-process (and, for --mode url, a mock storage endpoint to probe).
+
+    python -m benchmarks.load_test [--url http://127.0.0.1:8088] [--mode file|url|job]
+                                   [--requests N] [--concurrency C] [--size BYTES] [--out load.json]
+
+A 429 answer (backpressure) is retried after its Retry-After, up to --retries
+times. Rejections are reported as their own rate and only the attempt that
+succeeded counts towards latency, so the percentiles describe the service
+rather than the time spent turned away. By default as many clients run as the
+server has synchronous slots (16 for --mode job).
+"""
+import argparse
+import contextlib
+import http.client
+import json
+import math
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from benchmarks.corpus import make_text
+
+
+def percentile(values: list, q: float) -> float:
+    """
+    The q-th percentile (0-100) of `values` by nearest rank; 0.0 when empty.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), math.ceil(q / 100 * len(ordered))))
+    return ordered[rank - 1]
+
+
+class _Client:
+    """
+    One keep-alive connection per client thread.
+    """
+
+    def __init__(self, base: str):
+        parts = urlsplit(base)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self._local = threading.local()
+
+    def request(self, method: str, path: str, body=None, headers=None):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=120)
+        try:
+            conn.request(method, path, body, headers or {})
+            resp = conn.getresponse()
+            return resp.status, resp.read(), dict(resp.getheaders())
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            self._local.conn = None
+            raise
+
+
+# Each call(n) returns (status, headers) of the answer that decided it.
+
+def _file_call(client: _Client, body: bytes):
+    def call(n: int):
+        status, _, headers = client.request("POST", f"/scan/file?name=load{n}.txt", body)
+        return status, headers
+    return call
+
+
+def _url_call(client: _Client, target: str):
+    def call(n: int):
+        body = json.dumps({"url": f"{target}/public/{n}.csv"})
+        status, _, headers = client.request("POST", "/scan/url", body, {"Content-Type": "application/json"})
+        return status, headers
+    return call
+
+
+def _job_call(client: _Client, body: bytes, poll: float = 0.02):
+    # Latency of a job is submission to completion, polling its status
+    def call(n: int):
+        status, data, headers = client.request("POST", f"/jobs?name=load{n}.txt", body)
+        if status != 202:
+            return status, headers
+        job_id = json.loads(data)["id"]
+        while True:
+            status, data, headers = client.request("GET", f"/jobs/{job_id}")
+            state = json.loads(data)["status"]
+            if state in ("done", "failed"):
+                return (200 if state == "done" else 500), headers
+            time.sleep(poll)
+    return call
+
+
+def run_load(call, requests: int, concurrency: int, retries: int = 5) -> dict:
+    """
+    Run call(n) for n in range(requests) on `concurrency` threads, retrying a
+    429 after its Retry-After up to `retries` times, and summarize the
+    latencies of the attempts that succeeded. "rejected" counts requests
+    still turned away after the last retry and "rejection_rate" is the
+    share of all attempts answered 429.
+    """
+    latencies = []
+    statuses = {}
+    counts = {"attempts": 0, "rejections": 0}
+    lock = threading.Lock()
+
+    def one(n: int):
+        for attempt in range(retries + 1):
+            start = time.perf_counter()
+            try:
+                status, headers = call(n)
+            except Exception:
+                status, headers = "error", {}
+            elapsed = time.perf_counter() - start
+            with lock:
+                counts["attempts"] += 1
+                counts["rejections"] += status == 429
+            if status != 429 or attempt == retries:
+                break
+            time.sleep(float(headers.get("Retry-After") or 1))
+        with lock:
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == 200:
+                latencies.append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    seconds = time.perf_counter() - start
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "seconds": seconds,
+        "ok": len(latencies),
+        "rejected": statuses.get(429, 0),
+        "errors": requests - len(latencies) - statuses.get(429, 0),
+        "attempts": counts["attempts"],
+        "rejection_rate": counts["rejections"] / counts["attempts"] if counts["attempts"] else 0.0,
+        "statuses": {str(k): v for k, v in statuses.items()},
+        "throughput": len(latencies) / seconds if seconds else 0.0,
+        "latency": {f"p{q}": percentile(latencies, q) for q in (50, 90, 95, 99)} | {"max": max(latencies, default=0.0)},
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Load test for the scanning API")
+    parser.add_argument("--url", help="base URL of a running api.py (default: start one here)")
+    parser.add_argument("--mode", choices=("file", "url", "job"), default="file", help="what each request does")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int,
+                        help="client threads (default: the server's synchronous slots, 16 for --mode job)")
+    parser.add_argument("--retries", type=int, default=5, help="retries of a request answered 429")
+    parser.add_argument("--size", type=int, default=50_000, help="characters per uploaded document")
+    parser.add_argument("--density", type=float, default=0.01, help="fraction of tokens that are PII")
+    parser.add_argument("--workers", type=int, help="scan processes of the local instance")
+    parser.add_argument("--out", help="also write the summary here as JSON")
+    args = parser.parse_args(argv)
+
+    with contextlib.ExitStack() as stack:
+        base = args.url
+        if base is None:
+            from api import ScanService, make_server
+            service = ScanService(args.workers, queue_size=max(32, args.concurrency or 16))
+            stack.callback(service.close)
+            server = make_server(service, port=0)
+            stack.callback(server.server_close)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            stack.callback(server.shutdown)
+            base = f"http://127.0.0.1:{server.server_port}"
+
+        client = _Client(base)
+        body = make_text(args.size, args.density).encode()
+        if args.mode == "url":
+            from tests.http_stub import StubServer
+            stub = stack.enter_context(StubServer(lambda method, path, headers: (200, {"Content-Type": "text/csv"}, b"a,b\n")))
+            call = _url_call(client, stub.url(""))
+        elif args.mode == "job":
+            call = _job_call(client, body)
+        else:
+            call = _file_call(client, body)
+
+        health = json.loads(client.request("GET", "/health")[1])
+        concurrency = args.concurrency or (16 if args.mode == "job" else health.get("max_sync") or health["workers"])
+        summary = {"mode": args.mode, "url": base, **run_load(call, args.requests, concurrency, args.retries)}
+
+    latency = summary["latency"]
+    print(f"{summary['mode']} x{summary['concurrency']}: {summary['ok']}/{summary['requests']} ok, "
+          f"{summary['rejected']} rejected, {summary['errors']} errors in {summary['seconds']:.2f}s "
+          f"({summary['throughput']:.1f} req/s); {summary['rejection_rate']:.1%} of {summary['attempts']} attempts got 429")
+    print("latency " + "  ".join(f"{k}={v * 1000:.1f}ms" for k, v in latency.items()))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(summary, fh, indent=2)
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
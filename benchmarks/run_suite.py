@@ -0,0 +1,184 @@
+"""
+End-to-end scan benchmark: cold import time, extraction, matching and report
+building on a synthetic corpus, a large multi-target PDF report, plus cloud
+URL probing against a local mock server.
+
+    python -m benchmarks.run_suite [--size BYTES] [--density RATE] [--report-findings N] [--out results.json]
+                                   [--baseline previous.json] [--threshold 0.2]
+
+Results are written as JSON. With --baseline, every timing more than
+`threshold` slower than the baseline is reported and the exit code is 1.
+"""
+import argparse
+import io
+import json
+import platform
+import subprocess
+import sys
+import time
+
+from benchmarks.corpus import make_corpus
+from core.cloud_scanner import scan_cloud_url, scan_cloud_urls
+from core.data_scanner import scan_file, triage_file
+from core.host_scheduler import HostScheduler
+from core.report_generator import build_csv_report, build_pdf_report, write_pdf_report
+from tests.http_stub import StubServer
+from utils.file_loader import load_text_from_uploaded
+
+
+def _upload(name: str, data: bytes):
+    f = io.BytesIO(data)
+    f.name = name
+    return f
+
+
+def _best_of(fn, repeat: int):
+    best = float("inf")
+    value = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, value
+
+
+def bench_files(size: int, density: float, repeat: int) -> list:
+    results = []
+    for name, data in make_corpus(size, density).items():
+        seconds, text = _best_of(lambda: load_text_from_uploaded(_upload(name, data)), repeat)
+        results.append({"name": f"extract/{name}", "seconds": seconds, "bytes": len(data), "chars": len(text)})
+
+        seconds, scan = _best_of(lambda: scan_file(_upload(name, data)), repeat)
+        hits = sum(f["count"] for f in scan["findings"])
+        results.append({"name": f"scan/{name}", "seconds": seconds, "bytes": len(data), "unique_hits": hits})
+        seconds, verdict = _best_of(lambda: triage_file(_upload(name, data)), repeat)
+        results.append({"name": f"triage/{name}", "seconds": seconds, "bytes": len(data),
+                        "stopped": verdict["triage"]["stopped"]})
+
+        combined = {"file_scan": scan, "cloud_scan": {"url": "https://bucket.s3.amazonaws.com/k", "status": "Cloud object accessible",
+                                                      "http_code": 200, "risk": "High"}}
+        seconds, csv = _best_of(lambda: build_csv_report(combined), repeat)
+        results.append({"name": f"report_csv/{name}", "seconds": seconds, "bytes": len(csv)})
+        seconds, pdf = _best_of(lambda: build_pdf_report(combined), repeat)
+        results.append({"name": f"report_pdf/{name}", "seconds": seconds, "bytes": len(pdf)})
+    return results
+
+
+def bench_large_report(findings: int) -> list:
+    """
+    A multi-target PDF report with `findings` findings (four per file) rendered into a null sink.
+    """
+    def results():
+        for i in range(findings // 4):
+            yield {"file_name": f"dir/file{i}.txt", "severity": ("High", "Medium", "Low")[i % 3],
+                   "findings": [{"type": t, "count": i % 50 + 1, "samples": [f"user{i}@example.com", "9876543210"]}
+                                for t in ("Email", "Phone", "PAN", "Password")]}
+
+    sink = io.BytesIO()
+    start = time.perf_counter()
+    pages = write_pdf_report(results(), sink)
+    seconds = time.perf_counter() - start
+    return [{"name": f"report_pdf/{findings}_findings", "seconds": seconds, "pages": pages, "bytes": sink.tell()}]
+
+
+def bench_imports(modules=("core.data_scanner", "cli")) -> list:
+    """
+    Cold import time of the text-scan path and the CLI, each in a fresh interpreter.
+    """
+    results = []
+    for module in modules:
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                              capture_output=True, text=True, check=True)
+        for line in proc.stderr.splitlines():
+            parts = line.split("|")
+            if len(parts) == 3 and parts[2] == " " + module:
+                results.append({"name": f"import/{module}", "seconds": int(parts[1]) / 1e6})
+    return results
+
+
+def bench_cloud(urls: int, latency: float, workers: int) -> list:
+    def respond(method, path, headers):
+        time.sleep(latency)
+        return (200, {"Content-Length": "1024"}, b"x" * 1024) if path.startswith("/public") else (403, {}, b"")
+
+    results = []
+    with StubServer(respond) as server:
+        targets = [server.url(f"/{'public' if i % 4 else 'private'}/{i}") for i in range(urls)]
+        seq = targets[: max(urls // 10, 1)]
+        start = time.perf_counter()
+        for url in seq:
+            scan_cloud_url(url)
+        seconds = time.perf_counter() - start
+        results.append({"name": "cloud/sequential", "seconds": seconds, "urls": len(seq), "urls_per_second": len(seq) / seconds})
+
+        # Unthrottled, so the number measures the scanner rather than the politeness limits
+        scheduler = HostScheduler(rate=1e9, burst=urls, concurrency=workers, max_concurrency=workers)
+        start = time.perf_counter()
+        done = sum(1 for _ in scan_cloud_urls(targets, max_workers=workers, scheduler=scheduler))
+        seconds = time.perf_counter() - start
+        results.append({"name": f"cloud/batch_{workers}_workers", "seconds": seconds, "urls": done,
+                        "urls_per_second": done / seconds})
+    return results
+
+
+def compare(results: list, baseline: list, threshold: float, min_delta: float = 0.005) -> list:
+    """
+    (name, old_seconds, new_seconds) for each timing slower than the baseline
+    by more than `threshold` (relative) and `min_delta` seconds, so timer noise
+    on tiny stages is not reported.
+    """
+    old = {r["name"]: r["seconds"] for r in baseline}
+    return [(r["name"], old[r["name"]], r["seconds"]) for r in results
+            if r["name"] in old and r["seconds"] > old[r["name"]] * (1 + threshold)
+            and r["seconds"] - old[r["name"]] > min_delta]
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Scan pipeline benchmark suite")
+    parser.add_argument("--size", type=int, default=1_000_000, help="characters of text per document")
+    parser.add_argument("--density", type=float, default=0.01, help="fraction of tokens that are PII")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per timing (best is kept)")
+    parser.add_argument("--report-findings", type=int, default=10_000, help="findings in the large PDF report benchmark")
+    parser.add_argument("--urls", type=int, default=400, help="URLs for the cloud probe benchmark")
+    parser.add_argument("--latency", type=float, default=0.005, help="mock server latency per request (s)")
+    parser.add_argument("--workers", type=int, default=16, help="threads for the batch cloud scan")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown before flagging (0.2 = 20%%)")
+    parser.add_argument("--min-delta", type=float, default=0.005, help="ignore slowdowns smaller than this many seconds")
+    args = parser.parse_args(argv)
+
+    results = (bench_imports() + bench_files(args.size, args.density, args.repeat) + bench_large_report(args.report_findings)
+               + bench_cloud(args.urls, args.latency, args.workers))
+    report = {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(), "commit": _commit(),
+                 "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "params": vars(args)},
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+
+    print(f"{'benchmark':<34} {'seconds':>9}")
+    for r in results:
+        print(f"{r['name']:<34} {r['seconds']:>9.4f}")
+    print(f"results written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            slower = compare(results, json.load(fh)["results"], args.threshold, args.min_delta)
+        for name, before, after in slower:
+            print(f"REGRESSION {name}: {before:.4f}s -> {after:.4f}s ({after / before - 1:+.0%})")
+        if slower:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
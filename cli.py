@@ -0,0 +1,264 @@
+"""
+Headless batch scanner: walks files, directories and archives and writes one
+JSON line per scanned file (the scan_file() result shape) as each one finishes.
+
+    python cli.py DATA_DIR backups.zip -o findings.jsonl --workers 8
+"""
+import argparse
+import gzip
+import io
+import json
+import multiprocessing
+import os
+import sys
+import tarfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from core.cloud_classifier import classify_bulk
+from core.data_scanner import TriageBudget, scan_file, triage_file
+from core.report_generator import REPORT_WRITERS
+
+TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+# Archives found inside archives are handed to a worker whole and read by utils.file_loader
+SCANNABLE = (".txt", ".md", ".log", ".csv", ".tsv", ".json", ".jsonl", ".ndjson", ".pdf", ".docx", ".xlsx",
+             ".zip", ".gz", ".bz2", ".xz") + TAR_SUFFIXES
+# Files above this size are reported as skipped instead of being loaded by a worker.
+DEFAULT_MAX_FILE_SIZE = 256 << 20
+# Workers are replaced after this many files so memory fragmentation can't pile up.
+DEFAULT_TASKS_PER_CHILD = 200
+
+class _Upload:
+    """
+    Just enough of Streamlit's UploadedFile for scan_file(): a name, read() for
+    streamed TXT and getvalue() for formats that need the whole file.
+    """
+
+    def __init__(self, name: str, stream):
+        self.name = name
+        self._stream = stream
+
+    def read(self, size: int = -1) -> bytes:
+        return self._stream.read(size)
+
+    def getvalue(self) -> bytes:
+        return self._stream.read()
+
+def available_cores() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+def _scannable(name: str) -> bool:
+    return name.lower().endswith(SCANNABLE)
+
+def _is_tar(name: str) -> bool:
+    return name.lower().endswith(TAR_SUFFIXES)
+
+def _walk(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    yield os.path.join(root, name)
+        else:
+            yield path
+
+def iter_tasks(paths, max_file_size: int = DEFAULT_MAX_FILE_SIZE):
+    """
+    Yield (display_name, size, source) for every scannable file under `paths`.
+    `source` is a path, (zip_path, member) or the bytes of a tar member (tar
+    members can only be reached in order, so they are read here). Oversized
+    files come through with source None.
+    """
+    for path in _walk(paths):
+        lower = path.lower()
+        try:
+            if lower.endswith(".zip"):
+                with zipfile.ZipFile(path) as zf:
+                    for info in zf.infolist():
+                        if not info.is_dir() and _scannable(info.filename):
+                            too_big = info.file_size > max_file_size
+                            yield f"{path}!{info.filename}", info.file_size, None if too_big else (path, info.filename)
+            elif _is_tar(lower):
+                with tarfile.open(path, "r:*") as tf:
+                    for info in tf:
+                        if info.isfile() and _scannable(info.name):
+                            if info.size > max_file_size:
+                                yield f"{path}!{info.name}", info.size, None
+                            else:
+                                yield f"{path}!{info.name}", info.size, tf.extractfile(info).read()
+            elif _scannable(lower):
+                size = os.path.getsize(path)
+                yield path, size, None if size > max_file_size else path
+        except (OSError, zipfile.BadZipFile, tarfile.TarError) as e:
+            yield path, 0, e
+
+def _scan(upload, max_hits: int = None, triage: TriageBudget = None) -> dict:
+    if triage is not None:
+        return triage_file(upload, triage)
+    return scan_file(upload, workers=1, max_hits=max_hits)
+
+def scan_task(name: str, source, max_hits: int = None, triage: TriageBudget = None) -> dict:
+    """
+    Scan one task from iter_tasks(); runs in a worker process. With a
+    `triage` budget the file is only triaged (see triage_file).
+    """
+    if isinstance(source, bytes):
+        result = _scan(_Upload(name, io.BytesIO(source)), max_hits, triage)
+    elif isinstance(source, tuple):
+        archive, member = source
+        with zipfile.ZipFile(archive) as zf, zf.open(member) as stream:
+            result = _scan(_Upload(member, stream), max_hits, triage)
+    else:
+        with open(source, "rb") as stream:
+            result = _scan(_Upload(source, stream), max_hits, triage)
+    result["file_name"] = name
+    return result
+
+def _make_pool(workers: int, tasks_per_child: int):
+    if tasks_per_child and sys.version_info >= (3, 11):
+        return ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                                   max_tasks_per_child=tasks_per_child)
+    return ProcessPoolExecutor(workers)
+
+def iter_batch(paths, stats: dict, workers: int = None, max_hits: int = None,
+               max_file_size: int = DEFAULT_MAX_FILE_SIZE, tasks_per_child: int = DEFAULT_TASKS_PER_CHILD,
+               triage: TriageBudget = None):
+    """
+    Scan everything under `paths` on a process pool and yield one record per
+    file as it finishes (completion order): a scan_file() result (a
+    triage_file() one with a `triage` budget), or {"file_name", "error"} /
+    {"file_name", "skipped"}. At most two files per worker are in flight.
+    Counts are kept in `stats`; "incomplete" counts files the extraction
+    limits kept from being read in full.
+    """
+    workers = workers or available_cores()
+    stats.update(files=0, bytes=0, skipped=0, errors=0, incomplete=0)
+
+    def finish(done):
+        for future in done:
+            name, size = in_flight.pop(future)
+            try:
+                record = future.result()
+                stats["files"] += 1
+                stats["bytes"] += size
+                stats["incomplete"] += bool(record.get("incomplete"))
+            except Exception as e:
+                stats["errors"] += 1
+                record = {"file_name": name, "error": str(e)}
+            yield record
+
+    in_flight = {}
+    with _make_pool(workers, tasks_per_child) as pool:
+        for name, size, source in iter_tasks(paths, max_file_size):
+            if source is None:
+                stats["skipped"] += 1
+                yield {"file_name": name, "skipped": f"larger than {max_file_size} bytes"}
+                continue
+            if isinstance(source, Exception):
+                stats["errors"] += 1
+                yield {"file_name": name, "error": str(source)}
+                continue
+            in_flight[pool.submit(scan_task, name, source, max_hits, triage)] = (name, size)
+            if len(in_flight) >= 2 * workers:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                yield from finish(done)
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            yield from finish(done)
+
+def run_batch(paths, out, workers: int = None, max_hits: int = None,
+              max_file_size: int = DEFAULT_MAX_FILE_SIZE, tasks_per_child: int = DEFAULT_TASKS_PER_CHILD,
+              fmt: str = "jsonl", triage: TriageBudget = None) -> dict:
+    """
+    Run iter_batch() and stream its records to `out` as JSON Lines, CSV
+    rows (fmt="csv") or a paginated PDF report (fmt="pdf", binary `out`).
+    Returns throughput stats.
+    """
+    stats = {}
+    start = time.perf_counter()
+    records = iter_batch(paths, stats, workers, max_hits, max_file_size, tasks_per_child, triage)
+    write = REPORT_WRITERS.get(fmt)
+    if fmt == "pdf":
+        write(records, out)
+    else:
+        write(records, out, flush=True)
+
+    elapsed = time.perf_counter() - start
+    stats["seconds"] = round(elapsed, 3)
+    stats["files_per_second"] = round(stats["files"] / elapsed, 2) if elapsed else 0.0
+    stats["mb_per_second"] = round(stats["bytes"] / elapsed / (1 << 20), 2) if elapsed else 0.0
+    return stats
+
+def _log_lines(paths):
+    for path in _walk(paths):
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8", errors="replace") as fh:
+            yield from fh
+
+def run_classify(paths, out, per: str = "object") -> dict:
+    """
+    Offline mode: pull URLs out of log files (plain or .gz), write one JSON
+    line per distinct cloud storage object (or bucket) and return counts.
+    No request is sent.
+    """
+    stats = {"lines": 0, "cloud_urls": 0}
+    start = time.perf_counter()
+
+    def counted(lines):
+        for line in lines:
+            stats["lines"] += 1
+            yield line
+
+    for url, info in classify_bulk(counted(_log_lines(paths)), per):
+        stats["cloud_urls"] += 1
+        out.write(json.dumps({"url": url, **info}) + "\n")
+    elapsed = time.perf_counter() - start
+    stats["seconds"] = round(elapsed, 3)
+    stats["lines_per_second"] = round(stats["lines"] / elapsed) if elapsed else 0
+    return stats
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Scan documents, spreadsheets, logs, directories and zip/tar archives for sensitive data.")
+    parser.add_argument("paths", nargs="+", help="files, directories or archives to scan")
+    parser.add_argument("-o", "--output", help="write results here instead of stdout")
+    parser.add_argument("--format", choices=("jsonl", "csv", "pdf"), default="jsonl", help="output format (default: jsonl)")
+    parser.add_argument("-w", "--workers", type=int, help="worker processes (default: available cores)")
+    parser.add_argument("--max-hits", type=int, help="stop scanning a file after this many matches")
+    parser.add_argument("--triage", action="store_true",
+                        help="only decide whether each file holds High-severity data, stopping at the first hit")
+    parser.add_argument("--time-budget", type=float, help="with --triage, seconds allowed per file")
+    parser.add_argument("--byte-budget", type=int, help="with --triage, characters of text read per file")
+    parser.add_argument("--max-file-size", type=int, default=DEFAULT_MAX_FILE_SIZE, help="skip files larger than this many bytes")
+    parser.add_argument("--classify-urls", choices=("object", "bucket"),
+                        help="treat paths as logs and list the distinct cloud objects/buckets their URLs point at (offline)")
+    args = parser.parse_args(argv)
+
+    if args.format == "pdf" and not args.classify_urls:
+        out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    else:
+        out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        if args.classify_urls:
+            stats = run_classify(args.paths, out, args.classify_urls)
+        else:
+            triage = TriageBudget(args.time_budget, args.byte_budget, args.max_hits) if args.triage else None
+            stats = run_batch(args.paths, out, args.workers, args.max_hits, args.max_file_size, fmt=args.format,
+                              triage=triage)
+    finally:
+        if out not in (sys.stdout, sys.stdout.buffer):
+            out.close()
+    if args.classify_urls:
+        print(f"{stats['lines']} lines in {stats['seconds']}s ({stats['lines_per_second']} lines/s): "
+              f"{stats['cloud_urls']} distinct cloud {args.classify_urls}s", file=sys.stderr)
+        return 0
+    print(f"{stats['files']} files, {stats['bytes'] / (1 << 20):.1f} MB in {stats['seconds']}s: "
+          f"{stats['files_per_second']} files/s, {stats['mb_per_second']} MB/s "
+          f"({stats['skipped']} skipped, {stats['incomplete']} not fully scanned, {stats['errors']} errors)",
+          file=sys.stderr)
+    return 1 if stats["errors"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
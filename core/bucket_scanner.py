@@ -0,0 +1,191 @@
+import requests
+import xml.etree.ElementTree as ET
+from urllib.parse import quote, unquote, urlparse
+from core.cloud_scanner import DEFAULT_TIMEOUT, make_session, scan_cloud_urls
+from core.host_scheduler import HostScheduler
+
+# How each provider lists a bucket / container: extra query parameters, the
+# root element of a listing page, the element holding one object, its key and
+# size, the continuation element and the query parameter that carries it to the next page.
+PROVIDERS = {
+    "s3": {"query": {"list-type": "2"}, "root": "ListBucketResult", "item": "Contents", "key": "Key",
+           "size": "Size", "token": "NextContinuationToken", "param": "continuation-token"},
+    "gcs": {"query": {}, "root": "ListBucketResult", "item": "Contents", "key": "Key", "size": "Size",
+            "token": "NextMarker", "param": "marker"},
+    "azure": {"query": {"restype": "container", "comp": "list"}, "root": "EnumerationResults", "item": "Blob",
+              "key": "Name", "size": "Content-Length", "token": "NextMarker", "param": "marker"},
+}
+
+class NotAListing(Exception):
+    """
+    A listing request was answered with something other than a listing page
+    (a website, a login page, another service's XML).
+    """
+
+def detect_provider(url: str) -> str:
+    host = urlparse(url).netloc.lower()
+    if host.endswith("blob.core.windows.net"):
+        return "azure"
+    if host.endswith("storage.googleapis.com"):
+        return "gcs"
+    return "s3"  # AWS and the S3-compatible stores (Spaces, OSS, MinIO, ...)
+
+def _base(url: str) -> str:
+    return url.split("?", 1)[0].rstrip("/") + "/"
+
+def _list_url(base: str) -> str:
+    # "https://bucket.s3.amazonaws.com/" is listed as is, "https://host/container/" without the slash
+    return base if urlparse(base).path in ("", "/") else base[:-1]
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+def _iter_listing(response, spec: dict, state: dict):
+    """
+    Yield (key, size) from one streamed listing page, dropping every object
+    element once read so a page of any size is parsed in constant memory.
+    The continuation token, if any, is left in state["token"]. NotAListing
+    if the document is not the provider's listing.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    stack = []
+    for chunk in response.iter_content(chunk_size=64 * 1024):
+        parser.feed(chunk)
+        for event, elem in parser.read_events():
+            if event == "start":
+                if not stack and _local(elem.tag) != spec["root"]:
+                    raise NotAListing(f"expected a {spec['root']} document, got <{_local(elem.tag)}>")
+                stack.append(elem)
+                continue
+            stack.pop()
+            tag = _local(elem.tag)
+            if tag == spec["item"]:
+                key = size = None
+                for child in elem.iter():
+                    name = _local(child.tag)
+                    if name == spec["key"]:
+                        key = child.text
+                    elif name == spec["size"] and child.text and child.text.isdigit():
+                        size = int(child.text)
+                if stack:
+                    stack[-1].remove(elem)
+                if key is not None:
+                    yield key, size
+            elif tag == spec["token"] and elem.text:
+                state["token"] = elem.text
+    parser.close()
+
+def list_bucket(url: str, session: requests.Session = None, provider: str = None,
+                timeout: float = DEFAULT_TIMEOUT, max_keys: int = None):
+    """
+    Yield (key, size) for the objects of a bucket or container, page by page,
+    following continuation tokens. Raises requests.HTTPError when a listing
+    page is refused and NotAListing when it is answered with something else. Nothing beyond the current page's parser state is kept.
+    """
+    spec = PROVIDERS[provider or detect_provider(url)]
+    http = session or requests
+    list_url = _list_url(_base(url))
+    token = None
+    listed = 0
+    while True:
+        params = dict(spec["query"])
+        if token:
+            params[spec["param"]] = token
+        state = {}
+        with http.get(list_url, params=params, timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+            for item in _iter_listing(response, spec, state):
+                yield item
+                listed += 1
+                if max_keys is not None and listed >= max_keys:
+                    return
+        token = state.get("token")
+        if not token:
+            return
+
+def object_url(bucket_url: str, key: str) -> str:
+    return _base(bucket_url) + quote(key, safe="/~-._")
+
+def scan_bucket(url: str, max_workers: int = 16, session: requests.Session = None, provider: str = None,
+                timeout: float = DEFAULT_TIMEOUT, max_keys: int = None, scheduler: HostScheduler = None):
+    """
+    Check whether a bucket / container can be listed anonymously and probe
+    every listed object on a bounded pool.
+
+    The first result describes the bucket itself ("listable", "provider",
+    plus the usual url/status/http_code/risk/notes); each following one is a
+    scan_cloud_url() result for an object, with its "key" and "listed_size".
+    Keys are listed only as fast as the probes consume them, so memory stays
+    flat however many objects the bucket holds. If listing fails part way, the
+    keys seen so far are still probed and a last record, a copy of the bucket
+    result with "partial": True and the error in its notes, says so.
+    """
+    provider = provider or detect_provider(url)
+    bucket = {
+        "url": url,
+        "host": urlparse(url).netloc,
+        "provider": provider,
+        "listable": False,
+        "status": "Unknown",
+        "http_code": None,
+        "risk": "Low",
+        "notes": [],
+    }
+    own_session = session is None
+    if own_session:
+        session = make_session(pool_size=max_workers)
+    try:
+        keys = list_bucket(url, session, provider, timeout, max_keys)
+        try:
+            first = next(keys, None)
+        except requests.exceptions.HTTPError as e:
+            bucket["http_code"] = e.response.status_code
+            bucket["status"] = f"Not listable ({e.response.status_code})"
+            bucket["notes"].append("The bucket does not allow anonymous listing.")
+            yield bucket
+            return
+        except NotAListing as e:
+            bucket["http_code"] = 200
+            bucket["status"] = "Not listable (unexpected response)"
+            bucket["notes"].append(f"The listing request was not answered with a bucket listing: {e}.")
+            yield bucket
+            return
+        except (requests.exceptions.RequestException, ET.ParseError) as e:
+            bucket["status"] = "Error"
+            bucket["notes"].append(str(e))
+            yield bucket
+            return
+
+        bucket.update(listable=True, http_code=200, status="Bucket listable", risk="High")
+        bucket["notes"].append("Anyone can enumerate the objects in this bucket.")
+        yield bucket
+        if first is None:
+            return
+
+        sizes = {}
+        stopped = []
+
+        def urls():
+            item = first
+            while item is not None:
+                key, size = item
+                target = object_url(url, key)
+                sizes[target] = size
+                yield target
+                try:
+                    item = next(keys, None)
+                except (requests.exceptions.RequestException, ET.ParseError, NotAListing) as e:
+                    stopped.append(f"Listing stopped early: {e}")
+                    return
+
+        base = _base(url)
+        for result in scan_cloud_urls(urls(), max_workers, session, timeout, scheduler=scheduler):
+            result["key"] = unquote(result["url"][len(base):])
+            result["listed_size"] = sizes.pop(result["url"], None)
+            yield result
+        if stopped:
+            # The bucket record went out before listing finished, so this comes last
+            yield {**bucket, "status": "Listing incomplete", "partial": True, "notes": bucket["notes"] + stopped}
+    finally:
+        if own_session:
+            session.close()
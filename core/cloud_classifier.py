@@ -0,0 +1,159 @@
+import re
+from functools import lru_cache
+from urllib.parse import unquote, urlsplit
+
+# Storage endpoints, written left to right like hostnames. "{region}" stands
+# for a whole label and "s3-{region}" for a label with that prefix; what is
+# left of an endpoint is the bucket (virtual-hosted style) or, for Azure, the
+# storage account. Endpoints with nothing on their left are path style.
+ENDPOINTS = [
+    ("s3.amazonaws.com", "aws-s3"),
+    ("s3.{region}.amazonaws.com", "aws-s3"),
+    ("s3-{region}.amazonaws.com", "aws-s3"),
+    ("s3.dualstack.{region}.amazonaws.com", "aws-s3"),
+    ("s3-website.{region}.amazonaws.com", "aws-s3"),
+    ("s3-website-{region}.amazonaws.com", "aws-s3"),
+    ("blob.core.windows.net", "azure-blob"),
+    ("storage.googleapis.com", "gcs"),
+    ("storage.cloud.google.com", "gcs"),
+    ("{region}.digitaloceanspaces.com", "do-spaces"),
+    ("{region}.cdn.digitaloceanspaces.com", "do-spaces"),
+    ("oss-{region}.aliyuncs.com", "alibaba-oss"),
+    ("oss-{region}-internal.aliyuncs.com", "alibaba-oss"),
+]
+# Providers whose left-hand labels name the account, the bucket (container) being in the path.
+ACCOUNT_HOSTED = {"azure-blob"}
+
+_URL_IN_TEXT = re.compile(r"https?://[^\s\"'<>\\]+", re.IGNORECASE)
+
+def _compile(endpoints):
+    """
+    Suffix trie over reversed hostname labels. A node maps exact labels to
+    children, and keeps (prefix, suffix, child) for labels holding a
+    "{region}" placeholder; "$" marks the end of an endpoint.
+    """
+    root = {}
+    for endpoint, provider in endpoints:
+        node = root
+        for label in reversed(endpoint.split(".")):
+            if "{region}" in label:
+                prefix, suffix = label.split("{region}")
+                for p, s, child in node.setdefault("*", []):
+                    if (p, s) == (prefix, suffix):
+                        node = child
+                        break
+                else:
+                    child = {}
+                    node["*"].append((prefix, suffix, child))
+                    # most specific first: "s3-website-{region}" is tried before "s3-{region}"
+                    node["*"].sort(key=lambda entry: -len(entry[0]) - len(entry[1]))
+                    node = child
+            else:
+                node = node.setdefault(label, {})
+        node["$"] = provider
+    return root
+
+_TRIE = _compile(ENDPOINTS)
+
+def _walk(node, labels, i, region):
+    # Longest endpoint ending at labels[i:] -> (provider, labels consumed, region)
+    best = (node["$"], len(labels) - i, region) if "$" in node else None
+    if i == 0:
+        return best
+    label = labels[i - 1]
+    child = node.get(label)
+    if child is not None:
+        found = _walk(child, labels, i - 1, region)
+        if found and (best is None or found[1] > best[1]):
+            best = found
+    for prefix, suffix, child in node.get("*", ()):
+        if len(label) > len(prefix) + len(suffix) and label.startswith(prefix) and label.endswith(suffix):
+            found = _walk(child, labels, i - 1, label[len(prefix):len(label) - len(suffix)])
+            if found and (best is None or found[1] > best[1]):
+                best = found
+    return best
+
+@lru_cache(maxsize=65536)
+def match_host(host: str):
+    """
+    (provider, endpoint, left_part, region) for a storage hostname, or None.
+    left_part is whatever precedes the endpoint ("" for path style).
+    """
+    labels = host.lower().rstrip(".").split(".")
+    found = _walk(_TRIE, labels, len(labels), None)
+    if found is None:
+        return None
+    provider, used, region = found
+    return provider, ".".join(labels[-used:]), ".".join(labels[:-used]), region
+
+def classify_url(url: str):
+    """
+    Break a URL down as a cloud storage object: {"provider", "style",
+    "account", "bucket", "key", "region", "endpoint"}, or None when the host
+    is not a known storage endpoint. Only the hostname decides, so "s3" in a
+    path or an unrelated domain is not a match.
+    """
+    try:
+        parts = urlsplit(url.strip())
+        host = parts.hostname
+    except ValueError:
+        return None
+    if not host:
+        return None
+    matched = match_host(host)
+    if matched is None:
+        return None
+    provider, endpoint, left, region = matched
+    path = unquote(parts.path.lstrip("/"))
+    account = None
+    if provider in ACCOUNT_HOSTED:
+        if not left:
+            return None
+        account, style = left, "path"
+        bucket, _, key = path.partition("/")
+    elif left:
+        style, bucket, key = "virtual-hosted", left, path
+    else:
+        style = "path"
+        bucket, _, key = path.partition("/")
+    return {
+        "provider": provider,
+        "style": style,
+        "account": account,
+        "bucket": bucket or None,
+        "key": key or None,
+        "region": region,
+        "endpoint": endpoint,
+    }
+
+def iter_urls(lines):
+    """
+    Yield every http(s) URL found in lines of text such as proxy or access logs.
+    """
+    for line in lines:
+        if "://" in line:
+            yield from _URL_IN_TEXT.findall(line)
+
+def classify_bulk(lines, per: str = "object"):
+    """
+    Offline pass over log lines: yield (url, classification) for each cloud
+    storage URL, once per distinct object (per="object") or bucket
+    (per="bucket"). No network access.
+
+    Seen objects are remembered by hash only, so memory stays small for tens
+    of millions of URLs; a 64-bit hash collision (vanishingly rare) would
+    drop one distinct object from the output.
+    """
+    seen = set()
+    for url in iter_urls(lines):
+        info = classify_url(url)
+        if info is None:
+            continue
+        ident = (info["provider"], info["account"], info["bucket"])
+        if per == "object":
+            ident += (info["key"],)
+        h = hash(ident)
+        if h in seen:
+            continue
+        seen.add(h)
+        yield url.split("?", 1)[0].split("#", 1)[0], info
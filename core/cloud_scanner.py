@@ -1,28 +1,234 @@
+import copy
+import threading
+import time
 import requests
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from requests.adapters import HTTPAdapter
 from urllib.parse import urlparse
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from core.cloud_classifier import classify_url
+from core.host_scheduler import HostScheduler
+from utils.metrics import collect_timings, stage
+
+DEFAULT_TIMEOUT = 5
+# Most bytes of an object body a probe will ever read. Small bodies are drained
+# so the connection can go back to the pool; anything larger is cut off.
+PROBE_BYTE_BUDGET = 4096
+# HEAD answers that don't settle exposure: HEAD unsupported or rejected, or a
+# presigned URL signed for GET only (S3 answers those HEADs with 403).
+HEAD_FALLBACK_CODES = {400, 403, 405, 501}
+# 206 answers the ranged GET; 416 is that GET on a readable but empty object.
+ACCESSIBLE_CODES = (200, 206, 416)
+
+class CloudScanCache:
+    """
+    Last scan_cloud_url() result per URL. Entries younger than `ttl` seconds
+    are served as they are; older ones are revalidated with a conditional
+    probe using the ETag / Last-Modified seen last time. At most max_entries
+    URLs are kept, least recently used dropped first.
+    """
+
+    def __init__(self, ttl: float = 300, max_entries: int = 100_000, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url: str):
+        """
+        (result copy, fresh) for a cached URL, or None.
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return None
+            self._entries.move_to_end(url)
+            checked, result = entry
+            return copy.deepcopy(result), self.clock() - checked < self.ttl
+
+    def put(self, url: str, result: dict):
+        with self._lock:
+            self._entries.pop(url, None)
+            self._entries[url] = (self.clock(), copy.deepcopy(result))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def touch(self, url: str):
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries[url] = (self.clock(), entry[1])
+
+    def count(self, outcome: str):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "revalidated": self.revalidated, "misses": self.misses,
+                    "entries": len(self._entries)}
+
+# Connections that report TCP (and TLS) setup as the "http_connect" stage
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        with stage("http_connect"):
+            super().connect()
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        with stage("http_connect"):
+            super().connect()
+
+class _TimedHTTPPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+class _TimedHTTPSPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+class _TimedAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _TimedHTTPPool, "https": _TimedHTTPSPool}
+
+def make_session(pool_size: int = 16, hosts: int = 64) -> requests.Session:
+    """
+    A requests Session keeping up to pool_size keep-alive connections open per
+    host, for up to `hosts` hosts, so repeated checks skip the TCP/TLS handshake.
+    """
+    session = requests.Session()
+    adapter = _TimedAdapter(pool_connections=hosts, pool_maxsize=pool_size, pool_block=True)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def _object_size(headers):
+    # A ranged answer carries the full size after the slash: "bytes 0-0/12345"
+    content_range = headers.get("Content-Range", "")
+    if "/" in content_range:
+        total = content_range.rsplit("/", 1)[1]
+        return int(total) if total.isdigit() else None
+    length = headers.get("Content-Length")
+    return int(length) if length and length.isdigit() else None
+
+def probe_url(url: str, session: requests.Session = None, timeout: float = DEFAULT_TIMEOUT,
+              byte_budget: int = PROBE_BYTE_BUDGET, headers: dict = None):
+    """
+    Check a URL by metadata only: a HEAD request, falling back to a streamed
+    "Range: bytes=0-0" GET that reads at most byte_budget bytes before closing.
+    Extra `headers` (e.g. conditional ones) go on both. Returns (response, method).
+    """
+    http = session or requests
+    headers = headers or {}
+    try:
+        with stage("http_request", method="HEAD"):
+            response = http.head(url, timeout=timeout, allow_redirects=True, headers=headers)
+        if response.status_code not in HEAD_FALLBACK_CODES:
+            return response, "HEAD"
+    except requests.exceptions.RequestException:
+        pass
+
+    with stage("http_request", method="GET"):
+        response = http.get(url, timeout=timeout, headers={**headers, "Range": "bytes=0-0"}, stream=True)
+    try:
+        with stage("http_transfer") as st:
+            read = 0
+            for chunk in response.iter_content(chunk_size=min(1024, byte_budget)):
+                read += len(chunk)
+                if read >= byte_budget:
+                    break
+            st.add_bytes(read)
+    finally:
+        response.close()
+    return response, "GET"
+
+def _validators(result: dict) -> dict:
+    headers = {}
+    if result.get("etag"):
+        headers["If-None-Match"] = result["etag"]
+    if result.get("last_modified"):
+        headers["If-Modified-Since"] = result["last_modified"]
+    return headers
+
+def _state(result: dict):
+    # What "changed since last scan" compares
+    return tuple(result.get(k) for k in ("status", "http_code", "etag", "last_modified", "content_length", "content_type"))
+
+def scan_cloud_url(url: str, session: requests.Session = None, timeout: float = DEFAULT_TIMEOUT,
+                   cache: CloudScanCache = None, scheduler: HostScheduler = None, timings: bool = False):
+    """
+    Probe one URL and rate its exposure. With a cache, a fresh entry is
+    returned without any request and a stale one is revalidated conditionally;
+    "changed" tells whether the outcome differs from the previous scan (None
+    when there is none). With a scheduler the probe is rate limited per host
+    and retried when throttled. With timings=True the result carries request,
+    connect and transfer times under "timings" (see utils.metrics).
+    """
+    if timings:
+        with collect_timings() as collected:
+            result = scan_cloud_url(url, session, timeout, cache, scheduler)
+        result["timings"] = collected.as_dict()
+        return result
+    with stage("cloud_scan"):
+        return _scan_cloud_url(url, session, timeout, cache, scheduler)
+
+def _scan_cloud_url(url: str, session: requests.Session, timeout: float, cache: CloudScanCache,
+                    scheduler: HostScheduler):
+    previous = None
+    if cache is not None:
+        cached = cache.get(url)
+        if cached is not None:
+            previous, fresh = cached
+            if fresh:
+                cache.count("hits")
+                previous.update(cache="fresh", changed=False)
+                return previous
 
-def scan_cloud_url(url: str):
     result = {
         "url": url,
         "host": urlparse(url).netloc,
         "status": "Unknown",
         "http_code": None,
         "risk": "Low",
-        "notes": []
+        "notes": [],
+        "probe": None,
+        "content_length": None,
+        "content_type": None,
+        "etag": None,
+        "last_modified": None,
+        "cache": None,
+        "changed": None,
+        "provider": None,
+        "bucket": None,
+        "key": None,
     }
+    cloud = classify_url(url)
+    if cloud is not None:
+        result.update(provider=cloud["provider"], bucket=cloud["bucket"], key=cloud["key"])
 
     try:
-        response = requests.get(url, timeout=5)
-        result["http_code"] = response.status_code
+        conditional = _validators(previous) if previous else None
+        probe = lambda: probe_url(url, session, timeout, headers=conditional)
+        response, result["probe"] = scheduler.run(url, probe) if scheduler else probe()
+        if response.status_code == 304 and previous:
+            cache.touch(url)
+            cache.count("revalidated")
+            previous.update(cache="revalidated", changed=False)
+            return previous
 
-        if response.status_code == 200:
-            # Keywords that usually mean it's a cloud object
-            cloud_keywords = [
-                "s3", "amazonaws.com", "blob.core.windows.net", "storage.googleapis.com",
-                "digitaloceanspaces.com", "aliyuncs.com"
-            ]
+        result["http_code"] = response.status_code
+        result["content_length"] = _object_size(response.headers)
+        result["content_type"] = response.headers.get("Content-Type")
+        result["etag"] = response.headers.get("ETag")
+        result["last_modified"] = response.headers.get("Last-Modified")
 
-            if any(word in url.lower() for word in cloud_keywords):
+        if response.status_code in ACCESSIBLE_CODES:
+            if cloud is not None:
                 result["status"] = "Cloud object accessible"
                 result["risk"] = "High"
                 result["notes"].append("Cloud object is publicly accessible without authentication.")
@@ -40,4 +246,41 @@ def scan_cloud_url(url: str):
         result["risk"] = "Low"
         result["notes"].append(str(e))
 
+    if cache is not None:
+        cache.count("misses")
+        result["cache"] = "miss"
+        if previous:
+            result["changed"] = _state(result) != _state(previous)
+        if result["status"] != "Error":
+            cache.put(url, result)
     return result
+
+def scan_cloud_urls(urls, max_workers: int = 16, session: requests.Session = None, timeout: float = DEFAULT_TIMEOUT,
+                    cache: CloudScanCache = None, scheduler: HostScheduler = None):
+    """
+    Scan an iterable of URLs concurrently on a bounded thread pool sharing one
+    pooled keep-alive session, yielding scan_cloud_url() results as they
+    complete (not in input order). The iterable is consumed lazily, so it can
+    be a generator over millions of URLs. Requests go through a per-host
+    HostScheduler (a default one unless given).
+    """
+    scheduler = scheduler or HostScheduler()
+    own_session = session is None
+    if own_session:
+        session = make_session(pool_size=max_workers)
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            pending = set()
+            for url in urls:
+                pending.add(pool.submit(scan_cloud_url, url, session, timeout, cache, scheduler))
+                if len(pending) >= 2 * max_workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+    finally:
+        if own_session:
+            session.close()
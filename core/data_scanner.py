@@ -1,35 +1,336 @@
+import mmap
+import os
 import re
-from utils.regex_patterns import PATTERNS
-from utils.file_loader import load_text_from_uploaded
+import time
+from bisect import bisect_right
+from utils.regex_patterns import PASSWORD_CHARS, PATTERNS
+from utils.file_loader import DEFAULT_CHUNK_SIZE, ExtractLimits, iter_text_from_uploaded
+from core.findings import FindingSet, line_numbers, normalize
+from core.pattern_engine import compile_patterns, match_value
+from utils.metrics import active, collect_timings, record, stage, timed_iter
 
 SEVERITY_ORDER = {"Low": 1, "Medium": 2, "High": 3}
+# Pattern labels by the severity a hit raises the file to; anything else is Low.
+SEVERITY_TIERS = {"High": ("Aadhaar", "PAN", "Password"), "Medium": ("Email", "Phone")}
+
+# Characters of context kept on both sides of a chunk boundary when streaming.
+# A match (plus the look-around it needs) shorter than this is never split.
+DEFAULT_OVERLAP = 4096
+# A run of password characters reaching the end of the text so far, the only
+# thing a match attempt may have to read to the end of (the Password lookaheads).
+_TRAILING_TOKEN = re.compile(rf"(?<!{PASSWORD_CHARS}){PASSWORD_CHARS}*\Z")
+# Triage reads text in small pieces so a verdict stops extraction soon after it is reached.
+TRIAGE_CHUNK_SIZE = 64 << 10
 
 def _max_severity(a: str, b: str) -> str:
     return a if SEVERITY_ORDER.get(a, 0) >= SEVERITY_ORDER.get(b, 0) else b
 
-def scan_file(uploaded_file) -> dict:
+def _collect(engine, hits, max_hits: int = None, page_of=None):
     """
-    Extract text from uploaded file, run regex patterns, return matches + severity.
+    Fold (pattern_index, offset, match) hits into a FindingSet of distinct
+    normalized values per pattern (and the pages they were seen on). Stops
+    after max_hits hits.
     """
-    text = load_text_from_uploaded(uploaded_file)
-    findings = []
+    found = FindingSet(engine.labels, page_of)
+    partial = False
+    for i, offset, m in hits:
+        found.add(i, offset, normalize(match_value(engine.regexes[i], m)))
+        if max_hits is not None and found.hits >= max_hits:
+            partial = True
+            break
+    if hasattr(hits, "close"):
+        hits.close()
+    return found, partial
 
-    for label, pattern in PATTERNS.items():
-        matches = re.findall(pattern, text, flags=re.MULTILINE)
-        if matches:
-            unique = sorted(set(m.strip() if isinstance(m, str) else " ".join(m) for m in matches))
-            findings.append({"type": label, "count": len(unique), "samples": unique[:5]})
+def _build_result(file_name: str, found: FindingSet, partial: bool = False, lines_in=None,
+                  incomplete: list = None) -> dict:
+    findings = []
+    for i, label in enumerate(found.labels):
+        count = found.count(i)
+        if count:
+            finding = {"type": label, "count": count, "samples": found.samples(i)}
+            if found.page_of is not None:
+                finding["pages"] = found.pages(i)
+            if lines_in is not None:
+                finding["lines"] = line_numbers(lines_in, found.sample_offsets(i))
+            findings.append(finding)
 
     # Severity rule of thumb
     severity = "Low"
-    if any(f["type"] in ("Aadhaar", "PAN", "Password") for f in findings):
+    if any(f["type"] in SEVERITY_TIERS["High"] for f in findings):
         severity = _max_severity(severity, "High")
-    if any(f["type"] in ("Email", "Phone") for f in findings) and severity != "High":
+    if any(f["type"] in SEVERITY_TIERS["Medium"] for f in findings) and severity != "High":
         severity = _max_severity(severity, "Medium")
 
-    return {
-        "file_name": getattr(uploaded_file, "name", "uploaded"),
+    result = {
+        "file_name": file_name,
         "total_issue_types": len(findings),
         "severity": severity if findings else "Low",
         "findings": findings,
     }
+    if partial or incomplete:
+        result["partial"] = True
+    if incomplete:
+        result["incomplete"] = incomplete  # members skipped or cut short by the extraction limits
+    return result
+
+def _record_patterns(engine, profile):
+    for label, seconds in zip(engine.labels, profile or ()):
+        record("pattern", seconds, pattern=label)
+
+def scan_file(uploaded_file, workers: int = None, max_hits: int = None, timings: bool = False) -> dict:
+    """
+    Extract text from uploaded file, run regex patterns, return matches + severity.
+
+    PDFs are extracted page by page (across `workers` processes, see
+    utils.pdf_extract.iter_pdf_pages) and each finding lists the pages it was seen on. With
+    max_hits the scan stops after that many matches and the result is marked
+    "partial". So is one whose text was not all read (containers nested too
+    deep, the decompression budget spent, unreadable members); those are
+    named in "incomplete". With timings=True the result carries per-stage and per-pattern
+    times under "timings" (see utils.metrics).
+    """
+    if timings:
+        with collect_timings() as collected:
+            result = scan_file(uploaded_file, workers, max_hits)
+        result["timings"] = collected.as_dict()
+        return result
+
+    file_name = getattr(uploaded_file, "name", "uploaded")
+    engine = compile_patterns(PATTERNS)
+    profile = [0.0] * len(engine) if active() else None
+    with stage("scan_file"):
+        if file_name.lower().endswith(".pdf"):
+            result = _scan_pdf(uploaded_file, engine, workers, max_hits, profile)
+        else:
+            limits = ExtractLimits()
+            hits = iter_matches(iter_text_from_uploaded(uploaded_file, limits=limits), engine, profile=profile)
+            found, partial = _collect(engine, hits, max_hits)
+            result = _build_result(file_name, found, partial, incomplete=limits.incomplete)
+    _record_patterns(engine, profile)
+    return result
+
+def _page_pieces(pages, starts: list, numbers: list):
+    """
+    Turn (page_number, text) pairs into the pieces of the "\\n"-joined document
+    text, recording where each page starts.
+    """
+    offset = 0
+    for page_number, text in pages:
+        if numbers:
+            yield "\n"
+            offset += 1
+        starts.append(offset)
+        numbers.append(page_number)
+        if text:
+            yield text
+            offset += len(text)
+
+def _readable_pages(data: bytes, workers: int = None):
+    # An unreadable PDF (or page) ends the text instead of failing the scan
+    try:
+        from utils.pdf_extract import iter_pdf_pages  # PyPDF2 only once a PDF shows up
+        yield from iter_pdf_pages(data, workers)
+    except Exception:
+        return
+
+def _scan_pdf(uploaded_file, engine, workers: int = None, max_hits: int = None, profile: list = None) -> dict:
+    file_name = getattr(uploaded_file, "name", "uploaded")
+    starts, numbers = [], []
+    readable = timed_iter("extract", _readable_pages(uploaded_file.getvalue(), workers), format="pdf")
+    pages = _page_pieces(readable, starts, numbers)
+    hits = iter_matches(pages, engine, profile=profile)
+    page_of = lambda offset: numbers[bisect_right(starts, offset) - 1]
+    found, partial = _collect(engine, hits, max_hits, page_of)
+    return _build_result(file_name, found, partial)
+
+def _token_start(buf: str, lo: int, hi: int) -> int:
+    """
+    Start (not before lo) of the run of password characters that ends at hi;
+    hi when buf[hi - 1] is not one.
+    """
+    m = _TRAILING_TOKEN.search(buf, lo, hi)
+    return m.start() if m else lo
+
+def iter_matches(chunks, engine=None, overlap: int = DEFAULT_OVERLAP, profile: list = None):
+    """
+    Run the pattern engine over text that arrives in pieces and yield
+    (pattern_index, offset, match), offset being the position in the whole text.
+
+    Hits are exactly those of a single pass over the joined text: positions are
+    only decided once `overlap` characters past them have arrived, every pattern
+    keeps its findall cursor across pieces, and a match that runs into the
+    undecided tail is held back until more text comes in. So are positions
+    inside a run of password characters that reaches the end of the text so
+    far, since a match attempt there reads to the end of the run (the Password
+    lookaheads do) and could fail only for lack of text. Other text, minified
+    JSON included, is never held back for being long without whitespace.
+    Only about chunk + 2 * overlap characters are kept, plus any single match
+    or token longer than that. `profile` is handed to PatternEngine.finditer.
+    """
+    engine = engine or compile_patterns(PATTERNS)
+    buf = None
+    base = 0          # offset of buf[0] in the whole text
+    pos = 0           # first position in buf not decided yet
+    wait = 0          # don't walk again until buf is this long (set while stuck on a long match or token)
+    pending = []      # pieces not yet added to buf, joined in one go once buf reaches `wait`
+    pending_size = 0
+    cursors = [0] * len(engine)
+
+    def walk(endpos, horizon):
+        hits = []
+        steps = engine.finditer(buf, pos, endpos, cursors, horizon, profile)
+        while True:
+            try:
+                i, m = next(steps)
+            except StopIteration as stop:
+                return hits, stop.value
+            hits.append((i, base + m.start(), m))
+
+    for piece in chunks:
+        pending.append(piece)
+        pending_size += len(piece)
+        if (len(buf) if buf is not None else 0) + pending_size < wait:
+            continue
+        buf = "".join(pending if buf is None else [buf, *pending])
+        pending = []
+        pending_size = 0
+        horizon = len(buf) - overlap
+        if horizon <= pos:
+            continue
+        horizon = min(horizon, _token_start(buf, pos, len(buf)))
+        if horizon <= pos:
+            wait = 2 * len(buf)
+            continue
+        hits, stopped = walk(horizon, horizon)
+        yield from hits
+        wait = 2 * len(buf) if stopped == pos else 0
+        pos = stopped
+
+        keep = max(pos - overlap, 0)
+        if keep:
+            buf = buf[keep:]
+            base += keep
+            pos -= keep
+            cursors[:] = [max(c - keep, 0) for c in cursors]
+
+    if pending:
+        buf = "".join(pending if buf is None else [buf, *pending])
+    if buf is not None:
+        hits, _ = walk(len(buf), None)
+        yield from hits
+
+def scan_file_streaming(uploaded_file, chunk_size: int = DEFAULT_CHUNK_SIZE, overlap: int = DEFAULT_OVERLAP) -> dict:
+    """
+    Like scan_file, but reads and scans the upload chunk by chunk so memory is
+    bounded by the chunk size rather than the file size. Findings are identical.
+    """
+    engine = compile_patterns(PATTERNS)
+    limits = ExtractLimits(chunk_size=chunk_size)
+    chunks = iter_text_from_uploaded(uploaded_file, chunk_size, limits)
+    found, _ = _collect(engine, iter_matches(chunks, engine, overlap))
+    return _build_result(getattr(uploaded_file, "name", "uploaded"), found, incomplete=limits.incomplete)
+
+def scan_path(path, lines: bool = False) -> dict:
+    """
+    Scan a local text or log file without reading it into memory: the file is
+    memory-mapped and byte versions of PATTERNS run straight over the mapping,
+    so only matched spans are ever copied and decoded.
+
+    Matched values are deduplicated as bytes and only the reported samples
+    are decoded. With lines=True each finding also gets the 1-based "lines"
+    of its samples, counted on demand from the mapping.
+
+    Byte patterns use ASCII semantics for \\d, \\w and \\b, which only differs
+    from scan_file next to non-ASCII letters and digits.
+    """
+    engine = compile_patterns({label: p.encode() for label, p in PATTERNS.items()})
+    name = os.path.basename(path)
+    with open(path, "rb") as fh:
+        if not os.fstat(fh.fileno()).st_size:
+            return _build_result(name, FindingSet(engine.labels))
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            hits = ((i, m.start(), m) for i, m in engine.finditer(mapped))
+            found, _ = _collect(engine, hits)
+            return _build_result(name, found, lines_in=mapped if lines else None)
+
+def _severity_of(label: str) -> str:
+    return next((tier for tier, labels in SEVERITY_TIERS.items() if label in labels), "Low")
+
+class TriageBudget:
+    """
+    Per-file limits for triage_file(): wall-clock seconds, characters of
+    extracted text and pattern matches. None means no limit.
+    """
+
+    def __init__(self, seconds: float = None, max_bytes: int = None, max_hits: int = None):
+        self.seconds = seconds
+        self.max_bytes = max_bytes
+        self.max_hits = max_hits
+
+def triage_file(uploaded_file, budget: TriageBudget = None, min_severity: str = "High",
+                clock=time.perf_counter) -> dict:
+    """
+    Decide quickly whether an upload holds data of `min_severity` or worse,
+    for gating rather than reporting. Only the patterns that can raise the
+    file to that severity are run, highest severity first, and extraction and
+    matching stop at the first High hit (the verdict cannot change after it)
+    or when the budget runs out.
+
+    Returns the scan_file() result shape for what was seen, with "partial"
+    set when the scan stopped early (later text went unchecked) and a "triage" entry telling
+    why the scan stopped ("verdict", "time", "bytes", "hits" or None), which
+    patterns were checked and how much text was read.
+    """
+    budget = budget or TriageBudget()
+    floor = SEVERITY_ORDER[min_severity]
+    ranked = sorted(PATTERNS, key=lambda label: -SEVERITY_ORDER[_severity_of(label)])
+    engine = compile_patterns({label: PATTERNS[label] for label in ranked
+                               if SEVERITY_ORDER[_severity_of(label)] >= floor})
+    high = {i for i, label in enumerate(engine.labels) if _severity_of(label) == "High"}
+    started = clock()
+    deadline = started + budget.seconds if budget.seconds is not None else None
+    stopped = None
+    read = 0
+
+    def budgeted(chunks):
+        nonlocal stopped, read
+        for piece in chunks:
+            if deadline is not None and clock() >= deadline:
+                stopped = "time"
+                return
+            if budget.max_bytes is not None and read + len(piece) > budget.max_bytes:
+                piece = piece[:budget.max_bytes - read]
+                stopped = "bytes"
+            read += len(piece)
+            yield piece
+            if stopped:
+                return
+
+    limits = ExtractLimits(chunk_size=TRIAGE_CHUNK_SIZE)
+    source = iter_text_from_uploaded(uploaded_file, TRIAGE_CHUNK_SIZE, limits)
+    found = FindingSet(engine.labels)
+    with stage("triage"):
+        hits = iter_matches(budgeted(source), engine)
+        for i, offset, m in hits:
+            found.add(i, offset, normalize(match_value(engine.regexes[i], m)))
+            if i in high:
+                stopped = "verdict"
+            elif budget.max_hits is not None and found.hits >= budget.max_hits:
+                stopped = "hits"
+            elif deadline is not None and clock() >= deadline:
+                stopped = "time"
+            else:
+                continue
+            break
+        hits.close()
+        if hasattr(source, "close"):
+            source.close()
+
+    result = _build_result(getattr(uploaded_file, "name", "uploaded"), found, partial=stopped is not None,
+                           incomplete=limits.incomplete)
+    result["triage"] = {"stopped": stopped, "checked": list(engine.labels), "chars_read": read,
+                        "seconds": round(clock() - started, 4)}
+    return result
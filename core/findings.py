@@ -0,0 +1,102 @@
+from array import array
+from bisect import insort
+
+SAMPLE_LIMIT = 5
+_COUNT_STEP = 16 << 20
+
+def normalize(value):
+    """
+    The form a match value is counted and reported in: stripped, group tuples
+    joined by spaces. Works on str and on bytes (from byte patterns).
+    """
+    if isinstance(value, (str, bytes)):
+        return value.strip()
+    return (b" " if value and isinstance(value[0], bytes) else " ").join(value)
+
+class FindingSet:
+    """
+    Distinct hits per pattern, stored compactly: each distinct value is
+    remembered by its hash (for deduplication) and by its pattern id, first
+    offset and length in flat arrays. Only the SAMPLE_LIMIT smallest values of
+    each pattern are kept as strings; everything else about a hit (its text,
+    its line) is worked out from the offsets when asked for. Memory grows
+    with the number of distinct values, not with matches or text size.
+
+    Values are compared by a 64-bit hash, so a collision (vanishingly rare)
+    would count two distinct values as one.
+    """
+
+    def __init__(self, labels, page_of=None, sample_limit: int = SAMPLE_LIMIT):
+        self.labels = list(labels)
+        self.sample_limit = sample_limit
+        self.page_of = page_of
+        self.pattern = array("H")
+        self.offset = array("q")
+        self.length = array("I")
+        self.hits = 0  # matches seen, repeats included
+        self._seen = [set() for _ in self.labels]
+        self._samples = [[] for _ in self.labels]  # sorted (value, offset)
+        self._pages = [set() for _ in self.labels] if page_of else None
+
+    def add(self, i: int, offset: int, value) -> bool:
+        """
+        Record a hit of pattern i at `offset` with normalized `value`; True if the value is new.
+        """
+        self.hits += 1
+        if self._pages is not None:
+            self._pages[i].add(self.page_of(offset))
+        seen = self._seen[i]
+        h = hash(value)
+        if h in seen:
+            return False
+        seen.add(h)
+        self.pattern.append(i)
+        self.offset.append(offset)
+        self.length.append(len(value))
+        samples = self._samples[i]
+        if len(samples) < self.sample_limit or value < samples[-1][0]:
+            insort(samples, (value, offset))
+            del samples[self.sample_limit:]
+        return True
+
+    def __len__(self) -> int:
+        return len(self.pattern)
+
+    def count(self, i: int) -> int:
+        return len(self._seen[i])
+
+    def samples(self, i: int) -> list:
+        """
+        The smallest distinct values of pattern i, in order, decoded to str.
+        """
+        return [v.decode("utf-8", errors="ignore") if isinstance(v, bytes) else v for v, _ in self._samples[i]]
+
+    def sample_offsets(self, i: int) -> list:
+        return [offset for _, offset in self._samples[i]]
+
+    def pages(self, i: int) -> list:
+        return sorted(self._pages[i]) if self._pages is not None else []
+
+    def first_offsets(self, i: int):
+        """
+        (offset, length) where each distinct value of pattern i first occurs, in order found.
+        """
+        for p, offset, length in zip(self.pattern, self.offset, self.length):
+            if p == i:
+                yield offset, length
+
+def line_numbers(text, offsets) -> list:
+    """
+    1-based line of each offset in `text` (str, bytes or an mmap), counting
+    newlines in a single forward pass over the sorted offsets.
+    """
+    nl = "\n" if isinstance(text, str) else b"\n"
+    lines = {}
+    line, pos = 1, 0
+    for offset in sorted(set(offsets)):
+        while pos < offset:
+            end = min(offset, pos + _COUNT_STEP)  # bounded copies out of an mmap
+            line += text[pos:end].count(nl)
+            pos = end
+        lines[offset] = line
+    return [lines[offset] for offset in offsets]
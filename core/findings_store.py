@@ -0,0 +1,236 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit
+
+DEFAULT_BATCH_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    source TEXT
+);
+CREATE TABLE IF NOT EXISTS targets (
+    id INTEGER PRIMARY KEY,
+    scan_id INTEGER NOT NULL REFERENCES scans(id),
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    host TEXT,
+    severity TEXT,
+    status TEXT,
+    http_code INTEGER,
+    finding_count INTEGER NOT NULL DEFAULT 0,
+    scanned_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS findings (
+    id INTEGER PRIMARY KEY,
+    target_id INTEGER NOT NULL REFERENCES targets(id),
+    type TEXT NOT NULL,
+    severity TEXT,
+    count INTEGER NOT NULL,
+    pages TEXT,
+    samples TEXT,
+    found_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS counters (
+    dimension TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value INTEGER NOT NULL,
+    PRIMARY KEY (dimension, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS targets_severity ON targets(severity, scanned_at);
+CREATE INDEX IF NOT EXISTS targets_time ON targets(scanned_at);
+CREATE INDEX IF NOT EXISTS targets_host ON targets(host);
+CREATE INDEX IF NOT EXISTS findings_target ON findings(target_id);
+CREATE INDEX IF NOT EXISTS findings_type ON findings(type);
+CREATE INDEX IF NOT EXISTS findings_severity ON findings(severity, found_at);
+CREATE INDEX IF NOT EXISTS findings_time ON findings(found_at);
+"""
+
+_BUMP = ("INSERT INTO counters (dimension, key, value) VALUES (?, ?, ?) "
+         "ON CONFLICT (dimension, key) DO UPDATE SET value = value + excluded.value")
+
+def _target(result: dict):
+    """
+    (kind, name, host, severity, status, http_code) for a file scan, cloud
+    scan or failed/skipped batch record; None for anything else.
+    """
+    if "findings" in result:
+        return "file", result.get("file_name", ""), None, result.get("severity"), None, None
+    if "url" in result:
+        host = result.get("host") or urlsplit(result["url"]).netloc
+        return "cloud", result["url"], host, result.get("risk"), result.get("status"), result.get("http_code")
+    if "error" in result or "skipped" in result:
+        status = "error" if "error" in result else "skipped"
+        return "file", result.get("file_name", ""), None, None, status, None
+    return None
+
+class FindingsStore:
+    """
+    Scan results in SQLite: one row per scan, per target (file or URL) and per
+    finding type, written in batched transactions. Alongside the rows it keeps
+    counters (targets per severity, kind, host and day; matches per type)
+    updated in the same transactions, so dashboard totals are a read of a few
+    rows however many findings are stored.
+
+    Samples are the sensitive values themselves and are only stored with
+    keep_samples=True.
+    """
+
+    def __init__(self, path: str = ":memory:", keep_samples: bool = False, clock=time.time):
+        self.path = path
+        self.keep_samples = keep_samples
+        self.clock = clock
+        self._lock = threading.Lock()
+        # One connection shared by Streamlit reruns and scan threads, serialized by _lock
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def record(self, results, source: str = None, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+        """
+        Store an iterable of scan results as one scan, committing every
+        `batch_size` targets. Returns the scan id.
+        """
+        with self._lock:
+            scan_id = self._db.execute("INSERT INTO scans (started_at, source) VALUES (?, ?)",
+                                       (self.clock(), source)).lastrowid
+        batch = []
+        for result in results:
+            batch.append(result)
+            if len(batch) >= batch_size:
+                self._insert(scan_id, batch)
+                batch = []
+        if batch:
+            self._insert(scan_id, batch)
+        return scan_id
+
+    def add(self, result: dict, source: str = None) -> int:
+        return self.record([result], source)
+
+    def _insert(self, scan_id: int, results: list):
+        now = self.clock()
+        day = time.strftime("%Y-%m-%d", time.gmtime(now))
+        counts = {}
+
+        def bump(dimension, key, value=1):
+            counts[(dimension, key)] = counts.get((dimension, key), 0) + value
+
+        with self._lock:
+            db = self._db
+            # IMMEDIATE takes the write lock up front, so ids handed out below stay ours
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                target_id = db.execute("SELECT COALESCE(MAX(id), 0) FROM targets").fetchone()[0]
+                targets, rows = [], []
+                for result in results:
+                    target = _target(result)
+                    if target is None:
+                        continue
+                    kind, name, host, severity, status, http_code = target
+                    findings = result.get("findings") or []
+                    target_id += 1
+                    targets.append((target_id, scan_id, kind, name, host, severity, status, http_code, len(findings), now))
+                    for f in findings:
+                        rows.append((target_id, f["type"], severity, f["count"],
+                                     json.dumps(f["pages"]) if f.get("pages") else None,
+                                     json.dumps(f.get("samples", [])) if self.keep_samples else None, now))
+                        bump("type", f["type"], f["count"])
+                    bump("targets", kind)
+                    bump("severity", severity or "Unknown")
+                    bump("day", day)
+                    if host:
+                        bump("host", host)
+                    if findings:
+                        bump("findings", "total", len(findings))
+                db.executemany("INSERT INTO targets (id, scan_id, kind, name, host, severity, status, http_code, "
+                               "finding_count, scanned_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", targets)
+                db.executemany("INSERT INTO findings (target_id, type, severity, count, pages, samples, found_at) "
+                               "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                db.executemany(_BUMP, [(dim, key, value) for (dim, key), value in counts.items()])
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+
+    def counters(self, dimension: str) -> dict:
+        """
+        {key: value} of one pre-aggregated counter: "severity", "targets"
+        (per kind), "type" (matches), "host", "day" or "findings".
+        """
+        with self._lock:
+            rows = self._db.execute("SELECT key, value FROM counters WHERE dimension = ?", (dimension,)).fetchall()
+        return dict(rows)
+
+    def risk_distribution(self) -> dict:
+        return self.counters("severity")
+
+    def recent_targets(self, limit: int = 50, severity: str = None, kind: str = None) -> list:
+        """
+        Newest targets first, optionally of one severity and/or kind.
+        """
+        where, args = [], []
+        if severity:
+            where.append("severity = ?")
+            args.append(severity)
+        if kind:
+            where.append("kind = ?")
+            args.append(kind)
+        sql = ("SELECT id, kind, name, host, severity, status, http_code, finding_count, scanned_at FROM targets"
+               + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY scanned_at DESC, id DESC LIMIT ?")
+        with self._lock:
+            cursor = self._db.execute(sql, args + [limit])
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def target_findings(self, target_id: int) -> list:
+        with self._lock:
+            rows = self._db.execute("SELECT type, count, pages, samples FROM findings WHERE target_id = ? ORDER BY id",
+                                    (target_id,)).fetchall()
+        return [{"type": t, "count": n, "pages": json.loads(p) if p else None, "samples": json.loads(s) if s else None}
+                for t, n, p, s in rows]
+
+    def rebuild_counters(self):
+        """
+        Recompute every counter from the stored rows (after manual edits or an interrupted import).
+        """
+        with self._lock:
+            db = self._db
+            db.execute("BEGIN")
+            try:
+                db.execute("DELETE FROM counters")
+                for sql in (
+                    "SELECT 'targets', kind, COUNT(*) FROM targets GROUP BY kind",
+                    "SELECT 'severity', COALESCE(severity, 'Unknown'), COUNT(*) FROM targets GROUP BY 2",
+                    "SELECT 'day', date(scanned_at, 'unixepoch'), COUNT(*) FROM targets GROUP BY 2",
+                    "SELECT 'host', host, COUNT(*) FROM targets WHERE host IS NOT NULL AND host != '' GROUP BY host",
+                    "SELECT 'findings', 'total', COUNT(*) FROM findings HAVING COUNT(*) > 0",
+                    "SELECT 'type', type, SUM(count) FROM findings GROUP BY type",
+                ):
+                    db.executemany(_BUMP, db.execute(sql).fetchall())
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+
+_DEFAULT = None
+
+def default_store() -> FindingsStore:
+    """
+    Process-wide store at FINDINGS_DB (default: findings.db in the working
+    directory). Samples are kept only if FINDINGS_KEEP_SAMPLES=1.
+    """
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = FindingsStore(os.environ.get("FINDINGS_DB") or "findings.db",
+                                 keep_samples=os.environ.get("FINDINGS_KEEP_SAMPLES") == "1")
+    return _DEFAULT
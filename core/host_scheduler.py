@@ -0,0 +1,170 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+import requests
+
+# Answers that mean "slow down" rather than "no".
+THROTTLE_CODES = {429, 503}
+# Failures worth retrying; anything else (bad URL, too many redirects) is final.
+RETRYABLE_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+def retry_after(response, max_delay: float):
+    """
+    Seconds asked for by a Retry-After header (delta-seconds or HTTP date),
+    capped at max_delay, or None.
+    """
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return min(float(value), max_delay)
+    try:
+        delay = parsedate_to_datetime(value).timestamp() - time.time()
+    except (TypeError, ValueError):
+        return None
+    return min(max(delay, 0.0), max_delay)
+
+class _Host:
+    def __init__(self, burst: int, concurrency: int):
+        self.tokens = float(burst)
+        self.refilled = time.monotonic()
+        self.in_flight = 0
+        self.limit = float(concurrency)
+        self.resume_at = 0.0
+        self.next_cut = 0.0  # no second decrease before this, so a burst of bad answers halves once
+        self.best_latency = None
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+        self.cond = threading.Condition()
+
+class HostScheduler:
+    """
+    Gate requests per host: a token bucket (`rate` per second, bursts of
+    `burst`), a concurrency limit that adapts AIMD-style (one more slot per
+    window of fast answers, halved at most once per window on throttling,
+    errors or slow answers) and
+    a host-wide pause after 429/503, honouring Retry-After and otherwise
+    backing off exponentially with full jitter.
+    """
+
+    def __init__(self, rate: float = 50.0, burst: int = 50, concurrency: int = 4, max_concurrency: int = 32,
+                 max_retries: int = 4, base_delay: float = 0.5, max_delay: float = 30.0, slow_factor: float = 3.0):
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        # An answer slower than slow_factor times the best seen counts as congestion.
+        self.slow_factor = slow_factor
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _host(self, host: str) -> _Host:
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = self._hosts[host] = _Host(self.burst, self.concurrency)
+            return state
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def acquire(self, host: str) -> _Host:
+        """
+        Block until `host` has a free slot, a token and no pause in force.
+        """
+        state = self._host(host)
+        with state.cond:
+            while True:
+                now = time.monotonic()
+                if now < state.resume_at:
+                    timeout = state.resume_at - now
+                elif state.in_flight >= max(int(state.limit), 1):
+                    timeout = None  # woken by release()
+                else:
+                    state.tokens = min(self.burst, state.tokens + (now - state.refilled) * self.rate)
+                    state.refilled = now
+                    if state.tokens >= 1:
+                        state.tokens -= 1
+                        state.in_flight += 1
+                        state.requests += 1
+                        return state
+                    timeout = (1 - state.tokens) / self.rate
+                state.cond.wait(timeout)
+
+    def release(self, state: _Host, latency: float = None, pause: float = None):
+        """
+        Give back a slot. `pause` (seconds) reports throttling or a failure and
+        halts the host for that long; otherwise `latency` tunes the limit.
+        """
+        with state.cond:
+            state.in_flight -= 1
+            now = time.monotonic()
+            if pause is not None:
+                state.resume_at = max(state.resume_at, now + pause)
+                self._cut(state, now, state.resume_at)
+            elif latency is not None:
+                if state.best_latency is None or latency < state.best_latency:
+                    state.best_latency = latency
+                if latency > self.slow_factor * state.best_latency:
+                    self._cut(state, now, now + latency)
+                else:
+                    state.limit = min(self.max_concurrency, state.limit + 1 / state.limit)
+            state.cond.notify_all()
+
+    @staticmethod
+    def _cut(state: _Host, now: float, until: float):
+        # Multiplicative decrease, at most once per window of in-flight requests
+        if now >= state.next_cut:
+            state.limit = max(1.0, state.limit / 2)
+            state.next_cut = until
+
+    def run(self, url: str, fn):
+        """
+        Call fn() (returning a response, or a tuple starting with one) under
+        the limits of the URL's host, retrying throttled answers and
+        connection failures up to max_retries times. The last answer is
+        returned (or the last error raised) once retries run out.
+        """
+        host = urlparse(url).netloc
+        for attempt in range(self.max_retries + 1):
+            state = self.acquire(host)
+            started = time.monotonic()
+            try:
+                outcome = fn()
+            except RETRYABLE_ERRORS:
+                with state.cond:
+                    state.errors += 1
+                self.release(state, pause=self.backoff(attempt))
+                if attempt == self.max_retries:
+                    raise
+                continue
+            except BaseException:
+                self.release(state)
+                raise
+            response = outcome[0] if isinstance(outcome, tuple) else outcome
+            if response.status_code in THROTTLE_CODES:
+                with state.cond:
+                    state.throttled += 1
+                delay = retry_after(response, self.max_delay)
+                self.release(state, pause=self.backoff(attempt) if delay is None else delay)
+                if attempt < self.max_retries:
+                    continue
+            else:
+                self.release(state, latency=time.monotonic() - started)
+            return outcome
+
+    def stats(self) -> dict:
+        with self._lock:
+            hosts = dict(self._hosts)
+        return {
+            host: {"requests": s.requests, "throttled": s.throttled, "errors": s.errors,
+                   "concurrency": round(s.limit, 2), "best_latency": s.best_latency}
+            for host, s in hosts.items()
+        }
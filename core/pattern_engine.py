@@ -0,0 +1,267 @@
+import re
+from time import perf_counter
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+# Patterns that open with a word boundary share one "\b" check in the combined
+# trigger, so positions inside words are rejected once instead of once per pattern.
+_BOUNDARY = r"\b"
+_GLOBAL_FLAGS = re.compile(r"^\(\?([aiLmsux]+)\)")
+
+# Category codes (as produced by the parser for \d, \w, \s, ...) -> their escape.
+_CATEGORY_ESCAPES = {
+    items[0][1]: escape
+    for escape, (op, items) in sre_parse.CATEGORIES.items()
+    if op is sre_parse.IN and len(items) == 1 and items[0][0] is sre_parse.CATEGORY
+}
+_REPEATS = tuple(
+    getattr(sre_parse, name) for name in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT") if hasattr(sre_parse, name)
+)
+
+
+def _set_test(items, as_bytes: bool, flags: int):
+    """
+    Predicate over a code point for the members of a parsed [...] set.
+    """
+    tests = []
+    negate = False
+    for op, av in items:
+        if op is sre_parse.NEGATE:
+            negate = True
+        elif op is sre_parse.LITERAL:
+            tests.append(lambda c, v=av: c == v)
+        elif op is sre_parse.RANGE:
+            tests.append(lambda c, lo=av[0], hi=av[1]: lo <= c <= hi)
+        elif op is sre_parse.CATEGORY and av in _CATEGORY_ESCAPES:
+            escape = _CATEGORY_ESCAPES[av]
+            rx = re.compile(escape.encode() if as_bytes else escape, flags & (re.ASCII | re.LOCALE))
+            tests.append(lambda c, rx=rx: rx.match(bytes((c,)) if as_bytes else chr(c)) is not None)
+        else:
+            return None
+    if negate:
+        return lambda c: not any(t(c) for t in tests)
+    return lambda c: any(t(c) for t in tests)
+
+
+def _first_char_test(items, as_bytes: bool, flags: int):
+    """
+    Predicate telling whether a match of the parsed `items` can begin with a
+    given code point, or None when that cannot be worked out cheaply.
+    """
+    for op, av in items:
+        if op is sre_parse.AT or op is sre_parse.ASSERT or op is sre_parse.ASSERT_NOT:
+            continue  # zero-width, the first character comes later
+        if op is sre_parse.LITERAL:
+            return lambda c, v=av: c == v
+        if op is sre_parse.NOT_LITERAL:
+            return lambda c, v=av: c != v
+        if op is sre_parse.IN:
+            return _set_test(av, as_bytes, flags)
+        if op in _REPEATS:
+            lo, _hi, sub = av
+            return _first_char_test(sub, as_bytes, flags) if lo > 0 else None
+        if op is sre_parse.SUBPATTERN:
+            _group, add_flags, _del_flags, sub = av
+            return None if add_flags & re.IGNORECASE else _first_char_test(sub, as_bytes, flags)
+        if op is sre_parse.BRANCH:
+            tests = [_first_char_test(alt, as_bytes, flags) for alt in av[1]]
+            if any(t is None for t in tests):
+                return None
+            return lambda c: any(t(c) for t in tests)
+        return None
+    return None
+
+
+class PatternEngine:
+    """
+    Compile a {label: regex} registry once and find the matches of every
+    pattern in a single left-to-right walk over the text.
+
+    Each pattern keeps its own resume cursor, so the hits reported for a label
+    are exactly what re.findall(pattern, text) would return, overlaps between
+    different patterns included. Patterns that can match the empty string
+    (r"x*", r"\b") are refused with ValueError: the walk only tries positions
+    that hold a character, so their empty matches would go missing.
+    """
+
+    def __init__(self, patterns: dict, flags: int = re.MULTILINE):
+        self.labels = list(patterns)
+        self.flags = flags
+        self.regexes = [re.compile(p, flags) for p in patterns.values()]
+        for label, rx in zip(self.labels, self.regexes):
+            if sre_parse.parse(rx.pattern, rx.flags).getwidth()[0] == 0:
+                raise ValueError(f"pattern {label!r} can match the empty string")
+        self._first = [self._analyse(rx) for rx in self.regexes]
+        self._triggers = {}
+        self._dispatch = {}
+
+    def __len__(self):
+        return len(self.regexes)
+
+    @staticmethod
+    def _analyse(rx):
+        if rx.flags & re.IGNORECASE:
+            return None
+        as_bytes = isinstance(rx.pattern, bytes)
+        try:
+            parsed = sre_parse.parse(rx.pattern, rx.flags)
+        except Exception:
+            return None
+        return _first_char_test(list(parsed), as_bytes, rx.flags)
+
+    def _trigger(self, mask: int):
+        """
+        Zero-width regex matching wherever any pattern in `mask` matches.
+        """
+        rx = self._triggers.get(mask)
+        if rx is None:
+            sources = [r.pattern for i, r in enumerate(self.regexes) if mask >> i & 1]
+            as_bytes = isinstance(sources[0], bytes)
+            if as_bytes:
+                # latin-1 maps bytes 1:1 onto code points, so the round trip is lossless
+                sources = [s.decode("latin-1") for s in sources]
+            # Leading global flags such as "(?i)" are only legal at the very start
+            # of an expression, so scope them to their own alternative.
+            sources = [_GLOBAL_FLAGS.sub(r"(?\1:", s) + ")" if _GLOBAL_FLAGS.match(s) else s for s in sources]
+            gated = [s for s in sources if s.startswith(_BOUNDARY)]
+            alts = [f"(?:{s})" for s in sources if not s.startswith(_BOUNDARY)]
+            if gated:
+                alts.insert(0, _BOUNDARY + "(?:" + "|".join(f"(?:{s})" for s in gated) + ")")
+            source = "(?=" + "|".join(alts) + ")"
+            rx = re.compile(source.encode("latin-1") if as_bytes else source, self.flags)
+            self._triggers[mask] = rx
+        return rx
+
+    def _candidates(self, mask: int, code: int):
+        """
+        The (index, regex) pairs in `mask` that may match at a character `code`.
+        """
+        key = (mask, code)
+        found = self._dispatch.get(key)
+        if found is None:
+            found = self._dispatch[key] = tuple(
+                (i, rx) for i, rx in enumerate(self.regexes)
+                if mask >> i & 1 and (self._first[i] is None or self._first[i](code))
+            )
+        return found
+
+    def finditer(self, text, pos: int = 0, endpos: int = None, cursors: list = None, horizon: int = None,
+                 profile: list = None):
+        """
+        Yield (pattern_index, match) for every hit starting in [pos, endpos),
+        in order of start position (pattern order breaks ties).
+
+        `cursors` holds one resume position per pattern and is updated in place,
+        so a walk can be continued over later text. If `horizon` is given the walk
+        stops before the first position where a hit would end past it. The
+        position the walk stopped at is the generator's return value. If
+        `profile` (one float per pattern) is given, the time spent matching
+        each pattern is added to it.
+        """
+        n = len(self.regexes)
+        if endpos is None:
+            endpos = len(text)
+        if cursors is None:
+            cursors = [pos] * n
+        as_text = isinstance(text, str)
+        # Patterns still inside their previous match, by resume position.
+        blocked = {i: c for i, c in enumerate(cursors) if c > pos}
+        next_free = min(blocked.values()) if blocked else endpos
+        full = (1 << n) - 1
+        live = full
+        for i in blocked:
+            live &= ~(1 << i)
+        # Probe with the trigger for every pattern, whose hits stay valid across
+        # blocking changes. Only when a blocked pattern fires inside its own match
+        # do we narrow the probe to the live patterns until the blocking changes.
+        narrow = False
+        # mask -> (searched_from, next trigger start or None); a trigger's hits
+        # depend only on the text, so a lookup stays valid until we pass it.
+        ahead = {}
+        candidates = self._candidates
+
+        while pos < endpos:
+            if next_free <= pos:
+                for i in [i for i, c in blocked.items() if c <= pos]:
+                    del blocked[i]
+                    live |= 1 << i
+                next_free = min(blocked.values()) if blocked else endpos
+                narrow = False
+            bound = next_free if next_free < endpos else endpos
+            if not live:
+                pos = bound
+                continue
+
+            probe = live if narrow else full
+            cached = ahead.get(probe)
+            if cached is not None and cached[0] <= pos and (cached[1] is None or pos <= cached[1]):
+                q = cached[1]
+            else:
+                m = self._trigger(probe).search(text, pos)
+                q = m.start() if m is not None else None
+                ahead[probe] = (pos, q)
+            if q is None:
+                pos = bound if narrow else endpos
+                continue
+            if q >= bound:
+                # a blocked pattern frees up first; nothing at all fires before q
+                pos = bound if narrow else q
+                continue
+
+            hits = []
+            for i, rx in candidates(live, ord(text[q]) if as_text else text[q]):
+                if profile is None:
+                    m = rx.match(text, q)
+                else:
+                    started = perf_counter()
+                    m = rx.match(text, q)
+                    profile[i] += perf_counter() - started
+                if m is not None:
+                    hits.append((i, m))
+            if not hits:
+                narrow = True
+            elif horizon is not None and any(m.end() > horizon for _, m in hits):
+                return q
+            for i, m in hits:
+                end = m.end()
+                if end > q + 1:
+                    cursors[i] = end
+                    blocked[i] = end
+                    live &= ~(1 << i)
+                    if end < next_free:
+                        next_free = end
+                    narrow = False
+                else:
+                    cursors[i] = q + 1
+                yield i, m
+            pos = q + 1
+        return endpos
+
+
+def match_value(rx, m):
+    """
+    The value re.findall would report for match `m` of compiled pattern `rx`.
+    """
+    if rx.groups == 0:
+        return m.group(0)
+    if rx.groups == 1:
+        return m.group(1)
+    return m.groups(default=m.string[:0])
+
+
+_ENGINES = {}
+
+
+def compile_patterns(patterns: dict, flags: int = re.MULTILINE) -> PatternEngine:
+    """
+    Return a cached PatternEngine for the current contents of `patterns`.
+    ValueError if one of them can match the empty string.
+    """
+    key = (tuple(patterns.items()), flags)
+    engine = _ENGINES.get(key)
+    if engine is None:
+        engine = _ENGINES[key] = PatternEngine(patterns, flags)
+    return engine
@@ -0,0 +1,249 @@
+import heapq
+import time
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.utils import simpleSplit
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+from utils.metrics import stage
+
+RECOMMENDATIONS = [
+    "Restrict public access on cloud storage; review bucket/object ACLs.",
+    "Avoid storing Aadhaar/PAN/passwords in plain text; encrypt sensitive data.",
+    "Implement least-privilege IAM roles & enable server-side encryption.",
+]
+_SEVERITY_RANK = {"High": 3, "Medium": 2, "Low": 1}
+MARGIN = 40
+LINE = 12
+FONT_SIZE = 9
+# Space on page 1 kept for the summary, which is only known once every result is drawn.
+SUMMARY_HEIGHT = 250
+TOP_TARGETS = 8
+
+def _wrap(text: str, width: float, font: str = "Helvetica", size: int = FONT_SIZE) -> list:
+    """
+    Break text into lines no wider than `width`, splitting long unbroken
+    tokens (URLs, sample runs) by character.
+    """
+    lines = []
+    for line in [l for l in simpleSplit(text, font, size, width) if l] or [""]:
+        while stringWidth(line, font, size) > width:
+            cut = max(int(len(line) * width / stringWidth(line, font, size)), 1)
+            lines.append(line[:cut])
+            line = line[cut:]
+        lines.append(line)
+    return lines
+
+def _fit(text: str, width: float, font: str = "Helvetica", size: int = FONT_SIZE) -> str:
+    """
+    Cut text to one line of `width`, marking the cut with "...".
+    """
+    if stringWidth(text, font, size) <= width:
+        return text
+    keep = max(int(len(text) * width / stringWidth(text, font, size)) - 3, 1)
+    return text[:keep] + "..."
+
+class _PdfReport:
+    """
+    Draws results top to bottom, one at a time. Each finished page is handed
+    to reportlab (which compresses it) and only running totals are kept; the
+    summary on page 1 and the "of N" page totals are forms filled in at the end.
+    """
+
+    def __init__(self, sink, title: str):
+        self.c = canvas.Canvas(sink, pagesize=A4, pageCompression=1)
+        self.width, self.height = A4
+        self.text_width = self.width - 2 * MARGIN
+        self.page = 0
+        self.targets = {"File": 0, "Cloud": 0, "Error": 0}
+        self.by_severity = {}
+        self.by_type = {}
+        self.findings = 0
+        self.top = []  # (rank, findings, order, label) of the riskiest targets
+        self._new_page()
+        c = self.c
+        c.setFont("Helvetica-Bold", 16)
+        c.drawString(MARGIN, self.y, title)
+        c.setFont("Helvetica", FONT_SIZE)
+        c.drawString(MARGIN, self.y - 16, "Generated " + time.strftime("%Y-%m-%d %H:%M"))
+        self.y -= 36
+        c.saveState()
+        c.translate(MARGIN, self.y - SUMMARY_HEIGHT)
+        c.doForm("summary")
+        c.restoreState()
+        self.y -= SUMMARY_HEIGHT + LINE
+
+    def _new_page(self):
+        if self.page:
+            self.c.showPage()
+        self.page += 1
+        c = self.c
+        c.setFont("Helvetica", 8)
+        c.drawString(MARGIN, 20, "Cloud Security & Data Leak Report")
+        label = f"Page {self.page} of "
+        x = self.width - MARGIN - 30
+        c.drawRightString(x, 20, label)
+        c.saveState()
+        c.translate(x, 20)
+        c.doForm("page_count")
+        c.restoreState()
+        self.y = self.height - 50
+
+    def _room(self, needed: float):
+        if self.y - needed < 40:
+            self._new_page()
+
+    def _text(self, x: float, text: str, font: str = "Helvetica", size: int = FONT_SIZE, width: float = None):
+        width = width or self.width - MARGIN - x
+        for line in _wrap(text, width, font, size):
+            self._room(LINE)
+            self.c.setFont(font, size)
+            self.c.drawString(x, self.y, line)
+            self.y -= LINE
+
+    def _heading(self, text: str, severity: str):
+        self._room(3 * LINE)
+        self.y -= 4
+        shade = {"High": (0.95, 0.8, 0.8), "Medium": (0.98, 0.92, 0.75)}.get(severity, (0.88, 0.92, 0.96))
+        self.c.setFillColorRGB(*shade)
+        self.c.rect(MARGIN - 4, self.y - 4, self.text_width + 8, LINE + 4, stroke=0, fill=1)
+        self.c.setFillColorRGB(0, 0, 0)
+        line = _fit(text, self.text_width - 70, "Helvetica-Bold", 10)
+        self.c.setFont("Helvetica-Bold", 10)
+        self.c.drawString(MARGIN, self.y, line)
+        self.c.drawRightString(self.width - MARGIN, self.y, severity)
+        self.y -= LINE + 6
+
+    def _track(self, kind: str, label: str, severity: str, findings: int):
+        self.targets[kind] += 1
+        self.by_severity[severity] = self.by_severity.get(severity, 0) + 1
+        entry = (_SEVERITY_RANK.get(severity, 0), findings, -sum(self.targets.values()), label)
+        if len(self.top) < TOP_TARGETS:
+            heapq.heappush(self.top, entry)
+        else:
+            heapq.heappushpop(self.top, entry)
+
+    def add(self, result: dict):
+        if "findings" in result:
+            self._add_file(result)
+        elif "error" in result or "skipped" in result:
+            name = result.get("file_name", "")
+            self._track("Error", name, "Unknown", 0)
+            self._heading(name, "Unknown")
+            self._text(MARGIN + 10, result.get("error") or f"Skipped: {result['skipped']}")
+        elif "url" in result:
+            self._add_cloud(result)
+
+    def _add_file(self, result: dict):
+        name = result.get("file_name", "")
+        severity = result.get("severity", "Low")
+        findings = result["findings"]
+        self._track("File", name, severity, len(findings))
+        self._heading("File: " + name, severity)
+        if result.get("incomplete"):
+            self._text(MARGIN + 10, "Not fully scanned: " + ", ".join(result["incomplete"]))
+        elif not findings:
+            self._text(MARGIN + 10, "No sensitive data found.")
+        if not findings:
+            return
+        cols = (MARGIN + 10, MARGIN + 100, MARGIN + 145)
+        self._room(2 * LINE)
+        self.c.setFont("Helvetica-Bold", FONT_SIZE)
+        for x, label in zip(cols, ("Type", "Count", "Samples")):
+            self.c.drawString(x, self.y, label)
+        self.y -= LINE
+        for f in findings:
+            self.findings += 1
+            self.by_type[f["type"]] = self.by_type.get(f["type"], 0) + f["count"]
+            detail = ", ".join(f.get("samples", []))
+            if f.get("pages"):
+                detail += "  (pages " + ", ".join(map(str, f["pages"][:20])) + ("..." if len(f["pages"]) > 20 else "") + ")"
+            lines = _wrap(detail, self.width - MARGIN - cols[2])
+            self._room(LINE * min(len(lines), 3))
+            self.c.setFont("Helvetica", FONT_SIZE)
+            self.c.drawString(cols[0], self.y, f["type"])
+            self.c.drawString(cols[1], self.y, str(f["count"]))
+            for line in lines:
+                self._room(LINE)
+                self.c.setFont("Helvetica", FONT_SIZE)
+                self.c.drawString(cols[2], self.y, line)
+                self.y -= LINE
+        self.y -= 4
+
+    def _add_cloud(self, result: dict):
+        url = result.get("url", "")
+        risk = result.get("risk", "Unknown")
+        self.findings += 1
+        self._track("Cloud", url, risk, 1)
+        self._heading("URL: " + url, risk)
+        if _fit(url, self.text_width - 100, "Helvetica-Bold", 10) != url:
+            self._text(MARGIN + 10, url)
+        self._text(MARGIN + 10, f"Status: {result.get('status','')} (HTTP {result.get('http_code','')})")
+        if result.get("provider"):
+            where = f"Provider: {result['provider']}  Bucket: {result.get('bucket') or '-'}  Key: {result.get('key') or '-'}"
+            self._text(MARGIN + 10, where)
+        for note in result.get("notes", []):
+            self._text(MARGIN + 10, "- " + note)
+        self.y -= 4
+
+    def _draw_summary(self):
+        c = self.c
+        c.beginForm("summary")
+        y = SUMMARY_HEIGHT - LINE
+        c.setFont("Helvetica-Bold", 12)
+        c.drawString(0, y, "Summary")
+        y -= 18
+        c.setFont("Helvetica", FONT_SIZE)
+        col2 = self.text_width / 2
+        left = [f"Files scanned: {self.targets['File']}", f"URLs checked: {self.targets['Cloud']}",
+                f"Failed or skipped: {self.targets['Error']}", f"Findings: {self.findings}", ""]
+        left += [f"{sev}: {self.by_severity[sev]} target(s)" for sev in ("High", "Medium", "Low", "Unknown")
+                 if sev in self.by_severity]
+        right = ["Matches by type:"] + [f"  {t}: {n}" for t, n in sorted(self.by_type.items(), key=lambda kv: -kv[1])[:12]]
+        for i, line in enumerate(left):
+            c.drawString(0, y - i * LINE, line)
+        for i, line in enumerate(right):
+            c.drawString(col2, y - i * LINE, line)
+        y -= max(len(left), len(right)) * LINE + 8
+        if self.top:
+            c.setFont("Helvetica-Bold", FONT_SIZE)
+            c.drawString(0, y, "Highest-risk targets")
+            c.setFont("Helvetica", FONT_SIZE)
+            for rank, findings, _, label in sorted(self.top, reverse=True):
+                y -= LINE
+                if y < 0:
+                    break
+                severity = next((k for k, v in _SEVERITY_RANK.items() if v == rank), "Unknown")
+                c.drawString(0, y, f"{severity:<7}")
+                c.drawString(50, y, _fit(label, self.text_width - 50))
+        c.endForm()
+
+    def finish(self):
+        self._room(LINE * (len(RECOMMENDATIONS) + 3))
+        self.y -= 6
+        self.c.setFont("Helvetica-Bold", 12)
+        self.c.drawString(MARGIN, self.y, "Recommendations")
+        self.y -= 18
+        for rec in RECOMMENDATIONS:
+            self._text(MARGIN + 10, "- " + rec, size=10)
+        self._draw_summary()
+        self.c.beginForm("page_count")
+        self.c.setFont("Helvetica", 8)
+        self.c.drawString(0, 0, str(self.page))
+        self.c.endForm()
+        self.c.showPage()
+        self.c.save()
+
+def write_pdf_report(results, sink, title: str = "Cloud Security & Data Leak Report") -> int:
+    """
+    Render an iterable of scan results (files and URLs) as a paginated PDF
+    into a binary file-like or a path: a summary on page 1, then one section
+    per target with wrapped samples. Results are drawn as they arrive and
+    finished pages are compressed right away, so only the page being drawn
+    is held uncompressed. Returns the number of pages.
+    """
+    with stage("report", format="pdf"):
+        report = _PdfReport(sink, title)
+        for result in results:
+            report.add(result)
+        report.finish()
+    return report.page
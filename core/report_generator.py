@@ -1,120 +1,126 @@
+import csv
 import io
-import pandas as pd
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
+import json
+from utils.metrics import stage
+from utils.registry import LazyRegistry
 
-def _flatten_findings(combined: dict) -> list[dict]:
-    rows = []
-    cloud = combined.get("cloud_scan") or {}
-    file_scan = combined.get("file_scan") or {}
+CSV_COLUMNS = ["Section", "Item", "Detail", "Severity"]
 
-    # Cloud
-    if cloud:
-        rows.append({
-            "Section": "Cloud",
-            "Item": cloud.get("url", ""),
-            "Detail": f"{cloud.get('status','')} (HTTP {cloud.get('http_code','')})",
-            "Severity": cloud.get("risk", "Unknown"),
-        })
+def _result_rows(result: dict):
+    """
+    CSV rows (Section, Item, Detail, Severity) for one scan result: a cloud
+    scan, a file scan, or a batch record that failed or was skipped. A file
+    the extraction limits kept from being read in full gets a row naming what was left out.
+    """
+    if "findings" in result:
+        file_name = result.get("file_name", "")
+        for f in result["findings"]:
+            yield ("File", file_name, f"{f['type']} ({f['count']} found)", result.get("severity", "Low"))
+        if result.get("incomplete"):
+            yield ("File", file_name, "Not fully scanned: " + ", ".join(result["incomplete"]), "Unknown")
+    elif "error" in result or "skipped" in result:
+        yield ("File", result.get("file_name", ""), result.get("error") or f"Skipped: {result['skipped']}", "Unknown")
+    elif "url" in result:
+        yield ("Cloud", result.get("url", ""), f"{result.get('status','')} (HTTP {result.get('http_code','')})",
+               result.get("risk", "Unknown"))
 
-    # File findings
-    if file_scan:
-        file_name = file_scan.get("file_name", "")
-        for f in file_scan.get("findings", []):
-            rows.append({
-                "Section": "File",
-                "Item": file_name,
-                "Detail": f"{f['type']} ({f['count']} found)",
-                "Severity": file_scan.get("severity", "Low"),
-            })
-    return rows
+def _combined_results(combined: dict):
+    for key in ("cloud_scan", "file_scan"):
+        if combined.get(key):
+            yield combined[key]
 
-def build_csv_report(combined: dict) -> bytes:
-    rows = _flatten_findings(combined)
-    if not rows:
-        rows = [{"Section": "Info", "Item": "-", "Detail": "No issues detected.", "Severity": "Low"}]
-    df = pd.DataFrame(rows, columns=["Section", "Item", "Detail", "Severity"])
-    return df.to_csv(index=False).encode("utf-8")
-
-def build_pdf_report(combined: dict) -> bytes:
+class _TextSink:
     """
-    Returns a PDF bytes object with the summary.
+    Let writers take text or binary file-likes; binary ones get a UTF-8
+    wrapper that is detached (not closed) afterwards. Counts what is written.
     """
-    buf = io.BytesIO()
-    c = canvas.Canvas(buf, pagesize=A4)
-    width, height = A4
 
-    # Title
-    c.setFont("Helvetica-Bold", 16)
-    c.drawString(150, height - 50, "Cloud Security & Data Leak Report")
+    def __init__(self, sink):
+        self.sink = sink
+        self.wrapper = None
+        self.out = None
+        self.written = 0
 
-    y = height - 90
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(40, y, "1) Cloud Scan")
-    y -= 20
-    c.setFont("Helvetica", 11)
+    def write(self, text: str):
+        self.written += len(text)
+        return self.out.write(text)
 
-    cloud = combined.get("cloud_scan") or {}
-    if cloud:
-        lines = [
-            f"URL: {cloud.get('url','')}",
-            f"Status: {cloud.get('status','')} (HTTP {cloud.get('http_code','')})",
-            f"Risk: {cloud.get('risk','Unknown')}",
-        ]
-        for line in lines:
-            c.drawString(60, y, line)
-            y -= 16
-    else:
-        c.drawString(60, y, "No cloud scan performed.")
-        y -= 16
+    def flush(self):
+        self.out.flush()
 
-    # File section
-    y -= 12
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(40, y, "2) File Scan")
-    y -= 20
-    c.setFont("Helvetica", 11)
-    file_scan = combined.get("file_scan") or {}
-    if file_scan and file_scan.get("findings"):
-        c.drawString(60, y, f"File: {file_scan.get('file_name','')}")
-        y -= 16
-        c.drawString(60, y, f"Overall Severity: {file_scan.get('severity','Low')}")
-        y -= 20
-        for f in file_scan["findings"]:
-            # handle page break
-            if y < 80:
-                c.showPage()
-                y = height - 60
-                c.setFont("Helvetica", 11)
-            c.drawString(60, y, f"- {f['type']}: {f['count']} found")
-            y -= 16
-            if f.get("samples"):
-                c.drawString(80, y, "Samples: " + ", ".join(f["samples"]))
-                y -= 16
-    else:
-        c.drawString(60, y, "No sensitive data found or no file scanned.")
-        y -= 16
+    def __enter__(self):
+        if isinstance(self.sink, (io.RawIOBase, io.BufferedIOBase)) or getattr(self.sink, "mode", "").endswith("b"):
+            self.wrapper = io.TextIOWrapper(self.sink, encoding="utf-8", newline="")
+        self.out = self.wrapper or self.sink
+        return self
 
-    # Recommendations
-    y -= 8
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(40, y, "3) Recommendations")
-    y -= 20
-    c.setFont("Helvetica", 11)
-    recs = [
-        "• Restrict public access on cloud storage; review bucket/object ACLs.",
-        "• Avoid storing Aadhaar/PAN/passwords in plain text; encrypt sensitive data.",
-        "• Implement least-privilege IAM roles & enable server-side encryption.",
-    ]
-    for r in recs:
-        if y < 60:
-            c.showPage()
-            y = height - 60
-            c.setFont("Helvetica", 11)
-        c.drawString(60, y, r)
-        y -= 16
+    def __exit__(self, *exc):
+        if self.wrapper is not None:
+            self.wrapper.flush()
+            self.wrapper.detach()
 
-    c.showPage()
-    c.save()
-    buf.seek(0)
-    return buf.read()
+def write_csv_report(results, sink, empty_row: bool = True, flush: bool = False) -> int:
+    """
+    Write CSV rows for an iterable of scan results (cloud and file scans
+    alike) to a text or binary file-like, one result at a time, so memory does
+    not depend on how many results there are. flush=True flushes the sink
+    after every result. Returns the number of rows.
+    """
+    with stage("report", format="csv") as st, _TextSink(sink) as out:
+        writer = csv.writer(out, lineterminator="\n")
+        writer.writerow(CSV_COLUMNS)
+        rows = 0
+        for result in results:
+            for row in _result_rows(result):
+                writer.writerow(row)
+                rows += 1
+            if flush:
+                out.flush()
+        if not rows and empty_row:
+            writer.writerow(("Info", "-", "No issues detected.", "Low"))
+        st.add_bytes(out.written)
+    return rows
+
+def write_jsonl_report(results, sink, flush: bool = False) -> int:
+    """
+    Write each scan result as one JSON line to a text or binary file-like,
+    as it arrives (flushing after each one with flush=True). Returns the
+    number of lines.
+    """
+    lines = 0
+    with stage("report", format="jsonl") as st, _TextSink(sink) as out:
+        for result in results:
+            out.write(json.dumps(result, default=str))
+            out.write("\n")
+            lines += 1
+            if flush:
+                out.flush()
+        st.add_bytes(out.written)
+    return lines
+
+def build_csv_report(combined: dict) -> bytes:
+    buf = io.BytesIO()
+    write_csv_report(_combined_results(combined), buf)
+    return buf.getvalue()
+
+# Report backends by format, as writer(results, sink) functions. The PDF one
+# pulls in reportlab, so it is imported the first time a PDF is written.
+REPORT_WRITERS = LazyRegistry({
+    "csv": write_csv_report,
+    "jsonl": write_jsonl_report,
+    "pdf": "core.pdf_report:write_pdf_report",
+})
+
+def write_pdf_report(results, sink, title: str = "Cloud Security & Data Leak Report") -> int:
+    """
+    Paginated PDF of an iterable of scan results; see core.pdf_report.
+    """
+    return REPORT_WRITERS.get("pdf")(results, sink, title)
+
+def build_pdf_report(combined: dict) -> bytes:
+    """
+    Returns a PDF bytes object with the summary.
+    """
+    buf = io.BytesIO()
+    write_pdf_report(_combined_results(combined), buf)
+    return buf.getvalue()
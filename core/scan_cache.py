@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from utils.regex_patterns import PATTERNS
+from core.data_scanner import scan_file
+
+# Bump when the shape of scan results or the extraction changes, so entries
+# written by an older version (on disk, in particular) are never served.
+RESULT_VERSION = 3
+DEFAULT_MEMORY_BYTES = 64 << 20
+DEFAULT_DISK_BYTES = 512 << 20
+
+def content_digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+def patterns_fingerprint(patterns: dict = None) -> str:
+    """
+    Short hash of a {label: regex} registry; any change to a label or pattern
+    (or to RESULT_VERSION) gives a different fingerprint.
+    """
+    patterns = PATTERNS if patterns is None else patterns
+    items = [(label, p.decode("latin-1") if isinstance(p, bytes) else p) for label, p in patterns.items()]
+    blob = json.dumps([RESULT_VERSION, items]).encode()
+    return hashlib.blake2b(blob, digest_size=8).hexdigest()
+
+class ScanCache:
+    """
+    Scan results by key: an in-memory LRU tier bounded to max_bytes of
+    serialized results, backed by an optional directory bounded to
+    max_disk_bytes (least recently used files go first). Values are stored as
+    JSON, so every get() returns a fresh copy.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MEMORY_BYTES, directory: str = None,
+                 max_disk_bytes: int = DEFAULT_DISK_BYTES):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._disk_size = 0
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._disk_size = sum(size for _, _, size in self._disk_files())
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".json")
+
+    def _disk_files(self):
+        # (last used, path, size) for every stored entry
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(".json") and entry.is_file():
+                    st = entry.stat()
+                    yield st.st_mtime, entry.path, st.st_size
+
+    def _remember(self, key: str, blob: bytes):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= len(old)
+        if len(blob) > self.max_bytes:
+            return
+        self._entries[key] = blob
+        self._size += len(blob)
+        while self._size > self.max_bytes:
+            _, dropped = self._entries.popitem(last=False)
+            self._size -= len(dropped)
+            self.evictions += 1
+
+    def _read_disk(self, key: str):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as fh:
+                blob = fh.read()
+            os.utime(path)  # mark as recently used
+        except OSError:
+            return None
+        return blob
+
+    def _write_disk(self, key: str, blob: bytes):
+        if len(blob) > self.max_disk_bytes:
+            return
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            with open(tmp, "wb") as fh:
+                fh.write(blob)
+            os.replace(tmp, path)
+        except OSError:
+            return
+        self._disk_size += len(blob) - previous
+        if self._disk_size > self.max_disk_bytes:
+            self._trim_disk()
+
+    def _trim_disk(self):
+        files = sorted(self._disk_files())
+        self._disk_size = sum(size for _, _, size in files)
+        for _, path, size in files:
+            if self._disk_size <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self._disk_size -= size
+            self.evictions += 1
+
+    def get(self, key: str):
+        with self._lock:
+            blob = self._entries.get(key)
+            if blob is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return json.loads(blob)
+            if self.directory:
+                blob = self._read_disk(key)
+                if blob is not None:
+                    self._remember(key, blob)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return json.loads(blob)
+            self.misses += 1
+            return None
+
+    def put(self, key: str, result: dict):
+        blob = json.dumps(result).encode()
+        with self._lock:
+            self._remember(key, blob)
+            if self.directory:
+                self._write_disk(key, blob)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            if self.directory:
+                for _, path, _ in list(self._disk_files()):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                self._disk_size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "disk_bytes": self._disk_size,
+            }
+
+_DEFAULT = None
+
+def default_cache() -> ScanCache:
+    """
+    Process-wide cache. Memory only unless SCAN_CACHE_DIR names a directory,
+    since cached results hold samples of the sensitive data that was found.
+    """
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = ScanCache(directory=os.environ.get("SCAN_CACHE_DIR") or None)
+    return _DEFAULT
+
+def scan_key(data: bytes, file_name: str, max_hits: int = None, patterns: dict = None) -> str:
+    # The extension picks the extractor, so the same bytes named .txt and .pdf differ
+    ext = os.path.splitext(file_name.lower())[1].lstrip(".") or "bin"
+    key = f"{content_digest(data)}-{patterns_fingerprint(patterns)}-{ext}"
+    return key if max_hits is None else f"{key}-h{max_hits}"
+
+def scan_file_cached(uploaded_file, cache: ScanCache = None, workers: int = None, max_hits: int = None) -> dict:
+    """
+    scan_file() behind a content-addressed cache: a file whose bytes, type and
+    pattern registry were seen before is answered without extracting or scanning it.
+    """
+    cache = cache or default_cache()
+    file_name = getattr(uploaded_file, "name", "uploaded")
+    key = scan_key(uploaded_file.getvalue(), file_name, max_hits)
+    result = cache.get(key)
+    if result is None:
+        result = scan_file(uploaded_file, workers=workers, max_hits=max_hits)
+        cache.put(key, result)
+    result["file_name"] = file_name
+    return result
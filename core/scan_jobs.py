@@ -0,0 +1,131 @@
+import io
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from core.cloud_scanner import CloudScanCache, make_session, scan_cloud_url
+from core.data_scanner import scan_file
+from core.host_scheduler import HostScheduler
+from core.scan_cache import default_cache, scan_key
+
+# Threads shared by every session of the app. Scans are mostly regex work
+# (one at a time under the GIL) plus network waits for URL probes, so a few
+# more threads than cores keeps probes moving without oversubscribing files.
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+class Job:
+    """
+    One submitted scan as seen by one caller: `name` is what the caller
+    called the target, `future` may be shared with other callers that
+    submitted the same content or URL.
+    """
+
+    def __init__(self, name: str, kind: str, future: Future):
+        self.name = name
+        self.kind = kind
+        self.future = future
+        self.recorded = False  # set by the caller once the result is stored
+        self.finished = None   # monotonic time the scan finished, for showing results in that order
+        future.add_done_callback(self._finish)
+
+    def _finish(self, future: Future):
+        self.finished = time.monotonic()
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def result(self) -> dict:
+        """
+        The scan result (a copy named after this job), or {"file_name"/"url", "error"}.
+        """
+        error = self.future.exception()
+        key = "file_name" if self.kind == "file" else "url"
+        if error is not None:
+            return {key: self.name, "error": str(error)}
+        return {**self.future.result(), key: self.name}
+
+class ScanJobs:
+    """
+    Background pool for the app: file and URL scans queue here instead of
+    running on the Streamlit script thread. File results are memoized by
+    content hash in the scan cache (so across reruns, sessions and, with
+    SCAN_CACHE_DIR, restarts); URL results go through a CloudScanCache. A scan
+    already queued or running for the same content or URL is shared rather
+    than started again.
+    """
+
+    def __init__(self, workers: int = None, cache=None, cloud_cache: CloudScanCache = None,
+                 scheduler: HostScheduler = None):
+        self.workers = workers or DEFAULT_WORKERS
+        self.cache = cache or default_cache()
+        self.cloud_cache = cloud_cache or CloudScanCache()
+        self.scheduler = scheduler or HostScheduler()
+        self.pool = ThreadPoolExecutor(self.workers, thread_name_prefix="scan-job")
+        self._session = None
+        self._running = {}
+        self._lock = threading.RLock()
+
+    def _shared(self, key: str, fn, *args) -> Future:
+        with self._lock:
+            future = self._running.get(key)
+            if future is None:
+                future = self._running[key] = self.pool.submit(fn, *args)
+                future.add_done_callback(lambda f, key=key: self._forget(key, f))
+            return future
+
+    def _forget(self, key: str, future: Future):
+        with self._lock:
+            if self._running.get(key) is future:
+                del self._running[key]
+
+    def _scan_data(self, key: str, name: str, data: bytes) -> dict:
+        upload = io.BytesIO(data)
+        upload.name = name
+        # workers=1: a process pool forked from this multi-threaded process
+        # (large PDFs) could inherit locks held by other scan threads.
+        result = scan_file(upload, workers=1)
+        self.cache.put(key, result)
+        return result
+
+    def submit_file(self, name: str, data: bytes) -> Job:
+        """
+        Queue a scan_file() of `data`; a cached result comes back already done.
+        """
+        key = scan_key(data, name)
+        result = self.cache.get(key)
+        if result is not None:
+            future = Future()
+            future.set_result(result)
+        else:
+            future = self._shared("file:" + key, self._scan_data, key, name, data)
+        return Job(name, "file", future)
+
+    def _probe(self, url: str) -> dict:
+        with self._lock:
+            if self._session is None:
+                self._session = make_session(pool_size=self.workers)
+        return scan_cloud_url(url, self._session, cache=self.cloud_cache, scheduler=self.scheduler)
+
+    def submit_url(self, url: str) -> Job:
+        """
+        Queue a scan_cloud_url() of `url`, rate limited per host.
+        """
+        return Job(url, "cloud", self._shared("url:" + url, self._probe, url))
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._running)
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        if self._session is not None:
+            self._session.close()
+
+def wait_any(jobs, timeout: float = None) -> list:
+    """
+    Block until one of `jobs` finishes or `timeout` passes; the jobs still running.
+    """
+    running = {job.future for job in jobs if not job.done()}
+    if running:
+        wait(running, timeout, return_when=FIRST_COMPLETED)
+    return [job for job in jobs if not job.done()]
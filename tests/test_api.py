@@ -0,0 +1,117 @@
+import http.client
+import io
+import json
+import socket
+import threading
+import time
+import zipfile
+import pytest
+from api import RequestError, ScanService, make_server
+
+@pytest.fixture(scope="module")
+def api():
+    service = ScanService(workers=1, queue_size=2)
+    server = make_server(service, port=0, sync_max_bytes=1024)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield service, server.server_port
+    server.shutdown()
+    server.server_close()
+    service.close()
+
+def _request(port: int, method: str, path: str, body=None, headers=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    conn.request(method, path, body, headers or {}, encode_chunked="Transfer-Encoding" in (headers or {}))
+    resp = conn.getresponse()
+    data = resp.read()
+    conn.close()
+    return resp.status, dict(resp.getheaders()), data
+
+def _raw(port: int, head: str) -> bytes:
+    # Sends only the request head; the server must answer and hang up without the body
+    with socket.create_connection(("127.0.0.1", port), timeout=10) as sock:
+        sock.sendall(head.encode())
+        data = b""
+        while chunk := sock.recv(65536):
+            data += chunk
+    return data
+
+def test_sync_scan_and_backpressure(api):
+    service, port = api
+    status, _, body = _request(port, "POST", "/scan/file?name=a.txt", b"PAN ABCDE1234F mail demo@example.com")
+    result = json.loads(body)
+    assert status == 200 and result["file_name"] == "a.txt" and result["severity"] == "High"
+
+    status, _, body = _request(port, "POST", "/scan/file?name=big.txt", b"x" * 2048)
+    assert status == 413
+
+    service._sync_slots.acquire()  # the only slot is taken
+    try:
+        status, headers, _ = _request(port, "POST", "/scan/file?name=a.txt", b"hello")
+        assert status == 429 and headers["Retry-After"] == "1"
+    finally:
+        service._sync_slots.release()
+
+def test_job_upload_streams_archive_members(api):
+    _, port = api
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        zf.writestr("docs/a.txt", "Aadhaar 1234 5678 9012")
+        zf.writestr("docs/b.log", "mail demo@example.com")
+        zf.writestr("image.png", b"\x89PNG")
+    data = buf.getvalue()
+    # chunked upload, bigger than the synchronous limit
+    chunks = iter([data[:100], data[100:]])
+    status, headers, body = _request(port, "POST", "/jobs?name=batch.zip", chunks,
+                                     {"Transfer-Encoding": "chunked"})
+    assert status == 202
+    job = json.loads(body)
+    assert headers["Location"] == f"/jobs/{job['id']}" and job["status"] in ("queued", "running")
+
+    deadline = time.time() + 30
+    while job["status"] not in ("done", "failed") and time.time() < deadline:
+        time.sleep(0.05)
+        job = json.loads(_request(port, "GET", f"/jobs/{job['id']}")[2])
+    assert (job["status"], job["total"], job["done"], job["errors"]) == ("done", 2, 2, 0)
+
+    status, headers, body = _request(port, "GET", f"/jobs/{job['id']}/results")
+    records = {r["file_name"]: r["severity"] for r in map(json.loads, body.splitlines())}
+    assert records == {"batch.zip!docs/a.txt": "High", "batch.zip!docs/b.log": "Medium"}
+    assert headers["X-Job-Status"] == "done"
+    assert _request(port, "GET", f"/jobs/{job['id']}/results?offset=1")[2].count(b"\n") == 1
+    assert _request(port, "GET", "/jobs/nope")[0] == 404
+
+def test_timed_out_scan_keeps_its_slot():
+    service = ScanService(workers=1, max_sync=1, sync_timeout=0)
+    try:
+        with pytest.raises(RequestError) as e:
+            service.scan_file("a.txt", b"mail demo@example.com")
+        assert e.value.status == 504
+        assert not service._sync_slots.acquire(blocking=False)  # the scan is still running
+        deadline = time.time() + 30
+        while not service._sync_slots.acquire(timeout=0.05):
+            assert time.time() < deadline
+        service._sync_slots.release()
+    finally:
+        service.close()
+
+def test_full_queue_rejects_jobs_before_reading_them(api):
+    service, port = api
+    service.reserve()
+    service.reserve()
+    try:
+        reply = _raw(port, "POST /jobs?name=big.zip HTTP/1.1\r\nHost: x\r\nContent-Length: 100000000\r\n\r\n")
+        assert reply.startswith(b"HTTP/1.1 429") and b"Retry-After: 5" in reply
+    finally:
+        service.unreserve()
+        service.unreserve()
+    assert service.health()["queued"] == 0
+
+def test_bad_requests_close_unread_bodies(api):
+    _, port = api
+    head = "POST {} HTTP/1.1\r\nHost: x\r\nContent-Length: 100000000\r\n\r\n"
+    assert _raw(port, head.format("/nope")).startswith(b"HTTP/1.1 404")
+    assert _raw(port, head.format("/jobs?name=a.txt&wait=soon")).startswith(b"HTTP/1.1 400")
+    assert _raw(port, head.format("/jobs?name=photo.png")).startswith(b"HTTP/1.1 415")
+    job_id = json.loads(_request(port, "POST", "/jobs?name=a.txt", b"hello")[2])["id"]
+    assert _request(port, "GET", f"/jobs/{job_id}/results?offset=x")[0] == 400
+    assert _request(port, "GET", f"/jobs/{job_id}/results?offset=-1")[0] == 400
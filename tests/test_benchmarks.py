@@ -0,0 +1,34 @@
+from benchmarks.corpus import make_corpus
+from benchmarks.load_test import percentile, run_load
+from benchmarks.run_suite import compare
+from core.data_scanner import scan_file
+from tests.test_data import _mk_upload
+
+def test_corpus_documents_scan_alike():
+    corpus = make_corpus(size=5_000, density=0.05)
+    types = {name: {f["type"] for f in scan_file(_mk_upload(name, data))["findings"]} for name, data in corpus.items()}
+    assert types["corpus.txt"] == types["corpus.docx"] == types["corpus.pdf"]
+    assert {"Email", "Phone", "PAN"} <= types["corpus.txt"]
+
+def test_compare_flags_only_real_slowdowns():
+    old = [{"name": "a", "seconds": 1.0}, {"name": "b", "seconds": 0.001}, {"name": "c", "seconds": 1.0}]
+    new = [{"name": "a", "seconds": 1.5}, {"name": "b", "seconds": 0.003}, {"name": "c", "seconds": 1.1}]
+    assert compare(new, old, threshold=0.2) == [("a", 1.0, 1.5)]
+
+def test_percentile_by_nearest_rank():
+    values = [float(n) for n in range(1, 101)]
+    assert [percentile(values, q) for q in (50, 90, 99, 100)] == [50.0, 90.0, 99.0, 100.0]
+    assert percentile([0.2], 99) == 0.2 and percentile([], 50) == 0.0
+
+def test_load_retries_rejections_and_reports_them_apart():
+    answers = {}
+
+    def call(n):
+        answers[n] = answers.get(n, 0) + 1
+        if n % 2 and answers[n] == 1:
+            return 429, {"Retry-After": "0"}
+        return (200 if n < 8 else 429), {"Retry-After": "0"}
+
+    summary = run_load(call, requests=10, concurrency=3, retries=2)
+    assert (summary["ok"], summary["rejected"], summary["errors"]) == (8, 2, 0)
+    assert summary["attempts"] == 18 and summary["rejection_rate"] == 10 / 18
@@ -0,0 +1,63 @@
+from urllib.parse import parse_qs, urlparse
+from core.bucket_scanner import list_bucket, scan_bucket
+from tests.http_stub import StubServer
+
+S3_NS = "http://s3.amazonaws.com/doc/2006-03-01/"
+
+def _s3_page(keys, token=None):
+    items = "".join(f"<Contents><Key>{k}</Key><Size>{len(k)}</Size></Contents>" for k in keys)
+    more = f"<IsTruncated>true</IsTruncated><NextContinuationToken>{token}</NextContinuationToken>" if token else "<IsTruncated>false</IsTruncated>"
+    return f'<?xml version="1.0"?><ListBucketResult xmlns="{S3_NS}"><Name>b</Name>{items}{more}</ListBucketResult>'.encode()
+
+def _fake_store(pages, public):
+    def respond(method, path, headers):
+        url = urlparse(path)
+        if url.path == "/bucket":
+            token = parse_qs(url.query).get("continuation-token", ["0"])[0]
+            keys, nxt = pages[token]
+            return 200, {"Content-Type": "application/xml"}, _s3_page(keys, nxt)
+        key = url.path[len("/bucket/"):]
+        return (200, {"Content-Length": "3"}, b"abc") if key in public else (403, {}, b"")
+    return respond
+
+def test_scan_bucket_follows_continuation_tokens():
+    pages = {"0": (["a.txt", "dir/b.csv"], "t1"), "t1": (["c key.bin"], "t2"), "t2": (["d.txt"], None)}
+    with StubServer(_fake_store(pages, public={"a.txt", "c%20key.bin"})) as server:
+        results = list(scan_bucket(server.url("/bucket/"), max_workers=2, provider="s3"))
+        listings = [p for m, p, _ in server.requests if p.startswith("/bucket?")]
+
+    bucket, objects = results[0], {r["key"]: r for r in results[1:]}
+    assert (bucket["listable"], bucket["risk"]) == (True, "High")
+    assert set(objects) == {"a.txt", "dir/b.csv", "c key.bin", "d.txt"}
+    assert objects["a.txt"]["http_code"] == 200 and objects["d.txt"]["http_code"] == 403
+    assert objects["c key.bin"]["listed_size"] == len("c key.bin")
+    assert len(listings) == 3
+
+def test_listing_error_part_way_ends_with_a_status_record():
+    store = _fake_store({"0": (["a.txt"], "t1")}, public={"a.txt"})
+
+    def respond(method, path, headers):
+        return (500, {}, b"") if "continuation-token=t1" in path else store(method, path, headers)
+
+    with StubServer(respond) as server:
+        results = list(scan_bucket(server.url("/bucket/"), provider="s3"))
+    bucket, obj, last = results
+    assert bucket["notes"] == ["Anyone can enumerate the objects in this bucket."]
+    assert obj["key"] == "a.txt" and obj["http_code"] == 200
+    assert last["partial"] and last["url"] == bucket["url"] and last["notes"][-1].startswith("Listing stopped early")
+
+def test_unlistable_bucket_and_azure_listing():
+    with StubServer(lambda m, p, h: (403, {}, b"")) as server:
+        bucket, = scan_bucket(server.url("/bucket"), provider="s3")
+    assert (bucket["listable"], bucket["http_code"]) == (False, 403)
+
+    page = b'<?xml version="1.0"?><html xmlns="http://www.w3.org/1999/xhtml"><body><p>Welcome</p></body></html>'
+    with StubServer(lambda m, p, h: (200, {"Content-Type": "application/xhtml+xml"}, page)) as server:
+        bucket, = scan_bucket(server.url("/bucket"), provider="s3")
+    assert (bucket["listable"], bucket["risk"], bucket["status"]) == (False, "Low", "Not listable (unexpected response)")
+
+    blobs = "".join(f"<Blob><Name>f{i}</Name><Properties><Content-Length>{i}</Content-Length></Properties></Blob>" for i in range(3))
+    body = f'<?xml version="1.0"?><EnumerationResults><Blobs>{blobs}</Blobs><NextMarker/></EnumerationResults>'.encode()
+    with StubServer(lambda m, p, h: (200, {}, body)) as server:
+        assert list(list_bucket(server.url("/container"), provider="azure")) == [("f0", 0), ("f1", 1), ("f2", 2)]
+        assert "restype=container&comp=list" in server.requests[0][1]
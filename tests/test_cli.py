@@ -0,0 +1,42 @@
+import io
+import json
+import subprocess
+import sys
+import tarfile
+import zipfile
+from cli import run_batch
+
+def test_batch_scans_tree_and_archives(tmp_path):
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "a.txt").write_text("contact user@example.com")
+    (tmp_path / "docs" / "skip.bin").write_bytes(b"user@example.com")
+    with zipfile.ZipFile(tmp_path / "bundle.zip", "w") as zf:
+        zf.writestr("inner/b.txt", "PAN ABCDE1234F")
+    with tarfile.open(tmp_path / "logs.tar.gz", "w:gz") as tf:
+        data = b"call 9876543210"
+        info = tarfile.TarInfo("c.txt")
+        info.size = len(data)
+        tf.addfile(info, io.BytesIO(data))
+
+    out = io.StringIO()
+    stats = run_batch([str(tmp_path)], out, workers=2)
+    records = {r["file_name"].replace(str(tmp_path), ""): r for r in map(json.loads, out.getvalue().splitlines())}
+
+    assert set(records) == {"/docs/a.txt", "/bundle.zip!inner/b.txt", "/logs.tar.gz!c.txt"}
+    assert records["/docs/a.txt"]["findings"][0]["type"] == "Email"
+    assert records["/bundle.zip!inner/b.txt"]["severity"] == "High"
+    assert records["/logs.tar.gz!c.txt"]["findings"][0]["type"] == "Phone"
+    assert (stats["files"], stats["errors"]) == (3, 0)
+    assert stats["files_per_second"] > 0
+
+def test_cli_does_not_import_streamlit():
+    code = "import sys, cli; assert 'streamlit' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+def test_batch_csv_output(tmp_path):
+    (tmp_path / "a.txt").write_text("contact user@example.com, phone 9876543210")
+    out = io.StringIO()
+    run_batch([str(tmp_path)], out, workers=1, fmt="csv")
+    lines = out.getvalue().splitlines()
+    assert lines[0] == "Section,Item,Detail,Severity"
+    assert sorted(line.split(",")[2] for line in lines[1:]) == ["Email (1 found)", "Phone (1 found)"]
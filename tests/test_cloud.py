@@ -1,4 +1,5 @@
-from core.cloud_scanner import scan_cloud_url
+from core.cloud_scanner import CloudScanCache, scan_cloud_url, scan_cloud_urls
+from tests.http_stub import StubServer
 
 def test_scan_cloud_url_fields():
     res = scan_cloud_url("https://example.com")
@@ -9,3 +10,69 @@ def test_scan_cloud_url_fields():
 def test_scan_cloud_url_risk_value():
     res = scan_cloud_url("https://example.com")
     assert res["risk"] in {"Low", "Medium", "High", "Unknown"}
+
+def test_scan_cloud_urls_batch_reuses_connections():
+    def respond(method, path, headers):
+        return (200, {}, b"ok") if path.startswith("/public") else (403, {}, b"denied")
+
+    with StubServer(respond) as server:
+        urls = [server.url(f"/public/{i}") for i in range(40)] + [server.url(f"/private/{i}") for i in range(10)]
+        results = list(scan_cloud_urls(iter(urls), max_workers=4))
+
+    assert sorted(r["url"] for r in results) == sorted(urls)
+    for res in results:
+        assert {"url", "host", "status", "http_code", "risk", "notes"} <= set(res)
+        assert res["http_code"] == (200 if "/public/" in res["url"] else 403)
+    # keep-alive pool: at most one connection per worker for 50 requests
+    assert len(server.connections) <= 4
+
+def test_probe_reads_headers_not_bodies():
+    big = b"x" * 5_000_000
+
+    def respond(method, path, headers):
+        if path == "/head-ok":
+            return 200, {"Content-Type": "text/csv"}, big
+        if method == "HEAD":
+            return 405, {}, b""
+        if path == "/ranged" and headers.get("Range") == "bytes=0-0":
+            return 206, {"Content-Range": f"bytes 0-0/{len(big)}", "Content-Type": "application/zip"}, big[:1]
+        return 200, {"Content-Type": "application/octet-stream"}, big  # ignores Range
+
+    with StubServer(respond) as server:
+        head = scan_cloud_url(server.url("/head-ok"))
+        ranged = scan_cloud_url(server.url("/ranged"))
+        ignored = scan_cloud_url(server.url("/no-range"))
+
+    assert (head["probe"], head["content_length"], head["content_type"]) == ("HEAD", len(big), "text/csv")
+    assert (ranged["probe"], ranged["http_code"], ranged["content_length"]) == ("GET", 206, len(big))
+    assert ranged["status"] == "Website accessible"
+    assert (ignored["probe"], ignored["http_code"], ignored["content_length"]) == ("GET", 200, len(big))
+    assert [m for m, _, _ in server.requests if m == "GET"] == ["GET", "GET"]
+
+def test_cache_serves_fresh_and_revalidates_stale_entries():
+    etag = {"value": '"v1"'}
+
+    def respond(method, path, headers):
+        if headers.get("If-None-Match") == etag["value"]:
+            return 304, {"ETag": etag["value"]}, b""
+        return 200, {"ETag": etag["value"], "Content-Type": "text/plain"}, b"data"
+
+    now = [0.0]
+    cache = CloudScanCache(ttl=60, clock=lambda: now[0])
+    with StubServer(respond) as server:
+        url = server.url("/obj")
+        first = scan_cloud_url(url, cache=cache)
+        fresh = scan_cloud_url(url, cache=cache)
+        now[0] = 120
+        unchanged = scan_cloud_url(url, cache=cache)
+        now[0] = 240
+        etag["value"] = '"v2"'
+        changed = scan_cloud_url(url, cache=cache)
+
+    assert (first["cache"], first["changed"], first["etag"]) == ("miss", None, '"v1"')
+    assert (fresh["cache"], fresh["changed"]) == ("fresh", False)
+    assert (unchanged["cache"], unchanged["changed"], unchanged["http_code"]) == ("revalidated", False, 200)
+    assert (changed["cache"], changed["changed"], changed["etag"]) == ("miss", True, '"v2"')
+    assert len(server.requests) == 3
+    assert server.requests[1][2].get("If-None-Match") == '"v1"'
+    assert cache.stats() == {"hits": 1, "revalidated": 1, "misses": 2, "entries": 1}
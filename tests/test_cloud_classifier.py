@@ -0,0 +1,32 @@
+from core.cloud_classifier import classify_bulk, classify_url
+
+def test_classify_url_providers_and_styles():
+    cases = {
+        "https://my-bucket.s3.amazonaws.com/a/b.csv": ("aws-s3", "virtual-hosted", "my-bucket", "a/b.csv", None),
+        "https://s3.eu-west-1.amazonaws.com/my-bucket/x%20y.txt": ("aws-s3", "path", "my-bucket", "x y.txt", "eu-west-1"),
+        "https://logs.prod.s3-us-west-2.amazonaws.com/k": ("aws-s3", "virtual-hosted", "logs.prod", "k", "us-west-2"),
+        "http://site.s3-website-us-east-1.amazonaws.com/": ("aws-s3", "virtual-hosted", "site", None, "us-east-1"),
+        "https://acct.blob.core.windows.net/backups/db.bak": ("azure-blob", "path", "backups", "db.bak", None),
+        "https://storage.googleapis.com/gbucket/obj": ("gcs", "path", "gbucket", "obj", None),
+        "https://gbucket.storage.googleapis.com/obj": ("gcs", "virtual-hosted", "gbucket", "obj", None),
+        "https://space.nyc3.digitaloceanspaces.com/f.pdf": ("do-spaces", "virtual-hosted", "space", "f.pdf", "nyc3"),
+        "https://b.oss-cn-hangzhou-internal.aliyuncs.com/o": ("alibaba-oss", "virtual-hosted", "b", "o", "cn-hangzhou"),
+    }
+    for url, expected in cases.items():
+        info = classify_url(url)
+        assert (info["provider"], info["style"], info["bucket"], info["key"], info["region"]) == expected, url
+    assert classify_url("https://acct.blob.core.windows.net/backups/db.bak")["account"] == "acct"
+
+    for url in ("https://example.com/s3/file", "https://ec2.amazonaws.com/", "https://mys3.amazonaws.com.evil.io/x", "not a url"):
+        assert classify_url(url) is None, url
+
+def test_classify_bulk_dedupes_log_urls():
+    lines = [
+        '1.2.3.4 "GET https://b.s3.amazonaws.com/k1?X-Amz-Signature=a HTTP/1.1" 200',
+        '1.2.3.4 "GET https://b.s3.amazonaws.com/k1?X-Amz-Signature=b HTTP/1.1" 200',
+        'CONNECT https://b.s3.amazonaws.com/k2 https://example.com/page',
+        'no urls here',
+    ] * 1000
+    objects = list(classify_bulk(lines))
+    assert [url for url, _ in objects] == ["https://b.s3.amazonaws.com/k1", "https://b.s3.amazonaws.com/k2"]
+    assert len(list(classify_bulk(lines, per="bucket"))) == 1
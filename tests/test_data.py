@@ -1,11 +1,38 @@
 import io
-from core.data_scanner import scan_file
+import re
+import time
+import tracemalloc
+import zipfile
+from reportlab.pdfgen import canvas
+from core.data_scanner import TriageBudget, iter_matches, scan_file, scan_file_streaming, scan_path, triage_file
+from utils.docx_extract import iter_docx_paragraphs
+from utils.regex_patterns import PATTERNS
 
 def _mk_upload(name: str, content: bytes):
     f = io.BytesIO(content)
     f.name = name
     return f
 
+def _mk_pdf(pages) -> bytes:
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf)
+    for lines in pages:
+        y = 800
+        for line in lines:
+            c.drawString(40, y, line)
+            y -= 16
+        c.showPage()
+    c.save()
+    return buf.getvalue()
+
+def _mk_docx(parts: dict) -> bytes:
+    ns = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        for name, (root, body) in parts.items():
+            zf.writestr(f"word/{name}.xml", f"<w:{root} {ns}>{body}</w:{root}>")
+    return buf.getvalue()
+
 def test_scan_file_with_sensitive_data():
     content = b"My Aadhaar is 1234 5678 9012 and email is demo@example.com"
     f = _mk_upload("test.txt", content)
@@ -21,3 +48,125 @@ def test_scan_file_clean():
     res = scan_file(f)
     assert res["severity"] == "Low"
     assert res["findings"] == []
+
+def test_scan_file_password_tokens():
+    content = b"user=admin pass=Secret@123 note=deadline2024 color=orange 42"
+    res = scan_file(_mk_upload("creds.txt", content))
+    passwords = next(f for f in res["findings"] if f["type"] == "Password")
+    assert passwords["samples"] == ["Secret@123", "deadline2024"]
+    assert res["severity"] == "High"
+
+def test_scan_file_long_single_line_is_linear():
+    # Used to backtrack quadratically: one multi-megabyte line with no whitespace
+    lines = [b"a" * 3_000_000, b'{"id":"x1","v":"abc"},' * 150_000, b"Ab1" * 1_000_000]
+    start = time.perf_counter()
+    for content in lines:
+        scan_file(_mk_upload("blob.txt", content))
+    assert time.perf_counter() - start < 10
+
+def test_streaming_matches_whole_file_scan():
+    content = ("Aadhaar 1234 5678 9012, mail demo@example.com, call 9876543210,\n"
+               "PAN ABCDE1234F token Secret@123 é " * 40).encode()
+    expected = scan_file(_mk_upload("big.txt", content))
+    # tiny chunks so matches and multi-byte characters straddle chunk boundaries
+    for chunk_size in (3, 17, 64):
+        res = scan_file_streaming(_mk_upload("big.txt", content), chunk_size=chunk_size, overlap=32)
+        assert res == expected
+
+def test_scan_path_matches_upload_scan(tmp_path):
+    content = b"id 1234 5678 9012 mail demo@example.com\nPAN ABCDE1234F Secret@123 9876543210\n"
+    log = tmp_path / "app.log"
+    log.write_bytes(content)
+    res = scan_path(str(log))
+    assert res["file_name"] == "app.log"
+    assert res["findings"] == scan_file(_mk_upload("app.txt", content))["findings"]
+
+    empty = tmp_path / "empty.log"
+    empty.write_bytes(b"")
+    assert scan_path(str(empty))["findings"] == []
+
+def test_pdf_findings_record_pages():
+    data = _mk_pdf([["Aadhaar 1234 5678 9012"], ["nothing here"], ["mail demo@example.com", "again 1234 5678 9012"]])
+    res = scan_file(_mk_upload("doc.pdf", data))
+    pages = {f["type"]: f["pages"] for f in res["findings"]}
+    assert pages == {"Aadhaar": [1, 3], "Email": [3]}
+    assert "partial" not in res
+    assert scan_file(_mk_upload("doc.pdf", data), workers=2) == res
+
+def test_pdf_scan_stops_at_hit_cap():
+    data = _mk_pdf([["Aadhaar 1234 5678 9012"], ["mail demo@example.com"]])
+    res = scan_file(_mk_upload("doc.pdf", data), max_hits=1)
+    assert res["partial"] is True
+    assert [f["type"] for f in res["findings"]] == ["Aadhaar"]
+
+def test_docx_extracts_tables_headers_and_comments():
+    data = _mk_docx({
+        "document": ("document", "<w:body>"
+                     "<w:p><w:pPr><w:tabs><w:tab w:val='left' w:pos='720'/></w:tabs></w:pPr>"
+                     "<w:r><w:t>Name</w:t><w:tab/><w:t>PAN ABCDE1234F</w:t></w:r></w:p>"
+                     "<w:tbl><w:tr><w:tc><w:p><w:r><w:t>demo@example.com</w:t></w:r></w:p></w:tc></w:tr></w:tbl>"
+                     "<w:p><w:r><w:t>outer</w:t><w:pict><w:txbxContent><w:p><w:r><w:t>boxed</w:t></w:r></w:p>"
+                     "</w:txbxContent></w:pict></w:r></w:p></w:body>"),
+        "header1": ("hdr", "<w:p><w:r><w:t>Helpline 9876543210</w:t></w:r></w:p>"),
+        "comments": ("comments", "<w:comment w:id='0'><w:p><w:r><w:t>pw Secret@123</w:t></w:r></w:p></w:comment>"),
+    })
+    assert list(iter_docx_paragraphs(data)) == [
+        "Name\tPAN ABCDE1234F", "demo@example.com", "boxed", "outer", "pw Secret@123", "Helpline 9876543210",
+    ]
+    res = scan_file(_mk_upload("doc.docx", data))
+    assert {f["type"] for f in res["findings"]} == {"PAN", "Email", "Phone", "Password"}
+
+def test_docx_table_memory_stays_flat():
+    row = ("<w:tr><w:tc><w:p><w:r><w:t>cell</w:t></w:r></w:p></w:tc>"
+           "<w:tc><w:p><w:r><w:t>demo@example.com</w:t></w:r></w:p></w:tc></w:tr>")
+    data = _mk_docx({"document": ("document", "<w:body><w:tbl>" + row * 100_000 + "</w:tbl></w:body>")})
+    tracemalloc.start()
+    count = sum(1 for _ in iter_docx_paragraphs(data))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert count == 200_000 and peak < 4 << 20
+
+def test_triage_stops_at_first_high_hit():
+    content = b"mail demo@example.com\n" + b"PAN ABCDE1234F\n" + b"filler words here\n" * 200_000
+    res = triage_file(_mk_upload("big.txt", content))
+    assert res["severity"] == "High" and res["partial"] is True
+    assert res["triage"]["stopped"] == "verdict"
+    assert res["triage"]["checked"] == ["Aadhaar", "PAN", "Password"]
+    assert res["triage"]["chars_read"] < len(content) // 10
+    assert [f["type"] for f in res["findings"]] == ["PAN"]
+
+    medium = triage_file(_mk_upload("mail.txt", b"mail demo@example.com only"), min_severity="Medium")
+    assert medium["severity"] == "Medium" and "partial" not in medium
+    assert medium["triage"]["stopped"] is None
+
+def test_triage_budgets_end_the_scan():
+    content = b"filler words here\n" * 100_000 + b"PAN ABCDE1234F\n"
+    res = triage_file(_mk_upload("big.txt", content), TriageBudget(max_bytes=10_000))
+    assert (res["severity"], res["partial"], res["triage"]["stopped"]) == ("Low", True, "bytes")
+    assert res["triage"]["chars_read"] == 10_000
+
+    ticks = iter(range(100))
+    res = triage_file(_mk_upload("big.txt", content), TriageBudget(seconds=2), clock=lambda: next(ticks))
+    assert res["triage"]["stopped"] == "time" and res["findings"] == []
+
+def test_streaming_keeps_tokens_that_span_chunks():
+    # The Password lookaheads read to the end of the token, which only arrives chunks later
+    for text in ("x" * 10_000 + "1 tail", "q " + "a" * 9_000 + "9", "ok " * 700 + "Ab" * 3_000 + "7 done"):
+        res = scan_file_streaming(_mk_upload("long.txt", text.encode()), chunk_size=1024, overlap=64)
+        found = {f["type"]: f["count"] for f in res["findings"]}
+        assert found.get("Password") == len(re.findall(PATTERNS["Password"], text))
+
+def test_scan_file_finds_password_in_multi_megabyte_token():
+    content = b"data=" + b"QUJD" * 1_000_000 + b"9 end"
+    res = scan_file(_mk_upload("blob.txt", content))
+    assert [(f["type"], f["count"]) for f in res["findings"]] == [("Password", 1)]
+
+def test_streaming_memory_stays_bounded_on_minified_json():
+    record = '{"id":123456,"name":"user","mail":"nobody","tags":["a","b"]}'
+    text = "[" + ",".join([record] * 150_000) + "]"  # 9 MB, not one blank
+    chunk = 1 << 20
+    tracemalloc.start()
+    hits = sum(1 for _ in iter_matches(text[i:i + chunk] for i in range(0, len(text), chunk)))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert hits == 0 and peak < 4 * chunk
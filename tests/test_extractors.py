@@ -0,0 +1,110 @@
+import gzip
+import io
+import json
+import tarfile
+import zipfile
+from core.data_scanner import scan_file
+from tests.test_data import _mk_docx, _mk_pdf, _mk_upload
+from utils.file_loader import ExtractLimits, detect_format, iter_text_from_uploaded, load_text_from_uploaded
+
+_SS = 'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+
+def _mk_xlsx(rows) -> bytes:
+    shared = sorted({c for row in rows for c in row if isinstance(c, str)})
+    cells = lambda row: "".join(f'<c t="s"><v>{shared.index(c)}</v></c>' if isinstance(c, str) else f"<c><v>{c}</v></c>"
+                                for c in row)
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        zf.writestr("xl/workbook.xml", f"<workbook {_SS}/>")
+        zf.writestr("xl/sharedStrings.xml", f"<sst {_SS}>" + "".join(f"<si><t>{s}</t></si>" for s in shared) + "</sst>")
+        zf.writestr("xl/worksheets/sheet1.xml", f"<worksheet {_SS}><sheetData>"
+                    + "".join(f"<row>{cells(row)}</row>" for row in rows) + "</sheetData></worksheet>")
+    return buf.getvalue()
+
+def _mk_tgz(files: dict) -> bytes:
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w:gz") as tf:
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tf.addfile(info, io.BytesIO(data))
+    return buf.getvalue()
+
+def _mk_zip(files: dict) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in files.items():
+            zf.writestr(name, data)
+    return buf.getvalue()
+
+def test_detects_formats_by_content():
+    assert detect_format("report.txt", _mk_pdf([["x"]])) == "pdf"
+    assert detect_format("notes.dat", "hi there".encode("utf-16")) == "txt"
+    assert detect_format("blob.dat", b"\x00\x01\x02") is None
+    assert detect_format("a.docx", b"PK\x03\x04") == "docx"
+    assert detect_format("a.bin", b"PK\x03\x04") == "zip"
+    assert detect_format("export.csv", b"a,b\n") == "csv"
+
+def test_archive_of_mixed_formats_is_scanned_member_by_member():
+    docx = _mk_docx({"document": ("document", "<w:body><w:p><w:r><w:t>mail docx@example.com</w:t></w:r></w:p></w:body>")})
+    bundle = _mk_zip({
+        "renamed.txt": _mk_pdf([["pan ABCDE1234F"]]),
+        "renamed.bin": docx,
+        "sheet.xlsx": _mk_xlsx([["name", "phone"], ["x@example.com", 9876543210]]),
+        "export.csv": b'name,notes\n"Bob","first line\nid 1234 5678 9012"\n',
+        "doc.json": json.dumps({"user": {"email": "esc@example.com"}}).replace("@", "\\u0040").encode(),
+        "rows.jsonl": b'{"mail": "j1@example.com"}\nnot json\n',
+        "nested.tgz": _mk_tgz({"deep/a.txt": b"tar 9988776655", "access.log.gz": gzip.compress(b"GET /?u=log%40example.com\n")}),
+        "wide.txt": "utf16 u16@example.com".encode("utf-16"),
+    })
+    text = load_text_from_uploaded(_mk_upload("upload.dat", bundle))
+    assert "x@example.com | 9876543210" in text and "Bob | first line\nid 1234 5678 9012" in text
+    assert "email: esc@example.com" in text and "log@example.com" in text
+
+    found = {f["type"]: f for f in scan_file(_mk_upload("upload.dat", bundle))["findings"]}
+    assert set(found["Email"]["samples"]) == {"docx@example.com", "esc@example.com", "j1@example.com",
+                                              "log@example.com", "u16@example.com"}
+    assert found["Phone"]["count"] == 2 and found["PAN"]["count"] == found["Aadhaar"]["count"] == 1
+
+def test_limits_stop_deep_nesting_and_decompression_bombs():
+    nested = _mk_zip({"outer.zip": _mk_zip({"inner.txt": b"deep@example.com"}), "top.txt": b"top@example.com"})
+    limits = ExtractLimits(max_depth=1)
+    text = "".join(iter_text_from_uploaded(_mk_upload("n.zip", nested), limits=limits))
+    assert "top@example.com" in text and "deep@example.com" not in text and limits.skipped == ["outer.zip"]
+
+    bomb = _mk_zip({"big.txt": b"a" * (64 << 20) + b" late@example.com"})
+    limits = ExtractLimits(max_bytes=8 << 20, chunk_size=1 << 20)
+    size = sum(map(len, iter_text_from_uploaded(_mk_upload("b.zip", bomb), limits=limits)))
+    assert size <= 8 << 20 and limits.expanded <= (8 << 20) + (1 << 20)
+    assert limits.truncated == ["big.txt"] and limits.incomplete == ["big.txt"]
+
+def test_scan_reports_what_the_limits_left_out():
+    leak = b"PAN ABCDE1234F"
+    for depth in range(5):
+        leak = _mk_zip({f"layer{depth}.zip" if depth else "leak.txt": leak})
+    res = scan_file(_mk_upload("wrapped.zip", leak))
+    assert res["findings"] == [] and res["partial"] and res["incomplete"] == ["layer1.zip"]
+
+    broken = _mk_zip({"a.zip": b"PK\x03\x04 not a zip", "b.txt": b"mail demo@example.com"})
+    res = scan_file(_mk_upload("broken.zip", broken))
+    assert [f["type"] for f in res["findings"]] == ["Email"] and res["incomplete"] == ["a.zip"]
+    assert "partial" not in scan_file(_mk_upload("ok.zip", _mk_zip({"b.txt": b"x"})))
+
+def test_text_mentioning_a_signature_stays_text():
+    notes = b"Upgrade to %PDF-1.4 output later.\nPAN ABCDE1234F token Secret@123\n"
+    assert detect_format("notes.txt", notes) == "txt"
+    assert detect_format("upload.bin", b"junk\n" + _mk_pdf([["x"]])) == "pdf"
+    found = {f["type"] for f in scan_file(_mk_upload("notes.txt", notes))["findings"]}
+    assert found == {"PAN", "Password"}
+
+    # looks like a PDF from the first byte, but is not one: read it as the .txt it claims to be
+    fake = b"%PDF-1.4 not really\nmail fake@example.com\n"
+    assert "fake@example.com" in load_text_from_uploaded(_mk_upload("fake.txt", fake))
+
+def test_docx_parts_count_against_the_byte_limit():
+    body = "<w:body>" + "<w:p><w:r><w:t>filler text</w:t></w:r></w:p>" * 100_000 + "</w:body>"
+    docx = _mk_docx({"document": ("document", body)})
+    for upload in (_mk_upload("big.docx", docx), _mk_upload("bundle.zip", _mk_zip({"renamed.bin": docx}))):
+        limits = ExtractLimits(max_bytes=100_000)
+        size = sum(map(len, iter_text_from_uploaded(upload, limits=limits)))
+        assert size < 100_000 and 100_000 < limits.expanded <= 100_000 + (1 << 20)
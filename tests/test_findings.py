@@ -0,0 +1,31 @@
+import tracemalloc
+from core.data_scanner import scan_path
+from core.findings import FindingSet, line_numbers
+
+def test_finding_set_memory_follows_distinct_values():
+    found = FindingSet(["Email", "Phone"])
+    tracemalloc.start()
+    for n in range(1_000_000):
+        found.add(0, n * 20, "repeat@example.com")
+        if n % 100 == 0:
+            found.add(1, n * 20 + 5, f"98{n:08d}")
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert found.hits == 1_010_000
+    assert (found.count(0), found.count(1)) == (1, 10_000)
+    assert len(found) == 10_001
+    assert found.samples(0) == ["repeat@example.com"]
+    assert found.samples(1) == ["9800000000", "9800000100", "9800000200", "9800000300", "9800000400"]
+    assert list(found.first_offsets(0)) == [(0, 18)]
+    assert peak < 4 << 20  # a list of a million match strings would be far larger
+
+def test_scan_path_reports_sample_lines(tmp_path):
+    log = tmp_path / "app.log"
+    log.write_bytes(b"start\nmail b@example.com\n\nmail a@example.com and b@example.com\nPAN ABCDE1234F\n")
+    res = scan_path(str(log), lines=True)
+    found = {f["type"]: f for f in res["findings"]}
+    assert found["Email"]["samples"] == ["a@example.com", "b@example.com"]
+    assert found["Email"]["lines"] == [4, 2]
+    assert found["PAN"]["lines"] == [5]
+    assert "lines" not in scan_path(str(log))["findings"][0]
+    assert line_numbers("a\nb\nc", [4, 0, 2]) == [3, 1, 2]
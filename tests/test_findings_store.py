@@ -0,0 +1,41 @@
+from core.findings_store import FindingsStore
+
+def _results(n):
+    for i in range(n):
+        if i % 4 == 0:
+            yield {"url": f"https://b{i % 3}.s3.amazonaws.com/{i}", "host": f"b{i % 3}.s3.amazonaws.com",
+                   "status": "Cloud object accessible", "http_code": 200, "risk": "High"}
+        elif i % 4 == 1:
+            yield {"file_name": f"f{i}.zip", "error": "bad archive"}
+        else:
+            yield {"file_name": f"f{i}.txt", "severity": "Medium" if i % 2 else "High",
+                   "findings": [{"type": "Email", "count": 2, "samples": ["a@b.co"]},
+                                {"type": "PAN", "count": 1, "samples": ["ABCDE1234F"], "pages": [3]}]}
+
+def test_counters_track_inserts_and_match_a_rebuild(tmp_path):
+    store = FindingsStore(str(tmp_path / "findings.db"))
+    store.record(_results(1_000), batch_size=64)
+    store.add({"file_name": "clean.txt", "severity": "Low", "findings": []})
+    assert store.risk_distribution() == {"High": 500, "Medium": 250, "Unknown": 250, "Low": 1}
+    assert store.counters("targets") == {"cloud": 250, "file": 751}
+    assert store.counters("type") == {"Email": 1000, "PAN": 500}
+    assert store.counters("host") == {"b0.s3.amazonaws.com": 84, "b1.s3.amazonaws.com": 83, "b2.s3.amazonaws.com": 83}
+    before = {d: store.counters(d) for d in ("targets", "severity", "type", "host", "day", "findings")}
+    store.rebuild_counters()
+    assert {d: store.counters(d) for d in before} == before
+    store.close()
+
+    reopened = FindingsStore(str(tmp_path / "findings.db"))
+    assert reopened.counters("findings") == {"total": 1000}
+
+def test_recent_targets_and_samples_opt_in():
+    store = FindingsStore(clock=iter(range(100)).__next__)
+    store.record(_results(8))
+    newest = store.recent_targets(2, severity="High")
+    assert [t["name"] for t in newest] == ["f6.txt", "https://b1.s3.amazonaws.com/4"]
+    assert store.target_findings(newest[0]["id"])[1] == {"type": "PAN", "count": 1, "pages": [3], "samples": None}
+
+    keeping = FindingsStore(keep_samples=True)
+    keeping.add({"file_name": "a.txt", "severity": "High", "findings": [{"type": "PAN", "count": 1, "samples": ["ABCDE1234F"]}]})
+    target = keeping.recent_targets(1)[0]
+    assert keeping.target_findings(target["id"])[0]["samples"] == ["ABCDE1234F"]
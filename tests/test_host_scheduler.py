@@ -0,0 +1,52 @@
+import threading
+import time
+from core.cloud_scanner import scan_cloud_url, scan_cloud_urls
+from core.host_scheduler import HostScheduler
+from tests.http_stub import StubServer
+
+def test_throttled_host_is_retried_until_it_answers():
+    seen = {}
+    lock = threading.Lock()
+
+    def respond(method, path, headers):
+        with lock:
+            seen[path] = seen.get(path, 0) + 1
+            count = seen[path]
+        if path.startswith("/busy") and count == 1:
+            return 503, {}, b""                      # no Retry-After: jittered backoff
+        if count <= 2:
+            return 429, {"Retry-After": "0"}, b""
+        return 200, {}, b"ok"
+
+    scheduler = HostScheduler(base_delay=0.01)
+    with StubServer(respond) as server:
+        results = list(scan_cloud_urls([server.url(f"/obj/{i}") for i in range(5)] + [server.url("/busy")],
+                                       max_workers=3, scheduler=scheduler))
+        host = server.url("")[len("http://"):]
+
+    assert all(r["http_code"] == 200 for r in results)
+    stats = scheduler.stats()[host]
+    assert stats["throttled"] == 6 * 2
+    assert stats["requests"] == 6 * 3
+
+def test_rate_limit_and_exhausted_retries():
+    scheduler = HostScheduler(rate=20, burst=1, max_retries=1, base_delay=0.01)
+    with StubServer(lambda m, p, h: (429, {"Retry-After": "0"}, b"") if p == "/never" else (200, {}, b"")) as server:
+        start = time.monotonic()
+        for i in range(6):
+            scan_cloud_url(server.url(f"/{i}"), scheduler=scheduler)
+        assert time.monotonic() - start >= 0.2          # 5 waits at 20 tokens/s
+        result = scan_cloud_url(server.url("/never"), scheduler=scheduler)
+    assert result["http_code"] == 429
+
+def test_concurrency_limit_adapts_to_latency_and_throttling():
+    scheduler = HostScheduler(concurrency=4, max_concurrency=6)
+    for _ in range(40):
+        scheduler.release(scheduler.acquire("h"), latency=0.01)
+    assert scheduler.stats()["h"]["concurrency"] == 6
+    scheduler.release(scheduler.acquire("h"), latency=0.05)  # congestion
+    scheduler.release(scheduler.acquire("h"), latency=0.05)  # same window: no second cut
+    assert scheduler.stats()["h"]["concurrency"] == 3
+    time.sleep(0.06)
+    scheduler.release(scheduler.acquire("h"), pause=0)       # throttled
+    assert scheduler.stats()["h"]["concurrency"] == 1.5
@@ -0,0 +1,33 @@
+import subprocess
+import sys
+
+# Modules a text-only scan or a CLI start must not pay for
+HEAVY = ("PyPDF2", "reportlab", "pandas", "docx", "requests", "http.server")
+# Cumulative cold import time allowed for the CLI, which covers the text-scan path (seconds)
+IMPORT_BUDGET = 0.3
+
+def _run(code: str):
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code + "; print(*sys.modules)"],
+                          capture_output=True, text=True, check=True)
+    return set(proc.stdout.split()), proc.stderr
+
+def _cumulative(stderr: str, module: str) -> float:
+    for line in stderr.splitlines():
+        parts = line.split("|")
+        # top-level imports are listed with a single space before the name
+        if len(parts) == 3 and parts[2] == " " + module:
+            return int(parts[1]) / 1e6
+    raise AssertionError(f"{module} was not imported")
+
+def test_text_scan_loads_no_heavy_dependencies():
+    modules, _ = _run("import io, sys; from core.scan_cache import scan_file_cached; import core.report_generator; "
+                      "f = io.BytesIO(b'mail a@b.co'); f.name = 'a.txt'; scan_file_cached(f)")
+    assert not modules & set(HEAVY)
+    modules, _ = _run("import io, sys; from core.data_scanner import scan_file; "
+                      "f = io.BytesIO(b'%PDF-1.4'); f.name = 'a.pdf'; scan_file(f)")
+    assert "PyPDF2" in modules and "reportlab" not in modules
+
+def test_cli_cold_import_within_budget():
+    modules, stderr = _run("import sys, cli")
+    assert not modules & set(HEAVY)
+    assert _cumulative(stderr, "cli") < IMPORT_BUDGET
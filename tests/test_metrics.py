@@ -0,0 +1,44 @@
+from core.cloud_scanner import make_session, scan_cloud_url
+from core.data_scanner import scan_file
+from core.report_generator import build_csv_report
+from tests.http_stub import StubServer
+from tests.test_data import _mk_upload
+from utils import metrics
+
+def test_scan_file_timings_cover_stages_and_patterns():
+    content = b"mail user@example.com or call 9876543210\n" * 200
+    plain = scan_file(_mk_upload("a.txt", content))
+    timed = scan_file(_mk_upload("a.txt", content), timings=True)
+
+    assert "timings" not in plain
+    assert timed["findings"] == plain["findings"]
+    t = timed["timings"]
+    assert {"scan_file", "extract/txt", "pattern/Email", "pattern/Phone"} <= set(t)
+    assert t["extract/txt"]["bytes"] == len(content)
+    assert t["scan_file"]["wall"] >= t["extract/txt"]["wall"]
+
+def test_registry_renders_prometheus_text():
+    metrics.REGISTRY.reset()
+    metrics.enable()
+    try:
+        scan_file(_mk_upload("a.txt", b"PAN ABCDE1234F"))
+        build_csv_report({"file_scan": {"file_name": "a.txt", "findings": []}})
+        with StubServer(lambda m, p, h: (200, {}, b"")) as server:
+            res = scan_cloud_url(server.url("/x"), session=make_session(), timings=True)
+    finally:
+        metrics.enable(False)
+
+    assert {"http_connect", "http_request/HEAD", "cloud_scan"} <= set(res["timings"])
+    text = metrics.REGISTRY.render_prometheus()
+    assert "# TYPE scanner_stage_wall_seconds summary" in text
+    assert 'scanner_stage_wall_seconds_count{pattern="PAN",stage="pattern"} 1' in text
+    assert 'scanner_stage_bytes_total{format="csv",stage="report"}' in text
+    assert 'scanner_stage_cpu_seconds_sum{stage="http_connect"}' in text
+
+def test_instrumentation_is_inert_when_off():
+    metrics.REGISTRY.reset()
+    assert metrics.stage("x") is metrics.stage("y")
+    chunks = iter(["a"])
+    assert metrics.timed_iter("x", chunks) is chunks
+    scan_file(_mk_upload("a.txt", b"user@example.com"))
+    assert metrics.REGISTRY.snapshot() == {"counters": {}, "summaries": {}}
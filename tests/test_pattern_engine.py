@@ -0,0 +1,34 @@
+import re
+import pytest
+from core.pattern_engine import PatternEngine, compile_patterns, match_value
+from utils.regex_patterns import PATTERNS
+
+def _by_label(engine, text):
+    found = {label: [] for label in engine.labels}
+    for i, m in engine.finditer(text):
+        found[engine.labels[i]].append(match_value(engine.regexes[i], m))
+    return found
+
+def test_engine_matches_findall_per_pattern():
+    # PAN/Email overlap with Password, so hits must not be shared between labels
+    text = "PAN ABCDE1234F mail demo123x@example.com\nphone 9876543210 id 1234 5678 9012 key=abc 12-x"
+    patterns = dict(PATTERNS, Key=r"key=(\w+)", Range=r"(\d+)-(\d+)?x")
+    engine = PatternEngine(patterns)
+    found = _by_label(engine, text)
+    for label, pattern in patterns.items():
+        assert found[label] == re.findall(pattern, text, flags=re.MULTILINE)
+
+def test_engine_resumes_with_cursors():
+    engine = PatternEngine({"Phone": PATTERNS["Phone"], "Email": PATTERNS["Email"]})
+    text = "a@b.co 9876543210 c@d.io"
+    cursors = [0, 0]
+    first = [m.group() for _, m in engine.finditer(text, 0, 10, cursors)]
+    rest = [m.group() for _, m in engine.finditer(text, 10, None, cursors)]
+    assert first == ["a@b.co", "9876543210"]
+    assert rest == ["c@d.io"]
+
+def test_patterns_that_match_empty_are_refused():
+    for pattern in (r"a*", r"\b", r"(?=x)", r"id|", rb"\d*"):
+        with pytest.raises(ValueError):
+            compile_patterns({"Empty": pattern})
+    assert len(compile_patterns({"Phone": PATTERNS["Phone"], "Key": r"key=\w*"})) == 2  # may be short, not empty
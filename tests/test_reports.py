@@ -0,0 +1,72 @@
+import io
+import json
+import time
+import tracemalloc
+from PyPDF2 import PdfReader
+from core.report_generator import build_csv_report, build_pdf_report, write_csv_report, write_jsonl_report, write_pdf_report
+
+def _results(n):
+    for i in range(n):
+        if i % 2:
+            yield {"url": f"https://b.s3.amazonaws.com/{i}", "status": "Cloud object accessible", "http_code": 200, "risk": "High"}
+        else:
+            yield {"file_name": f"f{i}.txt", "severity": "Medium", "findings": [{"type": "Email", "count": 1, "samples": ["a@b.co"]}]}
+
+class _NullSink(io.RawIOBase):
+    def writable(self):
+        return True
+
+    def write(self, b):
+        return len(b)
+
+def test_writers_stream_mixed_results():
+    text = io.StringIO()
+    assert write_csv_report(_results(4), text) == 4
+    assert text.getvalue().splitlines()[1:3] == ["File,f0.txt,Email (1 found),Medium",
+                                                  "Cloud,https://b.s3.amazonaws.com/1,Cloud object accessible (HTTP 200),High"]
+    binary = io.BytesIO()
+    assert write_jsonl_report(_results(3), binary) == 3
+    assert [json.loads(line)["file_name"] for line in binary.getvalue().splitlines()[::2]] == ["f0.txt", "f2.txt"]
+    assert build_csv_report({}) == b"Section,Item,Detail,Severity\nInfo,-,No issues detected.,Low\n"
+
+def test_writer_memory_does_not_grow_with_results():
+    tracemalloc.start()
+    write_csv_report(_results(1_000), _NullSink())
+    small = tracemalloc.get_traced_memory()[1]
+    tracemalloc.reset_peak()
+    write_csv_report(_results(50_000), _NullSink())
+    large = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert large < small * 2
+
+def test_pdf_report_paginates_10k_findings(tmp_path):
+    def results():
+        for i in range(2_500):
+            findings = [{"type": t, "count": 3, "samples": [f"user{i}@example.com", "9876543210"], "pages": [1, 2]}
+                        for t in ("Email", "Phone", "PAN", "Password")]
+            yield {"file_name": f"dir/f{i}.txt", "severity": "High" if i % 7 == 0 else "Low", "findings": findings}
+        yield {"url": "https://b.s3.amazonaws.com/" + "k" * 400, "status": "Cloud object accessible", "http_code": 200,
+               "risk": "High", "notes": ["public"]}
+
+    path = tmp_path / "report.pdf"
+    start = time.perf_counter()
+    with open(path, "wb") as fh:
+        pages = write_pdf_report(results(), fh)
+    assert time.perf_counter() - start < 30
+    reader = PdfReader(str(path))
+    assert len(reader.pages) == pages > 100
+    first = reader.pages[0].extract_text()
+    assert "Files scanned: 2500" in first and "Findings: 10001" in first and f"Page 1 of \n{pages}" in first
+    assert "Recommendations" in reader.pages[-1].extract_text()
+
+def test_build_pdf_report_single_scan():
+    pdf = build_pdf_report({"file_scan": {"file_name": "a.txt", "severity": "High", "findings": []},
+                            "cloud_scan": {"url": "https://a", "status": "Not accessible", "http_code": 403, "risk": "Low"}})
+    text = PdfReader(io.BytesIO(pdf)).pages[0].extract_text()
+    assert "URL: https://a" in text and "File: a.txt" in text and "No sensitive data found." in text
+
+def test_reports_flag_files_not_fully_scanned():
+    result = {"file_name": "w.zip", "severity": "Low", "findings": [], "partial": True, "incomplete": ["layer1.zip"]}
+    assert build_csv_report({"file_scan": result}).decode().splitlines()[1] == "File,w.zip,Not fully scanned: layer1.zip,Unknown"
+    text = PdfReader(io.BytesIO(build_pdf_report({"file_scan": result}))).pages[0].extract_text()
+    assert "Not fully scanned: layer1.zip" in text and "No sensitive data found." not in text
@@ -0,0 +1,44 @@
+import io
+import core.scan_cache as scan_cache
+from core.scan_cache import ScanCache, scan_file_cached
+
+def _mk_upload(name: str, content: bytes):
+    f = io.BytesIO(content)
+    f.name = name
+    return f
+
+def test_cache_hits_on_same_content_and_rescans_on_new_patterns(monkeypatch):
+    cache = ScanCache()
+    calls = []
+    real_scan = scan_cache.scan_file
+    monkeypatch.setattr(scan_cache, "scan_file", lambda *a, **kw: calls.append(1) or real_scan(*a, **kw))
+    content = b"mail me at user@example.com"
+
+    first = scan_file_cached(_mk_upload("a.txt", content), cache)
+    again = scan_file_cached(_mk_upload("b.txt", content), cache)
+    assert len(calls) == 1
+    assert again["file_name"] == "b.txt"
+    assert again["findings"] == first["findings"]
+
+    monkeypatch.setitem(scan_cache.PATTERNS, "Extra", r"example")
+    scan_file_cached(_mk_upload("a.txt", content), cache)
+    assert len(calls) == 2
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+def test_memory_tier_evicts_and_disk_tier_survives_restart(tmp_path):
+    cache = ScanCache(max_bytes=200, directory=str(tmp_path))
+    for n in range(5):
+        cache.put(f"k{n}", {"n": n, "pad": "x" * 40})
+    assert cache.stats()["entries"] < 5
+    assert cache.stats()["evictions"] > 0
+
+    reopened = ScanCache(directory=str(tmp_path))
+    assert reopened.get("k0") == {"n": 0, "pad": "x" * 40}
+    assert reopened.stats()["disk_hits"] == 1
+    assert reopened.get("missing") is None
+
+    small = ScanCache(directory=str(tmp_path), max_disk_bytes=120)
+    small.put("k9", {"n": 9})
+    assert small.stats()["disk_bytes"] <= 120
+    assert small.get("k9") == {"n": 9}
@@ -0,0 +1,52 @@
+import threading
+import core.scan_jobs as scan_jobs
+from core.scan_cache import ScanCache
+from core.scan_jobs import ScanJobs, wait_any
+from tests.http_stub import StubServer
+
+def test_file_jobs_are_shared_while_running_and_cached_after(monkeypatch):
+    gate = threading.Event()
+    calls = []
+    real_scan = scan_jobs.scan_file
+
+    def slow_scan(f, **kw):
+        assert kw == {"workers": 1}
+        calls.append(f.name)
+        if f.name == "a.txt":
+            gate.wait(5)
+        return real_scan(f, **kw)
+
+    monkeypatch.setattr(scan_jobs, "scan_file", slow_scan)
+    jobs = ScanJobs(workers=2, cache=ScanCache())
+    content = b"PAN ABCDE1234F mail demo@example.com"
+    try:
+        first = jobs.submit_file("a.txt", content)
+        second = jobs.submit_file("b.txt", content)
+        other = jobs.submit_file("c.txt", b"nothing here")
+        assert first.future is second.future and not first.done()
+        assert other.future.result(timeout=5)["findings"] == []
+        assert wait_any([first, other], timeout=0.05) == [first]
+        gate.set()
+        assert wait_any([first, second, other], timeout=5) == []
+        assert first.result()["file_name"] == "a.txt" and second.result()["file_name"] == "b.txt"
+        assert first.result()["severity"] == "High" and other.result()["findings"] == []
+
+        again = jobs.submit_file("d.txt", content)
+        assert again.done() and again.result()["findings"] == first.result()["findings"]
+        assert sorted(calls) == ["a.txt", "c.txt"] and jobs.pending() == 0
+    finally:
+        jobs.shutdown()
+
+def test_url_jobs_run_in_background():
+    with StubServer(lambda method, path, headers: (200, {"Content-Type": "text/csv"}, b"a,b\n")) as server:
+        jobs = ScanJobs(workers=4)
+        try:
+            urls = [server.url(f"/bucket/{n}.csv") for n in range(3)]
+            batch = [jobs.submit_url(url) for url in urls]
+            while wait_any(batch, timeout=10):
+                pass
+            results = [job.result() for job in batch]
+            assert [r["url"] for r in results] == urls
+            assert all("error" not in r and r["http_code"] == 200 for r in results)
+        finally:
+            jobs.shutdown()
@@ -0,0 +1,85 @@
+import bz2
+import gzip
+import io
+import lzma
+import tarfile
+import zipfile
+import zlib
+from utils.file_loader import EXTRACTORS, iter_stream_text, register_parse_errors
+
+register_parse_errors(zipfile.BadZipFile, tarfile.TarError, lzma.LZMAError, zlib.error)
+
+# Zip containers that are documents rather than archives, told apart by a
+# member only they have (so a renamed .docx is still read as one).
+ZIP_DOCUMENTS = [("word/document.xml", "docx"), ("xl/workbook.xml", "xlsx")]
+# Name of what a compressed file holds, for the extension hint: "a.log.gz" -> "a.log"
+_INNER_SUFFIXES = {".tgz": ".tar", ".tbz2": ".tar", ".txz": ".tar"}
+
+def _members(items, limits):
+    """
+    Text of each (name, stream) member in turn, members separated by a newline.
+    """
+    for n, (name, open_member) in enumerate(items):
+        if n:
+            yield "\n"
+        with open_member() as member:
+            yield from iter_stream_text(member, name, limits)
+
+def extract_zip(stream, name: str, limits):
+    """
+    Every member of a zip, read one at a time and never written to disk.
+    The zip itself is held in memory since its index sits at the end.
+    """
+    data = stream.read()
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        names = set(zf.namelist())
+        for member, fmt in ZIP_DOCUMENTS:
+            if member in names:
+                yield from EXTRACTORS.get(fmt)(io.BytesIO(data), name, limits)
+                return
+        if not limits.enter(name):
+            return
+        try:
+            members = [(info.filename, lambda info=info: limits.meter(zf.open(info)))
+                       for info in zf.infolist() if not info.is_dir()]
+            yield from _members(members, limits)
+        finally:
+            limits.leave()
+
+def extract_tar(stream, name: str, limits):
+    """
+    Every regular file of an (uncompressed) tar, read in order straight off the stream.
+    """
+    if not limits.enter(name):
+        return
+    try:
+        with tarfile.open(fileobj=stream, mode="r|") as tf:
+            members = ((info.name, lambda info=info: tf.extractfile(info)) for info in tf if info.isfile())
+            yield from _members(members, limits)
+    finally:
+        limits.leave()
+
+def _inner_name(name: str, suffix: str) -> str:
+    lower = name.lower()
+    for outer, inner in _INNER_SUFFIXES.items():
+        if lower.endswith(outer):
+            return name[:-len(outer)] + inner
+    return name[:-len(suffix)] if lower.endswith(suffix) else name
+
+def _decompressed(opener, stream, name: str, suffix: str, limits):
+    if not limits.enter(name):
+        return
+    try:
+        with opener(stream) as raw:
+            yield from iter_stream_text(limits.meter(raw), _inner_name(name, suffix), limits)
+    finally:
+        limits.leave()
+
+def extract_gzip(stream, name: str, limits):
+    return _decompressed(lambda s: gzip.GzipFile(fileobj=s), stream, name, ".gz", limits)
+
+def extract_bz2(stream, name: str, limits):
+    return _decompressed(bz2.BZ2File, stream, name, ".bz2", limits)
+
+def extract_xz(stream, name: str, limits):
+    return _decompressed(lzma.LZMAFile, stream, name, ".xz", limits)
@@ -0,0 +1,69 @@
+import io
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from utils.file_loader import iter_joined, register_parse_errors
+
+register_parse_errors(zipfile.BadZipFile)
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+# Every DOCX part that holds user text, not just the main body.
+_DOCX_TEXT_PARTS = re.compile(r"word/(document|header\d*|footer\d*|footnotes|endnotes|comments)\.xml")
+
+def _iter_ooxml_paragraphs(stream):
+    """
+    Incrementally parse one WordprocessingML part and yield the text of each
+    paragraph (w:p) as it closes, including those in tables and text boxes.
+    Finished elements are dropped from the tree so memory stays flat.
+    """
+    open_elems = []
+    paragraphs = []      # text runs of the paragraphs currently open (text boxes nest)
+    in_props = 0         # inside w:pPr, whose w:tab elements are tab stops, not text
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            open_elems.append(elem)
+            if tag == _W + "p":
+                paragraphs.append([])
+            elif tag == _W + "pPr":
+                in_props += 1
+            continue
+
+        open_elems.pop()
+        if tag == _W + "p":
+            yield "".join(paragraphs.pop())
+        elif tag == _W + "pPr":
+            in_props -= 1
+        elif paragraphs and not in_props:
+            if tag == _W + "t":
+                paragraphs[-1].append(elem.text or "")
+            elif tag == _W + "tab":
+                paragraphs[-1].append("\t")
+            elif tag == _W + "br" or tag == _W + "cr":
+                paragraphs[-1].append("\n")
+            elif tag == _W + "noBreakHyphen":
+                paragraphs[-1].append("-")
+        if open_elems:
+            # Children are dropped as they close, so the parent holds at most
+            # this one and tables, rows and cells never accumulate.
+            open_elems[-1].remove(elem)
+
+def iter_docx_paragraphs(data: bytes, limits=None):
+    """
+    Yield paragraph text from a DOCX straight from its zip parts: the body
+    (tables included) first, then headers, footers, footnotes, endnotes and
+    comments in part-name order. With `limits` (a file_loader.ExtractLimits)
+    every byte inflated out of the parts is charged against it.
+    """
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        names = [n for n in zf.namelist() if _DOCX_TEXT_PARTS.fullmatch(n)]
+        names.sort(key=lambda n: (n != "word/document.xml", n))
+        for name in names:
+            with zf.open(name) as part:
+                yield from _iter_ooxml_paragraphs(limits.meter(part) if limits is not None else part)
+
+def extract_docx(stream, name: str, limits):
+    """
+    file_loader extractor: paragraphs joined by newlines.
+    """
+    return iter_joined(iter_docx_paragraphs(stream.read(), limits))
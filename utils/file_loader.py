@@ -1,35 +1,341 @@
+import codecs
 import io
-from PyPDF2 import PdfReader
-import docx
+import os
+from urllib.parse import unquote
+from utils.metrics import stage, timed_iter
+from utils.registry import LazyRegistry
 
-def load_text_from_uploaded(uploaded_file) -> str:
+DEFAULT_CHUNK_SIZE = 1 << 20  # bytes read per step when streaming
+DEFAULT_MAX_DEPTH = 4          # nested containers (archives, compression layers) opened per file
+DEFAULT_MAX_EXPANDED = 1 << 30  # bytes decompressed out of containers per file
+SNIFF_SIZE = 4096
+
+_BOMS = [(codecs.BOM_UTF8, "utf-8-sig"), (codecs.BOM_UTF16_LE, "utf-16"), (codecs.BOM_UTF16_BE, "utf-16")]
+
+def register_extractor(fmt: str, extractor, extensions=(), magic: bytes = None, offset: int = 0):
+    """
+    Add or replace the extractor for `fmt` (a function or "module:function"),
+    reached through the given extensions and/or magic bytes.
+    """
+    EXTRACTORS.register(fmt, extractor)
+    for ext in extensions:
+        EXTENSIONS[ext.lower().lstrip(".")] = fmt
+    if magic:
+        MAGIC.insert(0, (magic, offset, fmt))
+
+def register_parse_errors(*errors):
+    """
+    Exception types an extractor raises for a malformed file. They end that
+    file's text (recorded in ExtractLimits.truncated); anything else propagates.
     """
-    Safely extract text from Streamlit UploadedFile (txt, pdf, docx).
+    PARSE_ERRORS.extend(e for e in errors if e not in PARSE_ERRORS)
+
+class ExtractLimitError(Exception):
+    name = None  # the file being read when the budget ran out
+
+class ExtractLimits:
     """
-    name = getattr(uploaded_file, "name", "").lower()
+    Bounds for extracting one file, shared by everything inside it: how deep
+    containers may nest and how many bytes may be decompressed in total.
+    Containers nested deeper are skipped (listed in `skipped`); going over
+    the byte budget raises ExtractLimitError, which ends the text there.
+    Files whose text ended early, at the budget or on a parse error, are
+    listed in `truncated`. Either way the text is `incomplete`.
+    """
+
+    def __init__(self, max_depth: int = DEFAULT_MAX_DEPTH, max_bytes: int = DEFAULT_MAX_EXPANDED,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.max_depth = max_depth
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.depth = 0
+        self.expanded = 0
+        self.skipped = []
+        self.truncated = []
+
+    @property
+    def incomplete(self) -> list:
+        return self.skipped + self.truncated
+
+    def enter(self, name: str) -> bool:
+        if self.depth >= self.max_depth:
+            self.skipped.append(name)
+            return False
+        self.depth += 1
+        return True
+
+    def leave(self):
+        self.depth -= 1
 
-    # Get raw bytes once
-    data = uploaded_file.getvalue()
+    def charge(self, n: int):
+        self.expanded += n
+        if self.expanded > self.max_bytes:
+            raise ExtractLimitError(f"more than {self.max_bytes} bytes decompressed")
 
-    if name.endswith(".txt"):
-        return data.decode("utf-8", errors="ignore")
+    def meter(self, stream):
+        """
+        Wrap a decompressing stream so every byte read from it is charged.
+        """
+        return io.BufferedReader(_Metered(stream, self))
 
-    if name.endswith(".pdf"):
-        try:
-            reader = PdfReader(io.BytesIO(data))
-            chunks = []
-            for page in reader.pages:
-                txt = page.extract_text() or ""
-                chunks.append(txt)
-            return "\n".join(chunks)
-        except Exception:
-            return ""
+class _Metered(io.RawIOBase):
+    def __init__(self, stream, limits: ExtractLimits):
+        self._stream = stream
+        self._limits = limits
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        data = self._stream.read(len(b))
+        self._limits.charge(len(data))
+        b[:len(data)] = data
+        return len(data)
+
+class _Rewound(io.RawIOBase):
+    """
+    Replays `head` (bytes already read to sniff the format) before the rest of `stream`.
+    """
+
+    def __init__(self, head: bytes, stream):
+        self._head = memoryview(head)
+        self._stream = stream
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        if self._head:
+            n = min(len(b), len(self._head))
+            b[:n] = self._head[:n]
+            self._head = self._head[n:]
+            return n
+        data = self._stream.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+def _format(name: str) -> str:
+    return os.path.splitext(name.lower())[1].lstrip(".") or "unknown"
+
+def _looks_like_text(head: bytes) -> bool:
+    if any(head.startswith(bom) for bom, _ in _BOMS):
+        return True
+    if b"\x00" in head:
+        return False
+    try:
+        head.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # a character cut off by the end of the sample is fine
+        return e.start >= len(head) - 3 and e.reason == "unexpected end of data"
+    return True
+
+def detect_format(name: str, head: bytes):
+    """
+    Format of a file from its first bytes and name: magic bytes first, then
+    the extension, then whether it looks like text. None for unknown binary data.
+    """
+    ext = _format(name)
+    for magic, offset, fmt in MAGIC:
+        if offset is None:
+            # a signature allowed anywhere near the start only counts there when
+            # the extension says nothing else (a .txt may well mention "%PDF-")
+            found = head.startswith(magic) or (ext not in EXTENSIONS and magic in head[:1024])
+        else:
+            found = head[offset:offset + len(magic)] == magic
+        if found:
+            # docx/xlsx are zips; a renamed one is recognised by extract_zip
+            return EXTENSIONS[ext] if fmt == "zip" and EXTENSIONS.get(ext) in ("docx", "xlsx") else fmt
+    if ext in EXTENSIONS:
+        return EXTENSIONS[ext]
+    return "txt" if head and _looks_like_text(head) else None
 
-    if name.endswith(".docx"):
-        try:
-            doc = docx.Document(io.BytesIO(data))
-            return "\n".join([p.text for p in doc.paragraphs])
-        except Exception:
-            return ""
+def iter_stream_text(stream, name: str, limits: ExtractLimits = None):
+    """
+    Yield the text of a binary stream piece by piece with the extractor for
+    its detected format; nothing for formats without one. When that format
+    is not the one the extension names and its extractor fails outright, the
+    extension's extractor is used instead. Container extractors (zip, tar,
+    gzip, ...) call back in here for every member. A parse error ends the
+    text of this file only; either it or the byte budget running out is
+    recorded in `limits.truncated`.
+    """
+    limits = limits or ExtractLimits()
+    try:
+        yield from _extract(stream, name, limits)
+    except ExtractLimitError as e:
+        if e.name is None:  # innermost file only
+            e.name = name
+            limits.truncated.append(name)
+        raise
+    except tuple(PARSE_ERRORS):
+        limits.truncated.append(name)
+
+def _extract(stream, name: str, limits: ExtractLimits):
+    head = stream.read(SNIFF_SIZE)
+    fmt = detect_format(name, head)
+    extract = EXTRACTORS.get(fmt) if fmt else None
+    if extract is None:
+        return
+    fallback = EXTENSIONS.get(_format(name))
+    if fallback is None or fallback == fmt:
+        yield from extract(io.BufferedReader(_Rewound(head, stream)), name, limits)
+        return
+    # The content and the extension disagree: if the content's extractor fails
+    # before producing anything, read the file as its extension says instead.
+    data = head + stream.read()
+    started = False
+    try:
+        for piece in extract(io.BytesIO(data), name, limits):
+            started = True
+            yield piece
+    except ExtractLimitError:
+        raise
+    except Exception:
+        if started:
+            raise
+        yield from EXTRACTORS.get(fallback)(io.BytesIO(data), name, limits)
+
+def iter_joined(blocks, sep: str = "\n"):
+    """
+    Pieces of blocks (pages, paragraphs, rows) joined with `sep`, for extractors.
+    """
+    for n, block in enumerate(blocks):
+        if n:
+            yield sep
+        yield block
+
+def _decoded(stream, chunk_size: int):
+    first = stream.read(chunk_size)
+    encoding = next((enc for bom, enc in _BOMS if first.startswith(bom)), "utf-8")
+    decoder = codecs.getincrementaldecoder(encoding)(errors="ignore")
+    data = first
+    while data:
+        text = decoder.decode(data)
+        if text:
+            yield text
+        data = stream.read(chunk_size)
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+def extract_text(stream, name: str, limits: ExtractLimits):
+    """
+    Plain text, decoded chunk by chunk (UTF-8, or UTF-16 with a BOM).
+    """
+    return _decoded(stream, limits.chunk_size)
+
+def extract_log(stream, name: str, limits: ExtractLimits):
+    """
+    Log text with %-escapes decoded line by line, so values logged in URLs
+    (user%40example.com) are seen as they were typed.
+    """
+    carry = ""
+    for text in _decoded(stream, limits.chunk_size):
+        text = carry + text
+        cut = text.rfind("\n") + 1
+        if not cut and len(text) > limits.chunk_size:
+            cut = len(text) - 2  # no line break in sight; keep what may be a split escape
+        carry = text[cut:]
+        if cut:
+            yield unquote(text[:cut]) if "%" in text[:cut] else text[:cut]
+    if carry:
+        yield unquote(carry)
+
+# Extractors by format. Each is called as extract(stream, name, limits) with a
+# binary stream positioned at the start of the file and yields the text in
+# pieces; joined, the pieces are the document text. Entries are imported on
+# first use, so a scan of .txt files never loads PyPDF2.
+EXTRACTORS = LazyRegistry({
+    "txt": extract_text,
+    "log": extract_log,
+    "csv": "utils.structured_extract:extract_csv",
+    "json": "utils.structured_extract:extract_json",
+    "xlsx": "utils.structured_extract:extract_xlsx",
+    "pdf": "utils.pdf_extract:extract_pdf",
+    "docx": "utils.docx_extract:extract_docx",
+    "zip": "utils.archive_extract:extract_zip",
+    "tar": "utils.archive_extract:extract_tar",
+    "gzip": "utils.archive_extract:extract_gzip",
+    "bz2": "utils.archive_extract:extract_bz2",
+    "xz": "utils.archive_extract:extract_xz",
+})
+# (signature, offset, format), checked before the extension so renamed files
+# still get the right extractor. An offset of None means anywhere in the sniffed head.
+MAGIC = [
+    (b"%PDF-", None, "pdf"),
+    (b"PK\x03\x04", 0, "zip"),
+    (b"PK\x05\x06", 0, "zip"),
+    (b"\x1f\x8b", 0, "gzip"),
+    (b"BZh", 0, "bz2"),
+    (b"\xfd7zXZ\x00", 0, "xz"),
+    (b"ustar", 257, "tar"),
+]
+# Formats without a signature of their own, by extension. Zip-based formats are
+# listed too, for when the extension is what tells them apart from a plain zip.
+EXTENSIONS = {
+    "txt": "txt", "text": "txt", "md": "txt", "log": "log",
+    "csv": "csv", "tsv": "csv", "json": "json", "jsonl": "json", "ndjson": "json",
+    "docx": "docx", "xlsx": "xlsx",
+}
+# Errors of a malformed file rather than of the scanner; extractor modules add
+# their own with register_parse_errors() (UnicodeError and ParseError are
+# ValueError and SyntaxError).
+PARSE_ERRORS = [OSError, EOFError, ValueError, KeyError, SyntaxError]
+
+def _batched(pieces, size: int):
+    """
+    Merge small pieces into chunks of roughly `size` characters.
+    """
+    batch = []
+    length = 0
+    for piece in pieces:
+        batch.append(piece)
+        length += len(piece)
+        if length >= size:
+            yield "".join(batch)
+            batch = []
+            length = 0
+    if length:
+        yield "".join(batch)
+
+def _open_upload(uploaded_file):
+    if not hasattr(uploaded_file, "read"):
+        return io.BytesIO(uploaded_file.getvalue())
+    if hasattr(uploaded_file, "seek"):
+        uploaded_file.seek(0)
+    return uploaded_file
+
+def load_text_from_uploaded(uploaded_file) -> str:
+    """
+    Safely extract text from Streamlit UploadedFile (txt, pdf, docx, xlsx,
+    csv, json, logs, and zip/tar/gzip archives of those).
+    """
+    name = getattr(uploaded_file, "name", "")
+    with stage("extract", format=_format(name)) as st:
+        text = _load_text(uploaded_file)
+        st.add_bytes(len(text))
+    return text
+
+def _load_text(uploaded_file) -> str:
+    name = getattr(uploaded_file, "name", "")
+    try:
+        return "".join(iter_stream_text(_open_upload(uploaded_file), name))
+    except Exception:
+        return ""
+
+def iter_text_from_uploaded(uploaded_file, chunk_size: int = DEFAULT_CHUNK_SIZE, limits: ExtractLimits = None):
+    """
+    Yield the text of an uploaded file in pieces of about chunk_size
+    characters, straight from its extractor. An unreadable member is left
+    out and reading stops when the byte budget of `limits` runs out, keeping
+    the text so far; pass `limits` to learn what was left out (`incomplete`).
+    """
+    name = getattr(uploaded_file, "name", "")
+    limits = limits or ExtractLimits(chunk_size=chunk_size)
+    return timed_iter("extract", _iter_text(uploaded_file, name, limits), format=_format(name))
 
-    return ""
+def _iter_text(uploaded_file, name: str, limits: ExtractLimits):
+    try:
+        yield from _batched(iter_stream_text(_open_upload(uploaded_file), name, limits), limits.chunk_size)
+    except ExtractLimitError:
+        return  # recorded in limits.truncated
@@ -0,0 +1,238 @@
+import contextvars
+import threading
+import time
+
+# Off by default: stage() then hands back a shared no-op and timed_iter() the
+# iterable itself, so uninstrumented scans pay one flag check per stage.
+_enabled = False
+_collector = contextvars.ContextVar("timings_collector", default=None)
+
+def enable(on: bool = True):
+    """
+    Turn recording into REGISTRY on or off for the whole process.
+    """
+    global _enabled
+    _enabled = on
+
+def is_enabled() -> bool:
+    return _enabled
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class MetricsRegistry:
+    """
+    Counters and summaries (count + sum) keyed by metric name and labels,
+    rendered in the Prometheus text exposition format.
+    """
+
+    def __init__(self, prefix: str = "scanner_"):
+        self.prefix = prefix
+        self._counters = {}
+        self._summaries = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            count, total = self._summaries.get(key, (0, 0.0))
+            self._summaries[key] = (count + 1, total + value)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._summaries.clear()
+
+    def snapshot(self) -> dict:
+        """
+        {"counters": {(name, labels): value}, "summaries": {(name, labels): (count, sum)}}
+        """
+        with self._lock:
+            return {"counters": dict(self._counters), "summaries": dict(self._summaries)}
+
+    def render_prometheus(self) -> str:
+        snap = self.snapshot()
+        lines = []
+
+        def series(name, labels, value):
+            label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+            lines.append(f"{name}{{{label_text}}} {value!r}" if label_text else f"{name} {value!r}")
+
+        for kind, entries in (("counter", snap["counters"]), ("summary", snap["summaries"])):
+            typed = set()
+            for (name, labels), value in sorted(entries.items()):
+                full = self.prefix + name
+                if full not in typed:
+                    lines.append(f"# TYPE {full} {kind}")
+                    typed.add(full)
+                if kind == "counter":
+                    series(full, labels, value)
+                else:
+                    series(full + "_count", labels, value[0])
+                    series(full + "_sum", labels, value[1])
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+class Timings:
+    """
+    Per-call collector behind the `timings` key of scan results:
+    {stage: {"wall": s, "cpu": s, "calls": n, "bytes": n}}.
+    """
+
+    def __init__(self):
+        self.stages = {}
+
+    def add(self, name: str, wall: float, cpu: float = 0.0, nbytes: int = 0):
+        entry = self.stages.get(name)
+        if entry is None:
+            entry = self.stages[name] = {"wall": 0.0, "cpu": 0.0, "calls": 0, "bytes": 0}
+        entry["wall"] += wall
+        entry["cpu"] += cpu
+        entry["calls"] += 1
+        entry["bytes"] += nbytes
+
+    def as_dict(self) -> dict:
+        return {name: {k: round(v, 6) if isinstance(v, float) else v for k, v in entry.items()}
+                for name, entry in self.stages.items()}
+
+class collect_timings:
+    """
+    Context manager routing every stage recorded in this context (thread or
+    task) into a fresh Timings, whether or not the registry is enabled.
+    """
+
+    def __enter__(self) -> Timings:
+        self.timings = Timings()
+        self._token = _collector.set(self.timings)
+        return self.timings
+
+    def __exit__(self, *exc):
+        _collector.reset(self._token)
+
+def _record(name: str, labels: dict, wall: float, cpu: float, nbytes: int):
+    if _enabled:
+        REGISTRY.observe("stage_wall_seconds", wall, stage=name, **labels)
+        REGISTRY.observe("stage_cpu_seconds", cpu, stage=name, **labels)
+        if nbytes:
+            REGISTRY.inc("stage_bytes_total", nbytes, stage=name, **labels)
+    collector = _collector.get()
+    if collector is not None:
+        # stage("extract", format="pdf") is reported as "extract/pdf"
+        key = name + "".join(f"/{v}" for v in labels.values())
+        collector.add(key, wall, cpu, nbytes)
+
+class _Stage:
+    __slots__ = ("name", "labels", "bytes", "_wall", "_cpu")
+
+    def __init__(self, name: str, labels: dict):
+        self.name = name
+        self.labels = labels
+        self.bytes = 0
+
+    def add_bytes(self, n: int):
+        self.bytes += n
+
+    def __enter__(self):
+        self._wall = time.perf_counter()
+        self._cpu = time.thread_time()
+        return self
+
+    def __exit__(self, *exc):
+        _record(self.name, self.labels, time.perf_counter() - self._wall, time.thread_time() - self._cpu, self.bytes)
+
+class _NoStage:
+    __slots__ = ()
+
+    def add_bytes(self, n: int):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+_NO_STAGE = _NoStage()
+
+def active() -> bool:
+    """
+    Whether anything is listening: the registry is enabled or timings are being collected.
+    """
+    return _enabled or _collector.get() is not None
+
+def stage(name: str, **labels):
+    """
+    Time a block as stage `name` (wall and thread CPU time, plus bytes
+    reported through add_bytes()). A no-op unless active().
+    """
+    if not _enabled and _collector.get() is None:
+        return _NO_STAGE
+    return _Stage(name, labels)
+
+def record(name: str, wall: float, cpu: float = 0.0, nbytes: int = 0, **labels):
+    """
+    Record an already measured stage (e.g. time spent across a generator).
+    """
+    if _enabled or _collector.get() is not None:
+        _record(name, labels, wall, cpu, nbytes)
+
+def timed_iter(name: str, iterable, **labels):
+    """
+    Pass `iterable` through, recording the time spent producing its items
+    (not consuming them) as one `name` stage, and their total length as bytes.
+    Returns `iterable` itself when nothing is listening.
+    """
+    if not _enabled and _collector.get() is None:
+        return iterable
+    return _timed_iter(name, iterable, labels)
+
+def _timed_iter(name: str, iterable, labels: dict):
+    wall = cpu = 0.0
+    size = 0
+    it = iter(iterable)
+    try:
+        while True:
+            w, c = time.perf_counter(), time.thread_time()
+            try:
+                item = next(it)
+            except StopIteration:
+                wall += time.perf_counter() - w
+                cpu += time.thread_time() - c
+                return
+            wall += time.perf_counter() - w
+            cpu += time.thread_time() - c
+            size += len(item[1] if isinstance(item, tuple) else item)
+            yield item
+    finally:
+        _record(name, labels, wall, cpu, size)
+
+def serve_metrics(port: int = 9108, host: str = "127.0.0.1", registry: MetricsRegistry = None):
+    """
+    Expose the registry at http://host:port/metrics from a daemon thread.
+    Returns the server (call shutdown() to stop it).
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    registry = registry or REGISTRY
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = registry.render_prometheus().encode()
+            self.send_response(200 if self.path.split("?")[0] == "/metrics" else 404)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
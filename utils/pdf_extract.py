@@ -0,0 +1,77 @@
+import io
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from PyPDF2 import PdfReader
+from PyPDF2.errors import PyPdfError
+from utils.file_loader import register_parse_errors
+
+register_parse_errors(PyPdfError)
+
+# PDFs with fewer pages are extracted in-process; a pool is not worth starting.
+PARALLEL_PDF_MIN_PAGES = 32
+
+_pdf_reader = None
+
+def _init_pdf_worker(data: bytes):
+    global _pdf_reader
+    _pdf_reader = PdfReader(io.BytesIO(data))
+
+def _extract_pdf_page(index: int) -> str:
+    return _pdf_reader.pages[index].extract_text() or ""
+
+def iter_pdf_pages(data: bytes, workers: int = None):
+    """
+    Yield (page_number, text) for each page of a PDF, in page order, extracting
+    lazily so the caller can work on a page as soon as it is ready.
+
+    With workers > 1 pages are extracted in a process pool, keeping only a
+    couple of pages per worker in flight. workers=None uses every core for
+    PDFs of PARALLEL_PDF_MIN_PAGES pages or more. Closing the generator early
+    cancels outstanding pages.
+    """
+    reader = PdfReader(io.BytesIO(data))
+    count = len(reader.pages)
+    if workers is None:
+        workers = (os.cpu_count() or 1) if count >= PARALLEL_PDF_MIN_PAGES else 1
+    workers = min(workers, count)
+
+    if workers <= 1:
+        for index, page in enumerate(reader.pages):
+            yield index + 1, page.extract_text() or ""
+        return
+
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_pdf_worker, initargs=(data,))
+    pending = deque()
+    try:
+        upcoming = iter(range(count))
+        for index in upcoming:
+            pending.append(pool.submit(_extract_pdf_page, index))
+            if len(pending) >= 2 * workers:
+                break
+        page_number = 0
+        while pending:
+            text = pending.popleft().result()
+            page_number += 1
+            for index in upcoming:
+                pending.append(pool.submit(_extract_pdf_page, index))
+                break
+            yield page_number, text
+    finally:
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def iter_pdf_text(data: bytes):
+    """
+    Page texts of a PDF in order, extracted in-process (the file_loader extractor).
+    """
+    for _, text in iter_pdf_pages(data, workers=1):
+        yield text
+
+def extract_pdf(stream, name: str, limits):
+    """
+    file_loader extractor: page texts joined by newlines.
+    """
+    from utils.file_loader import iter_joined
+    return iter_joined(iter_pdf_text(stream.read()))
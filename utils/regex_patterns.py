@@ -1,3 +1,6 @@
+# The password alphabet: a run of these is one token for the Password pattern.
+PASSWORD_CHARS = r"[A-Za-z\d@$!%*?&]"
+
 # Basic regexes for Indian context + common patterns
 PATTERNS = {
     # Aadhaar often formatted in 4-4-4 pattern with spaces
@@ -6,6 +9,9 @@ PATTERNS = {
     "PAN": r"\b[A-Z]{5}[0-9]{4}[A-Z]\b",
     "Email": r"\b[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-z]{2,}\b",
     "Phone": r"\b[6-9]\d{9}\b",
-    # Naive password-like pattern: at least 8 chars with letters+digits (and optional specials)
-    "Password": r"(?=.*[A-Za-z])(?=.*\d)[A-Za-z\d@$!%*?&]{8,}",
+    # Naive password-like pattern: a token of 8+ chars from the password alphabet
+    # holding both letters and digits. Matches may only start at a token boundary
+    # and the lookaheads cannot leave the token, so the scan stays linear even on
+    # huge single-line inputs (minified JSON, base64, CSV exports).
+    "Password": rf"(?<!{PASSWORD_CHARS})(?={PASSWORD_CHARS}*[A-Za-z])(?={PASSWORD_CHARS}*\d){PASSWORD_CHARS}{{8,}}",
 }
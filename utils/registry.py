@@ -0,0 +1,40 @@
+import importlib
+import threading
+
+class LazyRegistry:
+    """
+    Name -> object lookup where an entry may be given as "module:attribute"
+    and is only imported the first time it is looked up, so optional heavy
+    dependencies (PyPDF2, reportlab, ...) are loaded when a format needs them.
+    """
+
+    def __init__(self, entries: dict = None):
+        self._entries = dict(entries or {})
+        self._lock = threading.Lock()
+
+    def register(self, name: str, obj):
+        with self._lock:
+            self._entries[name] = obj
+
+    def get(self, name: str, default=None):
+        entry = self._entries.get(name, default)
+        if not isinstance(entry, str):
+            return entry
+        module, _, attr = entry.partition(":")
+        obj = getattr(importlib.import_module(module), attr)
+        with self._lock:
+            if self._entries.get(name) == entry:
+                self._entries[name] = obj
+        return obj
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    def names(self) -> list:
+        return sorted(self._entries)
+
+    def loaded(self, name: str) -> bool:
+        """
+        Whether `name` has been imported already (or was registered as an object).
+        """
+        return name in self._entries and not isinstance(self._entries[name], str)
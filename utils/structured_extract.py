@@ -0,0 +1,156 @@
+import csv
+import io
+import itertools
+import json
+import re
+import sys
+import zipfile
+import xml.etree.ElementTree as ET
+from utils.file_loader import iter_joined, register_parse_errors
+
+register_parse_errors(csv.Error, zipfile.BadZipFile)
+
+# Cells of a row are joined with this, which no pattern can match across
+# (a tab would let three numeric cells read as one Aadhaar number).
+CELL_SEP = " | "
+# csv refuses fields over 128 KiB by default; exported notes and blobs are longer
+csv.field_size_limit(min(sys.maxsize, 2**31 - 1))
+
+_S = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_SHEET = re.compile(r"xl/worksheets/sheet(\d+)\.xml")
+
+def _text_stream(stream):
+    head = stream.peek(4)[:4] if hasattr(stream, "peek") else b""
+    encoding = "utf-16" if head[:2] in (b"\xff\xfe", b"\xfe\xff") else "utf-8-sig"
+    return io.TextIOWrapper(stream, encoding=encoding, errors="ignore", newline="")
+
+def _csv_rows(stream, name: str):
+    text = _text_stream(stream)
+    sample = list(itertools.islice(text, 20))
+    try:
+        dialect = csv.Sniffer().sniff("".join(sample), delimiters=",;\t|")
+    except csv.Error:
+        dialect = csv.excel_tab if name.lower().endswith(".tsv") else csv.excel
+    for row in csv.reader(itertools.chain(sample, text), dialect):
+        yield CELL_SEP.join(row)
+
+def extract_csv(stream, name: str, limits):
+    """
+    One line per record with its cells separated by CELL_SEP: quoting,
+    escaped quotes and line breaks inside fields are undone first.
+    """
+    return iter_joined(_csv_rows(stream, name))
+
+def _json_lines(value):
+    """
+    "key: value" lines for every key and scalar in a decoded JSON value,
+    without recursion so deeply nested documents are fine.
+    """
+    stack = [(None, value)]
+    while stack:
+        key, value = stack.pop()
+        if isinstance(value, dict):
+            if key is not None:
+                yield f"{key}:"
+            stack.extend(reversed(list(value.items())))
+        elif isinstance(value, list):
+            if key is not None:
+                yield f"{key}:"
+            stack.extend((key, item) for item in reversed(value))
+        elif value is not None and not isinstance(value, bool):
+            yield str(value) if key is None else f"{key}: {value}"
+
+def _json_text(stream):
+    text = _text_stream(stream)
+    first = text.readline()
+    try:
+        value = json.loads(first)
+    except ValueError:
+        value = None
+        lines = False
+    else:
+        lines = bool(first.strip())
+    if not lines:
+        # one document: it has to be decoded whole
+        document = first + text.read()
+        try:
+            value = json.loads(document)
+        except ValueError:
+            yield document  # not JSON after all; scan it as text
+            return
+        yield from _json_lines(value)
+        return
+    # JSON Lines: one value per line, lines that do not parse are kept as text
+    yield from _json_lines(value)
+    for line in text:
+        try:
+            yield from _json_lines(json.loads(line))
+        except ValueError:
+            if line.strip():
+                yield line.rstrip("\r\n")
+
+def extract_json(stream, name: str, limits):
+    """
+    Keys and values of a JSON document or of JSON Lines, one "key: value"
+    per line, with string escapes (\\u0040, \\/) decoded. JSON Lines are
+    streamed; a single document is decoded in one go.
+    """
+    return iter_joined(_json_text(stream))
+
+def _shared_strings(part):
+    strings = []
+    root = None
+    for event, elem in ET.iterparse(part, events=("start", "end")):
+        if root is None:
+            root = elem
+        elif event == "end" and elem.tag == _S + "si":
+            strings.append("".join(t.text or "" for t in elem.iter(_S + "t")))
+            root.remove(elem)
+    return strings
+
+def _sheet_rows(part, shared: list):
+    sheet_data = None
+    cells = []
+    for event, elem in ET.iterparse(part, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            if tag == _S + "sheetData":
+                sheet_data = elem
+            continue
+        if tag == _S + "c":
+            kind = elem.get("t")
+            if kind == "inlineStr":
+                cells.append("".join(t.text or "" for t in elem.iter(_S + "t")))
+            else:
+                v = elem.find(_S + "v")
+                if v is not None and v.text is not None:
+                    if kind == "s":
+                        index = int(v.text)
+                        cells.append(shared[index] if index < len(shared) else "")
+                    else:
+                        cells.append(v.text)
+        elif tag == _S + "row":
+            yield CELL_SEP.join(cells)
+            cells = []
+            # finished rows are dropped so memory stays flat on long sheets
+            if sheet_data is not None:
+                sheet_data.remove(elem)
+
+def _xlsx_rows(data: bytes, limits):
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        names = zf.namelist()
+        shared = []
+        if "xl/sharedStrings.xml" in names:
+            with zf.open("xl/sharedStrings.xml") as part:
+                shared = _shared_strings(limits.meter(part))
+        sheets = sorted((int(m.group(1)), n) for n in names for m in [_SHEET.fullmatch(n)] if m)
+        for _, sheet in sheets:
+            with zf.open(sheet) as part:
+                yield from _sheet_rows(limits.meter(part), shared)
+
+def extract_xlsx(stream, name: str, limits):
+    """
+    Worksheet rows in sheet order, cells separated by CELL_SEP, parsed
+    incrementally from the sheet XML. Shared strings are loaded up front.
+    """
+    return iter_joined(_xlsx_rows(stream.read(), limits))